@@ -0,0 +1,326 @@
+"""
+Two-phase (decide/apply) activation of citizens.
+
+By default citizens step one after another and every behavior reads and
+mutates the live world: other citizens' coins and relationships, food on the
+grid, grid positions. With `CityModel(two_phase=True)` the agent step is
+split up instead:
+
+  1. local:  needs, health and all behaviors that are not split into
+             intents (CitizenAgent.LOCAL_BEHAVIORS), serially as before
+  2. decide: every living citizen picks its intents -- where to move, whom
+             to trade with, mentor and student choices -- against a
+             read-only snapshot of the world. Decisions are pure functions of
+             plain data and a per-citizen random stream, so they can run in
+             worker processes (`decide_workers=N`) with identical results
+  3. apply:  intents are committed in agent order; conflicts resolve
+             against the live world (the first citizen to reach a food item
+             eats it, trades with a dead partner are dropped, ...)
+  4. social: citizens sharing a cell meet (check_for_social_interactions)
+
+Intents follow the behavior cadence like the sequential mode: a move is only
+applied when choose_action is due for the citizen, a trade when
+attempt_trading is due, and so on (model.behavior_schedule).
+
+Two-phase runs are deterministic for a seed but follow a different
+trajectory than the sequential mode: decisions see the world as it was at
+the start of the decide phase instead of after the previous citizen's step.
+"""
+
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from agent import CitizenAgent
+
+
+BUILDING_TYPES = ('food', 'house', 'job', 'market', 'workshop', 'temple', 'school')
+SKILL_NAMES = ('farming', 'crafting', 'trading', 'combat', 'learning')
+PROFESSION_BUILDINGS = {'merchant': 'market', 'craftsman': 'workshop', 'scholar': 'school'}
+SKILL_BUILDINGS = {'trading': 'market', 'crafting': 'workshop', 'learning': 'school'}
+SOCIAL_RADIUS = 5  # Citizens walk towards others within this Manhattan distance
+TRADE_RADIUS = 3   # Citizens trade with others within this Manhattan distance
+
+
+def take_snapshot(model):
+    """Read-only view of the world for the decide phase, from one grid scan."""
+    buildings = {name: [] for name in BUILDING_TYPES}
+    citizens = []  # (unique_id, pos) in grid order
+    mentors = []   # Citizens that can mentor young adults
+    students = []  # Young adults
+    for cell_content, pos in model.grid.coord_iter():
+        for obj in cell_content:
+            if isinstance(obj, CitizenAgent):
+                if not obj.is_dead:
+                    citizens.append((obj.unique_id, pos))
+                    if obj.life_stage == 'young_adult':
+                        students.append(obj.unique_id)
+                    elif obj.teaching_ability > 15:
+                        mentors.append(obj.unique_id)
+            else:
+                kind = getattr(obj, 'type', None)
+                if kind in buildings:
+                    buildings[kind].append(pos)
+    return {'width': model.grid.width, 'height': model.grid.height, 'buildings': buildings,
+            'citizens': citizens, 'mentors': mentors, 'students': students}
+
+
+def citizen_view(agent):
+    """The state a citizen's decisions depend on, as plain data."""
+    return {
+        'uid': agent.unique_id,
+        'pos': agent.pos,
+        'hunger': agent.hunger,
+        'energy': agent.energy,
+        'social': agent.social,
+        'coins': agent.coins,
+        'hunger_threshold': agent.hunger_threshold,
+        'energy_threshold': agent.energy_threshold,
+        'social_threshold': agent.social_threshold,
+        'exploration_rate': agent.exploration_rate,
+        'priorities': agent.profile.priorities,
+        'greedy': agent.profile.greedy,
+        'profession': agent.profession,
+        'skills': tuple(getattr(agent, name) for name in SKILL_NAMES),
+        'friendships': dict(agent.friendships),
+        'life_stage': agent.life_stage,
+        'mentors': len(agent.mentors),
+        'teaching_ability': agent.teaching_ability,
+    }
+
+
+def _nearest(positions, pos):
+    """Nearest position by Manhattan distance (first in grid order on ties)."""
+    if not positions:
+        return None
+    x, y = pos
+    return min(positions, key=lambda p: abs(p[0] - x) + abs(p[1] - y))
+
+
+def _step_towards(pos, target, width, height):
+    x, y = pos
+    new_x = x + (target[0] > x) - (target[0] < x)
+    new_y = y + (target[1] > y) - (target[1] < y)
+    if 0 <= new_x < width and 0 <= new_y < height:
+        return (new_x, new_y)
+    return pos
+
+
+def _random_neighbor(pos, width, height, rng):
+    x, y = pos
+    moves = [(x + dx, y + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+             if (dx or dy) and 0 <= x + dx < width and 0 <= y + dy < height]
+    return rng.choice(moves) if moves else pos
+
+
+def _social_target(view, snapshot):
+    """Best nearby citizen to walk to (mirrors CitizenAgent.seek_social_interaction)."""
+    x, y = view['pos']
+    friendships = view['friendships']
+    best = None
+    for uid, pos in snapshot['citizens']:
+        if uid == view['uid']:
+            continue
+        distance = abs(pos[0] - x) + abs(pos[1] - y)
+        if distance <= SOCIAL_RADIUS:
+            score = friendships.get(uid, 0) * 0.1 - distance
+            if best is None or score > best[0]:
+                best = (score, pos)
+    return best[1] if best else None
+
+
+def decide_move(view, snapshot, rng):
+    """Target cell of this step's move and whether to use the building there.
+
+    Mirrors CitizenAgent.choose_action with building lookups in the snapshot.
+    """
+    pos = view['pos']
+    width, height = snapshot['width'], snapshot['height']
+    buildings = snapshot['buildings']
+
+    def towards(kind):
+        target = _nearest(buildings[kind], pos)
+        return None if target is None else _step_towards(pos, target, width, height)
+
+    if rng.random() < view['exploration_rate']:
+        return _random_neighbor(pos, width, height, rng), False
+
+    greedy = view['greedy']
+    coins = view['coins']
+    for action in view['priorities']:
+        target = None
+        if action == 'social' and view['social'] >= view['social_threshold']:
+            target = towards('temple')
+            if target is None:
+                social = _social_target(view, snapshot)
+                target = None if social is None else _step_towards(pos, social, width, height)
+        elif action == 'food' and view['hunger'] >= view['hunger_threshold']:
+            if greedy and coins < 3:
+                target = towards('job')
+            else:
+                target = towards('food') if coins > 0 else (towards('job') or towards('food'))
+                if target is None:
+                    target = _random_neighbor(pos, width, height, rng)
+        elif action == 'work' and (coins < 3 or (greedy and coins < 8)):
+            building = PROFESSION_BUILDINGS.get(view['profession'])
+            target = (towards(building) if building else None) or towards('job')
+        elif action == 'sleep' and view['energy'] <= view['energy_threshold']:
+            target = towards('house') or _random_neighbor(pos, width, height, rng)
+        elif action == 'learning' and rng.random() < 0.3:
+            target = towards('school')
+        if target is not None:
+            return target, True
+
+    # No urgent needs: develop the weakest skill or wander
+    if rng.random() < 0.4:
+        skills = dict(zip(SKILL_NAMES, view['skills']))
+        building = SKILL_BUILDINGS.get(min(skills, key=skills.get))
+        target = towards(building) if building else None
+        if target is not None:
+            return target, True
+    return _random_neighbor(pos, width, height, rng), True
+
+
+def decide_trade(view, snapshot, rng):
+    """Trade partner for this step, if any (mirrors CitizenAgent.attempt_trading)."""
+    if view['profession'] != 'merchant' and rng.random() > 0.2:
+        return None
+    x, y = view['pos']
+    partners = [uid for uid, pos in snapshot['citizens']
+                if uid != view['uid'] and abs(pos[0] - x) + abs(pos[1] - y) <= TRADE_RADIUS]
+    return rng.choice(partners) if partners else None
+
+
+def decide_teaching(view, snapshot, rng):
+    """Mentor to seek and students to teach (mirrors demonstrate_teaching_and_learning)."""
+    mentor = None
+    students = ()
+    uid = view['uid']
+    if view['life_stage'] == 'young_adult' and view['mentors'] < 2:
+        mentors = [other for other in snapshot['mentors'] if other != uid]
+        if mentors:
+            mentor = rng.choice(mentors)
+    if view['teaching_ability'] > 20 and view['life_stage'] in ('mature', 'elder'):
+        candidates = [other for other in snapshot['students'] if other != uid]
+        students = tuple(rng.sample(candidates, min(2, len(candidates))))
+    return mentor, students
+
+
+def decide(view, snapshot, rng):
+    """All intents of one citizen for this step."""
+    move, interact = decide_move(view, snapshot, rng)
+    trade = decide_trade(view, snapshot, rng)
+    mentor, students = decide_teaching(view, snapshot, rng)
+    return {'uid': view['uid'], 'move': move, 'interact': interact,
+            'trade': trade, 'mentor': mentor, 'students': students}
+
+
+def decide_all(views, snapshot, seed, step):
+    """Intents for a batch of citizens; each citizen draws from its own stream."""
+    return [decide(view, snapshot, random.Random(f"{seed}:{step}:{view['uid']}")) for view in views]
+
+
+def _decide_chunk(args):
+    return decide_all(*args)
+
+
+class TwoPhaseActivation:
+    """Step citizens in local, decide, apply and social phases (see module docstring)."""
+
+    def __init__(self, model, workers=0):
+        self.model = model
+        self.workers = workers
+        self._pool = None
+
+    def step(self):
+        model = self.model
+        metrics = model.metrics
+        citizens = metrics.call('activation', 'local', self.run_local)
+        intents = metrics.call('activation', 'decide', lambda: self.decide(citizens))
+        metrics.call('activation', 'apply', lambda: self.apply(intents))
+        metrics.call('activation', 'social', lambda: self.meet(citizens))
+
+    def run_local(self):
+        """Step non-citizen agents and the local part of every citizen; return the living citizens."""
+        model = self.model
+        citizens = []
+        for agent in model.agents:  # Births and removals are deferred (mutations.py)
+            if not isinstance(agent, CitizenAgent):
+                agent.step()
+            elif agent.update_vitals():
+                names = model.behavior_schedule.due(model.step_count, agent.unique_id, agent.LOCAL_BEHAVIORS)
+                model.metrics.run(agent, names, 'agent')
+                if agent.pos is not None:
+                    citizens.append(agent)
+        return citizens
+
+    def decide(self, citizens):
+        """Intents of all citizens, computed in worker processes when configured."""
+        model = self.model
+        snapshot = take_snapshot(model)
+        views = [citizen_view(agent) for agent in citizens]
+        workers = max(1, self.workers)
+        size = max(1, -(-len(views) // workers))
+        return self.run_batches([(views[i:i + size], snapshot, model.seed, model.step_count)
+                                 for i in range(0, len(views), size)])
+
+    def run_batches(self, batches):
+        """Run decide_all over (views, snapshot, seed, step) batches, in worker processes if configured."""
+        if self.workers <= 1 or len(batches) < 2:
+            parts = [decide_all(*batch) for batch in batches]
+        else:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            parts = self._pool.map(_decide_chunk, batches)
+        intents = []
+        for part in parts:
+            intents.extend(part)
+        return intents
+
+    def apply(self, intents):
+        """Commit intents in agent order, resolving conflicts against the live world."""
+        model = self.model
+        step = model.step_count
+        due = model.behavior_schedule.due
+        by_id = {agent.unique_id: agent for agent in model.agents if isinstance(agent, CitizenAgent)}
+        for intent in intents:
+            agent = by_id.get(intent['uid'])
+            if agent is None or agent.is_dead or agent.pos is None:
+                continue
+            names = due(step, agent.unique_id, agent.INTENT_BEHAVIORS)
+            if 'choose_action' in names:
+                if intent['move'] != agent.pos:
+                    model.grid.move_agent(agent, intent['move'])
+                if intent['interact']:
+                    agent.interact_with_environment()  # Food already eaten this step is gone
+
+            partner = by_id.get(intent['trade'])
+            if partner is not None and not partner.is_dead and 'attempt_trading' in names:
+                agent.execute_trade(partner)
+
+            if 'demonstrate_teaching_and_learning' not in names:
+                continue
+            mentor = intent['mentor']
+            if mentor is not None and mentor not in agent.mentors:
+                agent.mentors.append(mentor)
+                agent.update_relationship(mentor, 'positive', 3)
+            for student_id in intent['students']:
+                student = by_id.get(student_id)
+                if student is not None and not student.is_dead and agent.skills:
+                    best_skill = max(agent.skills.items(), key=lambda x: x[1])
+                    if best_skill[1] > 30:
+                        agent.teach_skill_to_agent(student, best_skill[0])
+
+    def meet(self, citizens):
+        """Citizens that share a cell after all moves interact."""
+        model = self.model
+        step = model.step_count
+        due = model.behavior_schedule.due
+        for agent in citizens:
+            if not agent.is_dead and 'check_for_social_interactions' in due(step, agent.unique_id, agent.INTENT_BEHAVIORS):
+                agent.check_for_social_interactions()
+
+    def close(self):
+        """Shut down the decision workers."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Test the alternative citizen activations (two-phase, event-driven, LOD).
+Runs must be reproducible, and decisions must not depend on how citizens are
+split across decision workers.
+"""
+
+from model import CityModel
+from agent import CitizenAgent
+from events import EventBus
+from golden import digest
+from activation import take_snapshot, citizen_view, decide_all
+from lod import FocusPolicy, ImportancePolicy, CombinedPolicy, fidelity
+
+
+def make_model(**options):
+    return CityModel(width=15, height=15, num_agents=25, num_food=30, num_houses=8, num_jobs=10,
+                     event_bus=EventBus(enabled=False), seed=21, two_phase=True, **options)
+
+
+def test_two_phase_is_reproducible():
+    """Two two-phase runs with the same seed end in the same state."""
+    print("Testing two-phase activation...")
+    first, second = make_model(), make_model()
+    for _ in range(25):
+        first.step()
+        second.step()
+    assert digest(first) == digest(second)
+    alive = [a for a in first.agents if isinstance(a, CitizenAgent) and not a.is_dead]
+    assert alive
+    print(f"✓ Two-phase runs match ({len(alive)} citizens alive after 25 steps)")
+
+
+def test_decisions_independent_of_chunking():
+    """Deciding in chunks (as the worker processes do) gives the same intents."""
+    print("Testing chunked decisions...")
+    model = make_model()
+    for _ in range(5):
+        model.step()
+    citizens = [a for a in model.agents if isinstance(a, CitizenAgent) and not a.is_dead]
+    snapshot = take_snapshot(model)
+    views = [citizen_view(agent) for agent in citizens]
+    whole = decide_all(views, snapshot, model.seed, model.step_count)
+    chunked = []
+    for i in range(0, len(views), 4):
+        chunked.extend(decide_all(views[i:i + 4], snapshot, model.seed, model.step_count))
+    assert whole == chunked
+    print(f"✓ {len(whole)} intents identical when decided in chunks")
+
+
+def test_decide_workers_match_serial_run():
+    """Decisions made in two worker processes give the same run; close() stops the workers."""
+    print("Testing decision worker processes...")
+    serial = make_model()
+    with make_model(decide_workers=2) as parallel:
+        for _ in range(8):
+            serial.step()
+            parallel.step()
+            assert digest(parallel) == digest(serial)
+        assert parallel.activation._pool is not None
+    assert parallel.activation._pool is None
+    print("✓ Two decision workers match the serial run and are shut down on close")
+
+
+def test_two_phase_honors_behavior_cadence():
+    """Intent behaviors disabled in the cadence are not applied by the two-phase activation."""
+    print("Testing two-phase behavior cadence...")
+    trading = make_model()
+    no_trading = make_model(behaviors={'attempt_trading': {'enabled': False}})
+    for _ in range(30):
+        trading.step()
+        no_trading.step()
+    assert trading.trade_volume > 0
+    assert no_trading.trade_volume == 0
+    assert not any(a.trade_partners for a in no_trading.agents if isinstance(a, CitizenAgent))
+    print(f"✓ No trades with attempt_trading disabled ({trading.trade_volume} coins traded otherwise)")
+
+
+def test_event_driven_activation():
+    """Citizens without pending decisions get idle updates; runs stay reproducible."""
+    print("Testing event-driven activation...")
+    runs = []
+    for _ in range(2):
+        model = CityModel(width=15, height=15, num_agents=25, num_food=30, num_houses=8, num_jobs=10,
+                          event_bus=EventBus(enabled=False), seed=21, event_driven=True)
+        for _ in range(25):
+            model.step()
+        runs.append(model)
+    assert digest(runs[0]) == digest(runs[1])
+    stats = runs[0].activation.stats()
+    assert stats['full_steps'] > 0 and stats['idle_steps'] > 0
+    print(f"✓ {stats['idle_fraction']:.0%} of citizen steps were idle updates")
+
+
+def test_level_of_detail():
+    """LOD tiers run fewer behaviors and report fidelity against a full run."""
+    print("Testing level-of-detail tiers...")
+    full = CityModel(width=15, height=15, num_agents=25, num_food=30, num_houses=8, num_jobs=10,
+                     event_bus=EventBus(enabled=False), seed=21)
+    policy = CombinedPolicy(FocusPolicy((7, 7), full_radius=2, reduced_radius=5), ImportancePolicy(default='minimal'))
+    reduced = CityModel(width=15, height=15, num_agents=25, num_food=30, num_houses=8, num_jobs=10,
+                        event_bus=EventBus(enabled=False), seed=21, lod=policy)
+    for _ in range(20):
+        full.step()
+        reduced.step()
+    stats = reduced.activation.stats()
+    assert all(stats['tier_steps'][tier] > 0 for tier in ('full', 'reduced', 'minimal'))
+    assert 0 < stats['behavior_fraction'] < 1
+    report = fidelity(full, reduced)
+    assert report['Total Agents']['relative_error'] >= 0
+    print(f"✓ {stats['behavior_fraction']:.0%} of behaviors ran; "
+          f"average hunger off by {report['Average Hunger']['relative_error']:.1%}")
+
+
+def test_level_of_detail_counts_only_run_behaviors():
+    """A full-detail citizen that dies during its step is not counted as running behaviors."""
+    print("Testing LOD behavior counts...")
+    model = CityModel(width=15, height=15, num_agents=10, num_food=10, num_houses=5, num_jobs=5,
+                      event_bus=EventBus(enabled=False), seed=21, lod=ImportancePolicy(default='full'))
+    citizens = [a for a in model.agents if isinstance(a, CitizenAgent)]
+    citizens[0].health = 0  # Dies in update_vitals
+    expected = sum(len(model.behavior_schedule.due(model.step_count, a.unique_id)) for a in citizens[1:])
+    model.step()
+    stats = model.activation.stats()
+    assert stats['tier_steps']['full'] == len(citizens)
+    assert stats['behavior_calls'] == expected
+    print(f"✓ {expected} behavior calls for {len(citizens) - 1} living citizens")
+
+
+def test_level_of_detail_all_full_runs_every_behavior():
+    """A policy that keeps every citizen at full detail reports a behavior fraction of exactly 1."""
+    print("Testing all-full LOD behavior fraction...")
+    model = CityModel(width=15, height=15, num_agents=25, num_food=30, num_houses=8, num_jobs=10,
+                      event_bus=EventBus(enabled=False), seed=21, lod=ImportancePolicy(default='full'))
+    for _ in range(25):
+        model.step()
+    stats = model.activation.stats()
+    assert stats['tier_steps']['full'] > 0
+    assert stats['behavior_fraction'] == 1.0
+    print(f"✓ {stats['behavior_calls']} behavior calls, fraction {stats['behavior_fraction']}")
+
+
+if __name__ == "__main__":
+    test_two_phase_is_reproducible()
+    test_decisions_independent_of_chunking()
+    test_decide_workers_match_serial_run()
+    test_two_phase_honors_behavior_cadence()
+    test_event_driven_activation()
+    test_level_of_detail()
+    test_level_of_detail_counts_only_run_behaviors()
+    test_level_of_detail_all_full_runs_every_behavior()
@@ -1,5 +1,75 @@
-import random
 from mesa import Agent
+from events import DEBUG, INFO, NOTICE
+
+
+# Personality traits and their bits in BehaviorProfile.mask
+TRAITS = ('greedy', 'friendly', 'lazy', 'explorer')
+GREEDY, FRIENDLY, LAZY, EXPLORER = 1, 2, 4, 8
+TRAIT_BITS = dict(zip(TRAITS, (GREEDY, FRIENDLY, LAZY, EXPLORER)))
+
+
+class BehaviorProfile:
+    """Decision data derived from a combination of personality traits.
+
+    One shared, read-only profile per combination (see for_traits); a
+    citizen's `profile` is replaced whenever its personality_traits are assigned.
+    """
+
+    _cache = {}  # {mask: BehaviorProfile}
+
+    # Per-step skill growth in develop_skills for the trait that drives it (base rate times a multiplier)
+    BASE_SKILL_RATE = 0.1
+    TRADING_RATE = BASE_SKILL_RATE * 2          # greedy
+    LEARNING_RATE = BASE_SKILL_RATE * 1.5       # friendly
+    WEAKEST_SKILL_RATE = BASE_SKILL_RATE * 0.8  # lazy
+    COMBAT_RATE = BASE_SKILL_RATE * 1.5         # explorer
+
+    def __init__(self, mask):
+        self.mask = mask
+        self.greedy = bool(mask & GREEDY)
+        self.friendly = bool(mask & FRIENDLY)
+        self.lazy = bool(mask & LAZY)
+        self.explorer = bool(mask & EXPLORER)
+
+        # Order in which choose_action considers needs
+        if self.greedy:
+            self.priorities = ('work', 'food', 'sleep', 'social', 'learning')
+        elif self.friendly:
+            self.priorities = ('social', 'food', 'work', 'sleep', 'learning')
+        elif self.lazy:
+            self.priorities = ('sleep', 'food', 'work', 'social', 'learning')
+        else:
+            # Default/explorer personality
+            self.priorities = ('food', 'work', 'sleep', 'social', 'learning')
+
+        self.exploration_rate = 0.4 if self.explorer else 0.2
+
+        # Trait that decides the policy of a leader (CityModel.generate_leadership_policy)
+        if self.greedy:
+            self.leadership_trait = 'greedy'
+        elif self.friendly:
+            self.leadership_trait = 'friendly'
+        elif self.explorer:
+            self.leadership_trait = 'explorer'
+        else:
+            self.leadership_trait = None
+
+    def __reduce__(self):
+        return (BehaviorProfile.for_mask, (self.mask,))  # Unpickle to the shared instance
+
+    @classmethod
+    def for_mask(cls, mask):
+        profile = cls._cache.get(mask)
+        if profile is None:
+            profile = cls._cache[mask] = cls(mask)
+        return profile
+
+    @classmethod
+    def for_traits(cls, traits):
+        mask = 0
+        for trait in traits:
+            mask |= TRAIT_BITS[trait]
+        return cls.for_mask(mask)
 
 
 class CitizenAgent(Agent):
@@ -9,26 +79,26 @@ class CitizenAgent(Agent):
         super().__init__(model)
         
         # Agent attributes (BETTER STARTING CONDITIONS)
-        self.hunger = random.randint(20, 50)  # Was 30-70, less hungry start
-        self.energy = random.randint(50, 80)  # Was 30-70, more energetic start
+        self.hunger = self.random.randint(20, 50)  # Was 30-70, less hungry start
+        self.energy = self.random.randint(50, 80)  # Was 30-70, more energetic start
         self.health = 100  # Health starts at 100
         self.coins = 8  # Was 5, more starting coins
-        self.social = random.randint(10, 30)  # Was 20-50, less lonely start
+        self.social = self.random.randint(10, 30)  # Was 20-50, less lonely start
         self.is_dead = False  # Death state
         
         # Missing attributes for Phase 4
-        self.age = random.randint(18, 35)
-        self.gender = random.choice(['male', 'female'])
-        self.food = random.randint(10, 30)
-        self.tools = random.randint(5, 15)
+        self.age = self.random.randint(18, 35)
+        self.gender = self.random.choice(['male', 'female'])
+        self.food = self.random.randint(10, 30)
+        self.tools = self.random.randint(5, 15)
         self.partner_id = None
         self.children = []
         self.skills = {
-            'farming': random.randint(10, 30),
-            'crafting': random.randint(10, 30),
-            'trading': random.randint(10, 30),
-            'learning': random.randint(10, 30),
-            'leadership': random.randint(10, 30)
+            'farming': self.random.randint(10, 30),
+            'crafting': self.random.randint(10, 30),
+            'trading': self.random.randint(10, 30),
+            'learning': self.random.randint(10, 30),
+            'leadership': self.random.randint(10, 30)
         }
         self.has_leadership_role = False
         self.friendships = {}  # For backward compatibility
@@ -46,39 +116,37 @@ class CitizenAgent(Agent):
         self.health_danger_hunger = 90  # Was 85, higher threshold for health loss
         self.health_danger_energy = 10  # Was 15, lower threshold for health loss
         
-        # Personality traits (assign 1-2 randomly)
+        # Personality traits (assign 1-2 randomly); also sets the behavior profile
+        # and the exploration rate based on personality
         all_traits = ['greedy', 'friendly', 'lazy', 'explorer']
-        num_traits = random.choice([1, 2])
-        self.personality_traits = random.sample(all_traits, num_traits)
-        
-        # Exploration rate based on personality
-        self.exploration_rate = 0.4 if 'explorer' in self.personality_traits else 0.2
+        num_traits = self.random.choice([1, 2])
+        self.personality_traits = self.random.sample(all_traits, num_traits)
         
         # Memory of food and job locations (simple learning)
         self.known_food_locations = set()
         self.known_job_locations = set()
         
         # Skills system (0-100 scale)
-        self.farming = random.randint(10, 30)    # Food production efficiency
-        self.crafting = random.randint(10, 30)   # Item creation ability
-        self.trading = random.randint(10, 30)    # Economic efficiency
-        self.combat = random.randint(10, 30)     # Survival and protection
-        self.learning = random.randint(10, 30)   # Knowledge acquisition speed
+        self.farming = self.random.randint(10, 30)    # Food production efficiency
+        self.crafting = self.random.randint(10, 30)   # Item creation ability
+        self.trading = self.random.randint(10, 30)    # Economic efficiency
+        self.combat = self.random.randint(10, 30)     # Survival and protection
+        self.learning = self.random.randint(10, 30)   # Knowledge acquisition speed
         
         # Profession system
         self.profession = None  # Will be assigned based on skills and opportunities
         
         # PHASE 3: Cultural and social attributes
-        self.artistic_skill = random.randint(5, 25)    # Art creation ability
-        self.philosophical_inclination = random.randint(5, 25)  # Deep thinking tendency
-        self.diplomatic_skill = random.randint(5, 25)  # Conflict resolution ability
-        self.research_focus = random.choice(['none', 'medicine', 'engineering', 'philosophy', 'astronomy'])
+        self.artistic_skill = self.random.randint(5, 25)    # Art creation ability
+        self.philosophical_inclination = self.random.randint(5, 25)  # Deep thinking tendency
+        self.diplomatic_skill = self.random.randint(5, 25)  # Conflict resolution ability
+        self.research_focus = self.random.choice(['none', 'medicine', 'engineering', 'philosophy', 'astronomy'])
         
         # PHASE 3: Social and political attributes
         self.cultural_contributions = 0    # Number of cultural works created
         self.conflicts_mediated = 0        # Number of conflicts resolved
         self.research_progress = 0         # Progress on current research
-        self.political_alignment = random.choice(['peaceful', 'aggressive', 'neutral'])
+        self.political_alignment = self.random.choice(['peaceful', 'aggressive', 'neutral'])
         
         # PHASE 3: Advanced memory systems
         self.cultural_memory = []          # Remember cultural events attended
@@ -87,23 +155,23 @@ class CitizenAgent(Agent):
         
         # PHASE 4: Complex Psychology & Emotions
         self.emotions = {
-            'happiness': random.randint(30, 70),
-            'anger': random.randint(0, 20),
-            'fear': random.randint(0, 30),
-            'sadness': random.randint(0, 20),
-            'excitement': random.randint(10, 40),
-            'stress': random.randint(0, 30),
-            'love': random.randint(0, 20),
-            'pride': random.randint(10, 30)
+            'happiness': self.random.randint(30, 70),
+            'anger': self.random.randint(0, 20),
+            'fear': self.random.randint(0, 30),
+            'sadness': self.random.randint(0, 20),
+            'excitement': self.random.randint(10, 40),
+            'stress': self.random.randint(0, 30),
+            'love': self.random.randint(0, 20),
+            'pride': self.random.randint(10, 30)
         }
         
         # PHASE 4: Advanced personality system
         self.personality_scores = {
-            'openness': random.randint(20, 80),        # Creativity, curiosity
-            'conscientiousness': random.randint(20, 80),  # Organization, discipline
-            'extraversion': random.randint(20, 80),    # Sociability, energy
-            'agreeableness': random.randint(20, 80),   # Cooperation, trust
-            'neuroticism': random.randint(20, 80)      # Emotional stability
+            'openness': self.random.randint(20, 80),        # Creativity, curiosity
+            'conscientiousness': self.random.randint(20, 80),  # Organization, discipline
+            'extraversion': self.random.randint(20, 80),    # Sociability, energy
+            'agreeableness': self.random.randint(20, 80),   # Cooperation, trust
+            'neuroticism': self.random.randint(20, 80)      # Emotional stability
         }
         
         # PHASE 4: Complex memory and learning
@@ -115,23 +183,23 @@ class CitizenAgent(Agent):
         
         # PHASE 4: Advanced decision-making
         self.decision_weights = {
-            'survival': random.uniform(0.6, 1.0),
-            'social': random.uniform(0.3, 0.8),
-            'achievement': random.uniform(0.2, 0.7),
-            'exploration': random.uniform(0.1, 0.6),
-            'altruism': random.uniform(0.1, 0.5)
+            'survival': self.random.uniform(0.6, 1.0),
+            'social': self.random.uniform(0.3, 0.8),
+            'achievement': self.random.uniform(0.2, 0.7),
+            'exploration': self.random.uniform(0.1, 0.6),
+            'altruism': self.random.uniform(0.1, 0.5)
         }
         
         # PHASE 4: Skills specialization and mastery
-        self.skill_preferences = random.choice(['generalist', 'farming', 'crafting', 'trading', 'learning', 'leadership'])
+        self.skill_preferences = self.random.choice(['generalist', 'farming', 'crafting', 'trading', 'learning', 'leadership'])
         self.mastery_level = 0             # Overall expertise level
-        self.teaching_ability = random.randint(0, 30)  # Can teach others
+        self.teaching_ability = self.random.randint(0, 30)  # Can teach others
         
         # PHASE 4: Advanced social dynamics
-        self.charisma = random.randint(10, 60)
-        self.empathy = random.randint(20, 80)
+        self.charisma = self.random.randint(10, 60)
+        self.empathy = self.random.randint(20, 80)
         self.social_network_size = 0
-        self.social_influence_radius = random.randint(2, 8)
+        self.social_influence_radius = self.random.randint(2, 8)
         
         # PHASE 4: Life stage and development
         self.life_stage = 'young_adult'    # young_adult, adult, mature, elder
@@ -146,7 +214,7 @@ class CitizenAgent(Agent):
         self.is_leader = False  # Leadership status
         self.trade_partners = set()  # Regular trading partners
         self.resources_owned = {'tools': 0, 'luxury': 0}  # Additional resources
-        self.leadership_ambition = random.randint(10, 90)  # Desire to lead
+        self.leadership_ambition = self.random.randint(10, 90)  # Desire to lead
 
     def generate_life_goals(self):
         """Generate personal life goals based on personality and skills"""
@@ -154,21 +222,21 @@ class CitizenAgent(Agent):
         
         # Goal generation based on personality
         if self.personality_scores['openness'] > 60:
-            goals.append(random.choice(['explore_new_lands', 'create_masterpiece', 'discover_technology']))
+            goals.append(self.random.choice(['explore_new_lands', 'create_masterpiece', 'discover_technology']))
         
         if self.personality_scores['conscientiousness'] > 60:
-            goals.append(random.choice(['become_leader', 'master_profession', 'build_legacy']))
+            goals.append(self.random.choice(['become_leader', 'master_profession', 'build_legacy']))
             
         if self.personality_scores['extraversion'] > 60:
-            goals.append(random.choice(['unite_community', 'expand_social_network', 'become_diplomat']))
+            goals.append(self.random.choice(['unite_community', 'expand_social_network', 'become_diplomat']))
             
         if self.personality_scores['agreeableness'] > 60:
-            goals.append(random.choice(['help_community', 'resolve_conflicts', 'teach_others']))
+            goals.append(self.random.choice(['help_community', 'resolve_conflicts', 'teach_others']))
         
         # Add survival/family goals
         goals.extend(['find_partner', 'raise_family', 'ensure_prosperity'])
         
-        return goals[:random.randint(2, 4)]  # Keep 2-4 goals
+        return goals[:self.random.randint(2, 4)]  # Keep 2-4 goals
 
     # PHASE 4: Advanced Psychological Methods
     
@@ -208,7 +276,7 @@ class CitizenAgent(Agent):
                 score += 20
             
             # Add randomness but personality-influenced
-            score += random.randint(0, 30)
+            score += self.random.randint(0, 30)
             scored_options.append((option, score))
         
         # Return highest scored option
@@ -216,6 +284,7 @@ class CitizenAgent(Agent):
     
     def add_memory(self, memory_type, content, importance=1):
         """Add experiences to memory systems"""
+        self.model.counters.add('memory_write')
         memory_entry = {
             'type': memory_type,
             'content': content,
@@ -237,6 +306,7 @@ class CitizenAgent(Agent):
     
     def update_relationship(self, agent_id, interaction_type, strength=1):
         """Track and update relationships with other agents"""
+        self.model.counters.add('relationship_upsert')
         if agent_id not in self.agent_relationships:
             self.agent_relationships[agent_id] = {
                 'friendship': 0,
@@ -314,7 +384,7 @@ class CitizenAgent(Agent):
             # Student learns based on their openness and our teaching
             if hasattr(student_agent, 'personality_scores'):
                 learning_rate = student_agent.personality_scores['openness'] / 100
-                skill_gain = teaching_effectiveness * learning_rate * random.uniform(0.5, 2.0)
+                skill_gain = teaching_effectiveness * learning_rate * self.random.uniform(0.5, 2.0)
                 
                 student_agent.skills[skill_type] = min(100, 
                     student_agent.skills.get(skill_type, 0) + skill_gain)
@@ -350,7 +420,7 @@ class CitizenAgent(Agent):
         if not self.life_goals:
             return
             
-        current_goal = random.choice(self.life_goals)
+        current_goal = self.random.choice(self.life_goals)
         
         if current_goal == 'become_leader' and not self.has_leadership_role:
             if self.complex_decision_making('pursue_leadership'):
@@ -358,9 +428,9 @@ class CitizenAgent(Agent):
                 self.update_emotions('achievement', 0.5)
                 
         elif current_goal == 'master_profession':
-            skill_to_improve = self.skill_preferences if self.skill_preferences != 'generalist' else random.choice(['farming', 'crafting', 'trading'])
+            skill_to_improve = self.skill_preferences if self.skill_preferences != 'generalist' else self.random.choice(['farming', 'crafting', 'trading'])
             if skill_to_improve in self.skills:
-                self.skills[skill_to_improve] += random.uniform(0.5, 2.0)
+                self.skills[skill_to_improve] += self.random.uniform(0.5, 2.0)
                 self.learn_from_experience(skill_to_improve, True)
                 
         elif current_goal == 'help_community':
@@ -381,7 +451,7 @@ class CitizenAgent(Agent):
         if not nearby_agents:
             return
             
-        for agent in random.sample(nearby_agents, min(3, len(nearby_agents))):
+        for agent in self.random.sample(nearby_agents, min(3, len(nearby_agents))):
             interaction_type = self.determine_interaction_type(agent)
             
             if interaction_type == 'mentoring' and hasattr(self, 'teaching_ability') and hasattr(agent, 'skills'):
@@ -409,7 +479,7 @@ class CitizenAgent(Agent):
                                agent != self]
             
             if potential_mentors:
-                mentor = random.choice(potential_mentors)
+                mentor = self.random.choice(potential_mentors)
                 if mentor.unique_id not in self.mentors:
                     self.mentors.append(mentor.unique_id)
                     self.update_relationship(mentor.unique_id, 'positive', 3)
@@ -423,7 +493,7 @@ class CitizenAgent(Agent):
                                 agent.life_stage == 'young_adult' and 
                                 agent != self]
             
-            for student in random.sample(potential_students, min(2, len(potential_students))):
+            for student in self.random.sample(potential_students, min(2, len(potential_students))):
                 if hasattr(self, 'skills') and self.skills:
                     best_skill = max(self.skills.items(), key=lambda x: x[1])
                     if best_skill[1] > 30:  # Only teach if we're good at it
@@ -532,7 +602,7 @@ class CitizenAgent(Agent):
                        (agent.health < 30 or agent.food < 10) and agent != self]
         
         if needy_agents and hasattr(self, 'food') and self.food > 20:
-            helped_agent = random.choice(needy_agents)
+            helped_agent = self.random.choice(needy_agents)
             # Give food to help
             help_amount = min(5, self.food - 15)  # Keep some for ourselves
             self.food -= help_amount
@@ -552,7 +622,7 @@ class CitizenAgent(Agent):
                            self.get_distance_to_agent(agent) <= 5]
         
         if potential_friends:
-            new_friend = random.choice(potential_friends)
+            new_friend = self.random.choice(potential_friends)
             # Initiate friendly interaction
             self.update_relationship(new_friend.unique_id, 'positive', 1)
             if hasattr(new_friend, 'update_relationship'):
@@ -577,31 +647,32 @@ class CitizenAgent(Agent):
         """Consider moving to a better location"""
         # This would involve complex spatial analysis
         # For now, just move to a random nearby location
-        if random.random() < 0.1:  # 10% chance to relocate
+        if self.random.random() < 0.1:  # 10% chance to relocate
             x, y = self.pos
-            new_x = max(0, min(self.model.grid.width - 1, x + random.randint(-3, 3)))
-            new_y = max(0, min(self.model.grid.height - 1, y + random.randint(-3, 3)))
+            new_x = max(0, min(self.model.grid.width - 1, x + self.random.randint(-3, 3)))
+            new_y = max(0, min(self.model.grid.height - 1, y + self.random.randint(-3, 3)))
             self.model.grid.move_agent(self, (new_x, new_y))
             self.add_memory('relocation', f'Moved to better location ({new_x}, {new_y})', 2)
     
     def work_on_masterpiece(self):
         """Work on creating a cultural masterpiece"""
         if hasattr(self, 'artistic_skill') and self.artistic_skill > 30:
-            self.artistic_skill += random.uniform(0.5, 2.0)
-            if random.random() < 0.05:  # 5% chance to complete masterpiece
+            self.artistic_skill += self.random.uniform(0.5, 2.0)
+            if self.random.random() < 0.05:  # 5% chance to complete masterpiece
                 if hasattr(self.model, 'art_works'):
                     self.model.art_works += 1
                 self.cultural_contributions += 1
                 self.update_emotions('achievement', 3)
                 self.add_memory('masterpiece', 'Completed a cultural masterpiece', 5)
                 total_art = getattr(self.model, 'art_works', 0)
-                print(f"🎨 Agent {self.unique_id} created a masterpiece! (Total artworks: {total_art})")
+                self.model.events.emit('culture', "🎨 Agent {agent_id} created a masterpiece! (Total artworks: {total})", INFO,
+                                       agents=(self.unique_id,), agent_id=self.unique_id, total=total_art)
     
     def focus_on_research(self):
         """Focus on advanced research and discovery"""
         if hasattr(self, 'research_focus') and self.research_focus != 'none':
             if hasattr(self, 'research_progress'):
-                self.research_progress += random.uniform(1, 3)
+                self.research_progress += self.random.uniform(1, 3)
                 if self.research_progress > 50:
                     # Research breakthrough
                     if hasattr(self.model, 'research_projects'):
@@ -609,13 +680,14 @@ class CitizenAgent(Agent):
                     self.research_progress = 0
                     self.update_emotions('achievement', 3)
                     self.add_memory('research_breakthrough', f'Breakthrough in {self.research_focus}', 5)
-                    print(f"🔬 Agent {self.unique_id} achieved research breakthrough in {self.research_focus}!")
+                    self.model.events.emit('research', "🔬 Agent {agent_id} achieved research breakthrough in {focus}!", INFO,
+                                           agents=(self.unique_id,), agent_id=self.unique_id, focus=self.research_focus)
         
         # Social system
         self.friendships = {}  # {agent_id: friendship_score}
         
         # Family & Community system
-        self.gender = random.choice(['male', 'female'])
+        self.gender = self.random.choice(['male', 'female'])
         self.family_id = None  # None if no family, otherwise shared ID
         self.partner_id = None  # ID of partner agent
         self.children = []  # List of child agent IDs
@@ -626,20 +698,78 @@ class CitizenAgent(Agent):
         # State tracking
         self.is_dead = False
         
+    # Behaviors run every step by a living citizen, in this order
+    BEHAVIORS = (
+        # Skill development and profession management
+        'develop_skills',
+        'update_profession',
+        # PHASE 2: Enhanced social dynamics
+        'update_influence_and_reputation',
+        'attempt_trading',
+        'consider_leadership_actions',
+        # PHASE 3: Advanced civilization behaviors
+        'engage_in_cultural_activities',
+        'conduct_research_activities',
+        'participate_in_conflict_resolution',
+        'develop_diplomatic_relations',
+        # PHASE 4: Advanced psychological behaviors
+        'update_life_stage',
+        'pursue_life_goals',
+        'engage_in_complex_social_interactions',
+        'demonstrate_teaching_and_learning',
+        'make_strategic_decisions',
+        # Family management
+        'manage_family',
+        # Choose action based on current state and personality
+        'choose_action',
+        # Check for social interactions at current location
+        'check_for_social_interactions',
+        # Community influence
+        'apply_community_influence',
+    )
+    
+    # Behaviors that act on other citizens or the grid; two-phase activation
+    # (activation.py) decides them against a snapshot and applies them afterwards
+    INTENT_BEHAVIORS = (
+        'attempt_trading',
+        'demonstrate_teaching_and_learning',
+        'choose_action',
+        'check_for_social_interactions',
+    )
+    LOCAL_BEHAVIORS = tuple(sorted(set(BEHAVIORS) - set(INTENT_BEHAVIORS), key=BEHAVIORS.index))
+    
+    # Default cadence per behavior, {name: {'every': k, 'offset': o, 'enabled': bool}};
+    # unlisted behaviors run every step. Overridden by CityModel(behaviors=...), see pipeline.py
+    BEHAVIOR_CADENCE = {
+        'update_profession': {'every': 20},  # Avoid constant profession changes
+    }
+    
+    @property
+    def personality_traits(self):
+        return self._personality_traits
+    
+    @personality_traits.setter
+    def personality_traits(self, traits):
+        """Assigning traits rebuilds the behavior profile and resets the exploration rate."""
+        self._personality_traits = traits
+        self.profile = BehaviorProfile.for_traits(traits)
+        self.exploration_rate = self.profile.exploration_rate
+    
     def step(self):
-        """Execute one step of the agent."""
+        """Execute one step of the agent; return the behaviors that ran (None if it could not act)."""
+        if self.update_vitals():
+            model = self.model
+            names = model.behavior_schedule.due(model.step_count, self.unique_id)
+            model.metrics.run(self, names, 'agent')
+            return names
+        return None
+    
+    def update_vitals(self):
+        """Age, needs and health; return whether the agent is alive to act this step."""
         if self.is_dead:
-            return  # Dead agents don't act
+            return False  # Dead agents don't act
         
-        # Increase age
-        self.age += 1
-        
-        # Increase hunger and decrease energy each step (REDUCED RATES)
-        self.hunger = min(self.max_hunger, self.hunger + random.randint(1, 2))  # Was 1-3
-        self.energy = max(0, self.energy - random.randint(0, 1))  # Was 1-2
-        
-        # Increase social need over time (REDUCED RATE)
-        self.social = min(self.max_social, self.social + random.randint(0, 1))  # Was 1-2
+        self.update_needs()
         
         # Health management
         self.update_health()
@@ -647,42 +777,20 @@ class CitizenAgent(Agent):
         # Check if agent dies
         if self.health <= 0:
             self.die()
-            return
-        
-        # Skill development and profession management
-        self.develop_skills()
-        self.update_profession()
-        
-        # PHASE 2: Enhanced social dynamics
-        self.update_influence_and_reputation()
-        self.attempt_trading()
-        self.consider_leadership_actions()
-        
-        # PHASE 3: Advanced civilization behaviors
-        self.engage_in_cultural_activities()
-        self.conduct_research_activities()
-        self.participate_in_conflict_resolution()
-        self.develop_diplomatic_relations()
-        
-        # PHASE 4: Advanced psychological behaviors
-        self.update_life_stage()
-        self.pursue_life_goals()
-        self.engage_in_complex_social_interactions()
-        self.demonstrate_teaching_and_learning()
-        self.make_strategic_decisions()
-        
-        # Family management
-        self.manage_family()
-        
-        # Choose action based on current state and personality
-        self.choose_action()
-        
+            return False
+        return True
+    
+    def update_needs(self):
+        """Age and basic needs change every step."""
+        # Increase age
+        self.age += 1
         
-        # Check for social interactions at current location
-        self.check_for_social_interactions()
+        # Increase hunger and decrease energy each step (REDUCED RATES)
+        self.hunger = min(self.max_hunger, self.hunger + self.random.randint(1, 2))  # Was 1-3
+        self.energy = max(0, self.energy - self.random.randint(0, 1))  # Was 1-2
         
-        # Community influence
-        self.apply_community_influence()
+        # Increase social need over time (REDUCED RATE)
+        self.social = min(self.max_social, self.social + self.random.randint(0, 1))  # Was 1-2
     
     def update_health(self):
         """Update health based on hunger and energy levels (LESS HARSH)."""
@@ -690,30 +798,24 @@ class CitizenAgent(Agent):
         
         # Lose health if very hungry (REDUCED PENALTY)
         if self.hunger >= self.health_danger_hunger:
-            health_loss += random.randint(0, 2)  # Was 1-3
+            health_loss += self.random.randint(0, 2)  # Was 1-3
         
         # Lose health if very tired (REDUCED PENALTY)
         if self.energy <= self.health_danger_energy:
-            health_loss += random.randint(0, 1)  # Was 1-2
+            health_loss += self.random.randint(0, 1)  # Was 1-2
         
         self.health = max(0, self.health - health_loss)
     
     def die(self):
         """Mark agent as dead."""
         self.is_dead = True
-        print(f"Agent {self.unique_id} has died! (Hunger: {self.hunger}, Energy: {self.energy}, Coins: {self.coins}) [Traits: {self.personality_traits}]")
+        self.model.events.emit('death', "Agent {agent_id} has died! (Hunger: {hunger}, Energy: {energy}, Coins: {coins}) [Traits: {traits}]", INFO,
+                               agents=(self.unique_id,), agent_id=self.unique_id, hunger=self.hunger,
+                               energy=self.energy, coins=self.coins, traits=self.personality_traits, age=self.age)
         
     def get_action_priorities(self):
         """Get action priorities based on personality traits."""
-        if 'greedy' in self.personality_traits:
-            return ['work', 'food', 'sleep', 'social', 'learning']
-        elif 'friendly' in self.personality_traits:
-            return ['social', 'food', 'work', 'sleep', 'learning']
-        elif 'lazy' in self.personality_traits:
-            return ['sleep', 'food', 'work', 'social', 'learning']
-        else:
-            # Default/explorer personality
-            return ['food', 'work', 'sleep', 'social', 'learning']
+        return self.profile.priorities
     
     def seek_social_interaction(self):
         """Look for other agents to socialize with."""
@@ -782,7 +884,7 @@ class CitizenAgent(Agent):
             self.family_survival_time += 1
             
             # Check if it's time to have children (after 30 steps, was 50)
-            if self.family_survival_time >= 30 and len(self.children) == 0 and random.random() < 0.15:  # Was 0.1, higher chance
+            if self.family_survival_time >= 30 and len(self.children) == 0 and self.random.random() < 0.15:  # Was 0.1, higher chance
                 self.try_reproduce()
         else:
             # Not in a family, look for a partner
@@ -816,7 +918,9 @@ class CitizenAgent(Agent):
                             self.family_survival_time = 0
                             partner.family_survival_time = 0
                             
-                            print(f"Family formed: Agent {self.unique_id} + Agent {partner.unique_id}")
+                            self.model.events.emit('family', "Family formed: Agent {agent_id} + Agent {partner_id}", INFO,
+                                                   agents=(self.unique_id, partner.unique_id), agent_id=self.unique_id,
+                                                   partner_id=partner.unique_id, family_id=family_id)
                             break
     
     def try_reproduce(self):
@@ -828,41 +932,40 @@ class CitizenAgent(Agent):
             if child:
                 self.children.append(child.unique_id)
                 partner.children.append(child.unique_id)
-                print(f"Child born! Parents: {self.unique_id} & {partner.unique_id}, Child: {child.unique_id}")
+                self.model.events.emit('birth', "Child born! Parents: {parent1} & {parent2}, Child: {child}", INFO,
+                                       agents=(child.unique_id, self.unique_id, partner.unique_id),
+                                       parent1=self.unique_id, parent2=partner.unique_id, child=child.unique_id)
     
     def develop_skills(self):
         """Develop skills based on actions and personality."""
         # Base skill development rate
-        base_rate = 0.1
+        base_rate = BehaviorProfile.BASE_SKILL_RATE
         
         # Personality influences skill development
-        if 'greedy' in self.personality_traits:
-            self.trading = min(100, self.trading + base_rate * 2)
-        if 'friendly' in self.personality_traits:
-            self.learning = min(100, self.learning + base_rate * 1.5)
-        if 'lazy' in self.personality_traits:
+        profile = self.profile
+        if profile.greedy:
+            self.trading = min(100, self.trading + profile.TRADING_RATE)
+        if profile.friendly:
+            self.learning = min(100, self.learning + profile.LEARNING_RATE)
+        if profile.lazy:
             # Lazy agents develop skills slower but still learn
             all_skills = [self.farming, self.crafting, self.trading, self.combat, self.learning]
             slowest_skill = min(all_skills)
             if slowest_skill == self.farming:
-                self.farming = min(100, self.farming + base_rate * 0.8)
+                self.farming = min(100, self.farming + profile.WEAKEST_SKILL_RATE)
             elif slowest_skill == self.crafting:
-                self.crafting = min(100, self.crafting + base_rate * 0.8)
-        if 'explorer' in self.personality_traits:
-            self.combat = min(100, self.combat + base_rate * 1.5)
+                self.crafting = min(100, self.crafting + profile.WEAKEST_SKILL_RATE)
+        if profile.explorer:
+            self.combat = min(100, self.combat + profile.COMBAT_RATE)
         
         # Random general skill improvement
-        if random.random() < 0.3:
-            skill_choice = random.choice(['farming', 'crafting', 'trading', 'combat', 'learning'])
+        if self.random.random() < 0.3:
+            skill_choice = self.random.choice(['farming', 'crafting', 'trading', 'combat', 'learning'])
             current_skill = getattr(self, skill_choice)
             setattr(self, skill_choice, min(100, current_skill + base_rate))
     
     def update_profession(self):
-        """Update profession based on highest skills and opportunities."""
-        # Only update profession every 20 steps to avoid constant changes
-        if self.age % 20 != 0:
-            return
-            
+        """Update profession based on highest skills and opportunities (every 20 steps, see BEHAVIOR_CADENCE)."""
         skills = {
             'farmer': self.farming,
             'craftsman': self.crafting,
@@ -893,7 +996,9 @@ class CitizenAgent(Agent):
             self.work_experience = 0  # Reset experience in new profession
             
             if old_profession != best_profession and old_profession is not None:
-                print(f"Agent {self.unique_id} changed profession from {old_profession} to {best_profession}")
+                self.model.events.emit('profession', "Agent {agent_id} changed profession from {old} to {new}", INFO,
+                                       agents=(self.unique_id,), agent_id=self.unique_id,
+                                       old=old_profession, new=best_profession)
     
     def apply_community_influence(self):
         """Apply community-based behavioral modifications."""
@@ -904,17 +1009,17 @@ class CitizenAgent(Agent):
             # Community influence based on dominant personality traits
             if community['dominant_trait'] == 'greedy':
                 # Greedy communities increase competition and stealing
-                if 'greedy' not in self.personality_traits and random.random() < 0.1:
+                if not self.profile.greedy and self.random.random() < 0.1:
                     # Non-greedy agents become more selfish in greedy communities
                     self.coins += 1  # Small selfish bonus
             elif community['dominant_trait'] == 'friendly':
                 # Friendly communities encourage cooperation
-                if 'friendly' in self.personality_traits and random.random() < 0.2:
+                if self.profile.friendly and self.random.random() < 0.2:
                     self.share_resources_with_family()
     
     def share_resources_with_family(self):
         """Share resources with family members if friendly."""
-        if self.family_id is None or 'friendly' not in self.personality_traits:
+        if self.family_id is None or not self.profile.friendly:
             return
             
         partner = self.model.get_agent_by_id(self.partner_id)
@@ -934,12 +1039,13 @@ class CitizenAgent(Agent):
     def choose_action(self):
         """Decide what action to take based on current needs and personality."""
         # Check if we should explore randomly (especially for explorers)
-        if random.random() < self.exploration_rate:
+        if self.random.random() < self.exploration_rate:
             self.move_randomly()
             return
         
         # Get decision priorities based on personality
-        priorities = self.get_action_priorities()
+        priorities = self.profile.priorities
+        greedy = self.profile.greedy
         
         # Execute actions based on priority order
         for action in priorities:
@@ -950,7 +1056,7 @@ class CitizenAgent(Agent):
                 else:
                     break
             elif action == 'food' and self.hunger >= self.hunger_threshold:
-                if 'greedy' in self.personality_traits and self.coins < 3:
+                if greedy and self.coins < 3:
                     # Greedy agents prefer jobs even when hungry if low on coins
                     if self.seek_job():
                         break
@@ -962,7 +1068,7 @@ class CitizenAgent(Agent):
                     if not self.seek_job():
                         self.seek_food()  # Will steal if necessary
                     break
-            elif action == 'work' and (self.coins < 3 or ('greedy' in self.personality_traits and self.coins < 8)):
+            elif action == 'work' and (self.coins < 3 or (greedy and self.coins < 8)):
                 # Try profession-specific buildings first, then regular jobs
                 if not self.seek_profession_building() and not self.seek_job():
                     pass
@@ -971,13 +1077,13 @@ class CitizenAgent(Agent):
             elif action == 'sleep' and self.energy <= self.energy_threshold:
                 self.seek_house()
                 break
-            elif action == 'learning' and random.random() < 0.3:
+            elif action == 'learning' and self.random.random() < 0.3:
                 # Occasional learning-focused behavior
                 if self.seek_school():
                     break
         else:
             # No urgent needs, consider skill development or move randomly
-            if random.random() < 0.4:
+            if self.random.random() < 0.4:
                 # 40% chance to seek skill development when no urgent needs
                 if not self.seek_skill_development_building():
                     self.move_randomly()
@@ -1223,7 +1329,7 @@ class CitizenAgent(Agent):
             self.pos, moore=True, include_center=False
         )
         if possible_moves:
-            new_position = random.choice(possible_moves)
+            new_position = self.random.choice(possible_moves)
             self.model.grid.move_agent(self, new_position)
     
     def interact_with_environment(self):
@@ -1279,7 +1385,7 @@ class CitizenAgent(Agent):
                         self.trading = min(100, self.trading + 1.0)  # Develop trading skill
                         
                         # Chance to get better deals based on trading skill
-                        if random.random() < (self.trading / 100) * 0.3:
+                        if self.random.random() < (self.trading / 100) * 0.3:
                             self.coins += 2  # Successful trade profit
                     break
                     
@@ -1290,7 +1396,7 @@ class CitizenAgent(Agent):
                         self.crafting = min(100, self.crafting + 1.5)  # Develop crafting skill
                         
                         # Chance to create valuable items based on crafting skill
-                        if random.random() < (self.crafting / 100) * 0.4:
+                        if self.random.random() < (self.crafting / 100) * 0.4:
                             self.coins += 4  # Sell crafted items
                     break
                     
@@ -1300,8 +1406,9 @@ class CitizenAgent(Agent):
                     self.health = min(100, self.health + 2)  # Slight health boost from peace
                     
                     # Influence cultural values (simplified)
-                    if random.random() < 0.1:
-                        print(f"Agent {self.unique_id} found peace at the temple")
+                    if self.random.random() < 0.1:
+                        self.model.events.emit('culture', "Agent {agent_id} found peace at the temple", DEBUG,
+                                               agents=(self.unique_id,), agent_id=self.unique_id)
                     break
                     
                 elif obj.type == 'school':
@@ -1311,8 +1418,8 @@ class CitizenAgent(Agent):
                         self.learning = min(100, self.learning + 2.0)  # Significant learning boost
                         
                         # Chance to improve other skills through education
-                        if random.random() < (self.learning / 100) * 0.3:
-                            skill_to_improve = random.choice(['farming', 'crafting', 'trading', 'combat'])
+                        if self.random.random() < (self.learning / 100) * 0.3:
+                            skill_to_improve = self.random.choice(['farming', 'crafting', 'trading', 'combat'])
                             current_skill = getattr(self, skill_to_improve)
                             setattr(self, skill_to_improve, min(100, current_skill + 1.0))
                     break
@@ -1337,16 +1444,16 @@ class CitizenAgent(Agent):
         self.influence = min(100, base_influence)
         
         # Reputation changes based on actions and social interactions
-        if random.random() < 0.1:  # 10% chance per step
+        if self.random.random() < 0.1:  # 10% chance per step
             # Random reputation events
-            if 'friendly' in self.personality_traits:
+            if self.profile.friendly:
                 self.reputation = min(100, self.reputation + 1)
-            elif 'greedy' in self.personality_traits and random.random() < 0.3:
+            elif self.profile.greedy and self.random.random() < 0.3:
                 self.reputation = max(0, self.reputation - 0.5)
     
     def attempt_trading(self):
         """Attempt to trade with other agents (PHASE 2)."""
-        if self.profession != 'merchant' and random.random() > 0.2:
+        if self.profession != 'merchant' and self.random.random() > 0.2:
             return  # Non-merchants trade less frequently
         
         # Find potential trade partners nearby
@@ -1366,7 +1473,7 @@ class CitizenAgent(Agent):
                     nearby_agents.append(agent)
         
         if nearby_agents:
-            trade_partner = random.choice(nearby_agents)
+            trade_partner = self.random.choice(nearby_agents)
             self.execute_trade(trade_partner)
     
     def execute_trade(self, partner):
@@ -1376,7 +1483,7 @@ class CitizenAgent(Agent):
             # Basic coin exchange with skill bonus
             trade_skill_bonus = (self.trading + partner.trading) * 0.01
             
-            if random.random() < 0.5 + trade_skill_bonus:
+            if self.random.random() < 0.5 + trade_skill_bonus:
                 # Successful trade
                 trade_amount = min(3, self.coins // 3, partner.coins // 3)
                 
@@ -1395,26 +1502,29 @@ class CitizenAgent(Agent):
                 # Track global trade volume
                 self.model.trade_volume += trade_amount * 2
                 
-                if random.random() < 0.1:  # 10% chance to announce
-                    print(f"💰 Trade: Agent {self.unique_id} ⟷ Agent {partner.unique_id} ({trade_amount} coins each)")
+                if self.random.random() < 0.1:  # 10% chance to announce
+                    self.model.events.emit('trade', "💰 Trade: Agent {agent_id} ⟷ Agent {partner_id} ({amount} coins each)", DEBUG,
+                                           agents=(self.unique_id, partner.unique_id), agent_id=self.unique_id,
+                                           partner_id=partner.unique_id, amount=trade_amount)
     
     def consider_leadership_actions(self):
         """Consider taking leadership actions if agent is ambitious (PHASE 2)."""
         if not self.is_leader and self.leadership_ambition > 70:
             # Try to become a leader
             if (self.influence > 30 and self.reputation > 60 and 
-                len(self.friendships) > 5 and random.random() < 0.05):
+                len(self.friendships) > 5 and self.random.random() < 0.05):
                 
                 # Challenge for leadership or start new community
                 if len(self.model.leaders) < 3:  # Max 3 leaders
                     self.is_leader = True
                     community_id = f"new_community_{self.unique_id}"
                     self.model.leaders[community_id] = self.unique_id
-                    print(f"👑 Agent {self.unique_id} rises to leadership!")
+                    self.model.events.emit('leadership', "👑 Agent {agent_id} rises to leadership!", NOTICE,
+                                           agents=(self.unique_id,), agent_id=self.unique_id)
         
         elif self.is_leader:
             # Leaders take community actions
-            if random.random() < 0.2:  # 20% chance per step
+            if self.random.random() < 0.2:  # 20% chance per step
                 self.perform_leadership_action()
     
     def perform_leadership_action(self):
@@ -1424,8 +1534,8 @@ class CitizenAgent(Agent):
                     if (isinstance(a, CitizenAgent) and not a.is_dead and 
                         a.unique_id in self.friendships and self.friendships[a.unique_id] > 70)]
         
-        if followers and random.random() < 0.3:
-            action_type = random.choice(['inspire', 'organize', 'mediate'])
+        if followers and self.random.random() < 0.3:
+            action_type = self.random.choice(['inspire', 'organize', 'mediate'])
             
             if action_type == 'inspire':
                 # Boost follower skills
@@ -1455,11 +1565,12 @@ class CitizenAgent(Agent):
         """Participate in cultural development and artistic creation."""
         # Artists create artworks when they have high artistic skill and good conditions
         if (self.artistic_skill > 50 or self.profession == 'merchant') and self.energy > 60:
-            if random.random() < 0.02:  # 2% chance per step
+            if self.random.random() < 0.02:  # 2% chance per step
                 self.cultural_contributions += 1
                 self.model.art_works += 1
                 self.artistic_skill = min(100, self.artistic_skill + 2)
-                print(f"🎨 Agent {self.unique_id} creates art! (Skill: {self.artistic_skill})")
+                self.model.events.emit('culture', "🎨 Agent {agent_id} creates art! (Skill: {skill})", INFO,
+                                       agents=(self.unique_id,), agent_id=self.unique_id, skill=self.artistic_skill)
                 
                 # Art creation boosts social satisfaction
                 self.social = max(0, self.social - 20)
@@ -1481,23 +1592,24 @@ class CitizenAgent(Agent):
             # Choose research focus if not set
             if self.research_focus == 'none':
                 available_topics = ['medicine', 'engineering', 'philosophy', 'astronomy']
-                self.research_focus = random.choice(available_topics)
+                self.research_focus = self.random.choice(available_topics)
             
             # Make research progress
-            if random.random() < 0.1:  # 10% chance per step for scholars
+            if self.random.random() < 0.1:  # 10% chance per step for scholars
                 self.research_progress += self.learning // 10
                 self.learning = min(100, self.learning + 1)
                 
                 # Significant discovery chance
                 if self.research_progress > 100:
                     self.model.scientific_discoveries += 1
-                    print(f"🔬 Agent {self.unique_id} makes breakthrough in {self.research_focus}!")
+                    self.model.events.emit('research', "🔬 Agent {agent_id} makes breakthrough in {focus}!", INFO,
+                                           agents=(self.unique_id,), agent_id=self.unique_id, focus=self.research_focus)
                     self.research_progress = 0
                     self.reputation = min(100, self.reputation + 10)
                     
                     # Reset to new research topic
                     topics = ['medicine', 'engineering', 'philosophy', 'astronomy', 'mathematics']
-                    self.research_focus = random.choice(topics)
+                    self.research_focus = self.random.choice(topics)
     
     def participate_in_conflict_resolution(self):
         """Mediate conflicts and promote peace."""
@@ -1505,10 +1617,10 @@ class CitizenAgent(Agent):
         if (self.diplomatic_skill > 40 and self.political_alignment == 'peaceful' and 
             len(self.model.conflicts) > 0):
             
-            if random.random() < 0.05:  # 5% chance per step
+            if self.random.random() < 0.05:  # 5% chance per step
                 # Try to mediate an ongoing conflict
-                conflict = random.choice(self.model.conflicts)
-                mediation_success = self.diplomatic_skill + random.randint(1, 30)
+                conflict = self.random.choice(self.model.conflicts)
+                mediation_success = self.diplomatic_skill + self.random.randint(1, 30)
                 
                 if mediation_success > 70:
                     # Successful mediation!
@@ -1517,7 +1629,8 @@ class CitizenAgent(Agent):
                     self.conflicts_mediated += 1
                     self.diplomatic_skill = min(100, self.diplomatic_skill + 3)
                     self.reputation = min(100, self.reputation + 5)
-                    print(f"🕊️ Agent {self.unique_id} successfully mediates conflict!")
+                    self.model.events.emit('conflict', "🕊️ Agent {agent_id} successfully mediates conflict!", INFO,
+                                           agents=(self.unique_id,), agent_id=self.unique_id)
                     
                     # Boost health and social satisfaction from helping others
                     self.health = min(self.max_health, self.health + 5)
@@ -1539,12 +1652,12 @@ class CitizenAgent(Agent):
                     potential_partners.append(agent)
             
             # Form alliance with compatible agent
-            if potential_partners and random.random() < 0.01:  # Reduced chance for stability
-                partner = random.choice(potential_partners)
+            if potential_partners and self.random.random() < 0.01:  # Reduced chance for stability
+                partner = self.random.choice(potential_partners)
                 compatibility = (
                     (self.political_alignment == partner.political_alignment) * 30 +
                     (abs(self.reputation - partner.reputation) < 20) * 20 +
-                    random.randint(1, 50)
+                    self.random.randint(1, 50)
                 )
                 
                 if compatibility > 70:
@@ -1552,8 +1665,10 @@ class CitizenAgent(Agent):
                     self.alliance_preferences[partner.unique_id] = compatibility
                     partner.alliance_preferences[self.unique_id] = compatibility
                     
-                    # Simple alliance tracking - just print success
-                    print(f"🤝 Personal alliance formed between Agent {self.unique_id} and {partner.unique_id}")
+                    # Simple alliance tracking - just report success
+                    self.model.events.emit('diplomacy', "🤝 Personal alliance formed between Agent {agent_id} and {partner_id}", INFO,
+                                           agents=(self.unique_id, partner.unique_id), agent_id=self.unique_id,
+                                           partner_id=partner.unique_id, compatibility=compatibility)
 
 
 class Food(Agent):
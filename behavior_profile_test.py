@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Test the per-citizen behavior profiles.
+Every trait combination must map to one shared profile, rebuilt whenever a
+citizen's traits are assigned, and profiles must survive a checkpoint.
+"""
+
+import pickle
+
+from model import CityModel
+from agent import CitizenAgent, BehaviorProfile
+from events import EventBus
+
+
+def make_model():
+    return CityModel(width=10, height=10, num_agents=6, num_food=20, num_houses=5, num_jobs=8,
+                     event_bus=EventBus(enabled=False), seed=7)
+
+
+def test_behavior_profiles():
+    """Citizens and children carry the shared profile of their traits, rebuilt when traits change."""
+    print("Testing behavior profiles...")
+    model = make_model()
+    agents = [a for a in model.agents if isinstance(a, CitizenAgent)]
+    child = model.create_child_agent(agents[0], agents[1])
+    for agent in agents + [child]:
+        assert agent.profile is BehaviorProfile.for_traits(agent.personality_traits)
+    assert set(child.personality_traits) <= set(agents[0].personality_traits + agents[1].personality_traits)
+
+    child.personality_traits = ['lazy', 'explorer']
+    assert child.profile.lazy and child.profile.explorer and not child.profile.greedy
+    assert child.get_action_priorities()[0] == 'sleep'
+    assert child.exploration_rate == 0.4
+    print(f"✓ {len(agents) + 1} profiles match their traits; reassigned traits rebuilt the profile")
+
+
+def test_profiles_by_trait():
+    """Trait-dependent fields follow the traits; skill growth rates are shared class constants."""
+    print("Testing profile fields...")
+    greedy_friendly = BehaviorProfile.for_traits(['greedy', 'friendly'])
+    assert greedy_friendly is BehaviorProfile.for_traits(['friendly', 'greedy'])
+    assert greedy_friendly.priorities[0] == 'work' and greedy_friendly.leadership_trait == 'greedy'
+    explorer = BehaviorProfile.for_traits(['explorer'])
+    assert explorer.priorities[0] == 'food' and explorer.exploration_rate == 0.4
+    assert explorer.leadership_trait == 'explorer'
+    assert BehaviorProfile.for_traits([]).leadership_trait is None
+    assert 'TRADING_RATE' not in vars(greedy_friendly)
+    assert BehaviorProfile.TRADING_RATE == 2 * BehaviorProfile.BASE_SKILL_RATE
+
+    citizen = next(a for a in make_model().agents if isinstance(a, CitizenAgent))
+    citizen.personality_traits = ['greedy']
+    trading = citizen.trading
+    citizen.develop_skills()
+    assert citizen.trading >= trading + BehaviorProfile.TRADING_RATE
+    assert pickle.loads(pickle.dumps(citizen.profile)) is citizen.profile
+    print("✓ Priorities, exploration and leadership follow the traits; profiles unpickle to the shared instance")
+
+
+if __name__ == "__main__":
+    test_behavior_profiles()
+    test_profiles_by_trait()
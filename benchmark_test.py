@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test the benchmark suite.
+Results must have the documented shape and comparisons must flag slowdowns.
+"""
+
+import json
+import os
+import tempfile
+
+from benchmark import (SCENARIOS, CHECKPOINT_TARGET_PER_100K, percentile, run_scenario, time_checkpoint,
+                       git_commit, compare, main)
+from headless import build_model
+
+
+def test_percentile():
+    """Nearest-rank percentiles of a sorted list."""
+    print("Testing percentiles...")
+    values = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+    assert percentile(values, 0.5) == 5 and percentile(values, 0.9) == 9 and percentile(values, 0.99) == 10
+    assert percentile([7], 0.01) == 7 and percentile([], 0.5) == 0.0
+    print("✓ p50/p90/p99 by nearest rank")
+
+
+def test_scenario_result():
+    """A scenario run reports startup, throughput and latency percentiles."""
+    print("Testing a tiny scenario...")
+    result = run_scenario('tiny', steps=3, warmup=0)
+    assert result['params'] == SCENARIOS['tiny'][0] and result['steps'] == 3
+    latency = result['latency_ms']
+    assert 0 < latency['p50'] <= latency['p99'] <= latency['max']
+    assert abs(result['steps_per_second'] - 3000 / (latency['mean'] * 3)) < 1e-6
+    checkpoint = result['checkpoint']
+    assert checkpoint['bytes'] > 0 and checkpoint['save_seconds'] > 0 and checkpoint['load_seconds'] > 0
+    print(f"✓ tiny: {result['steps_per_second']:.1f} steps/sec")
+
+
+def test_checkpoint_timing():
+    """Saving and loading a medium city stays within the checkpoint target per 100k agents."""
+    print("Testing checkpoint timing...")
+    model = build_model(SCENARIOS['medium'][0], seed=1)
+    timing = time_checkpoint(model)
+    assert timing['agents'] == len(model.agents)
+    assert abs(timing['save_per_100k'] - timing['save_seconds'] * 100000 / timing['agents']) < 1e-9
+    assert timing['save_per_100k'] < CHECKPOINT_TARGET_PER_100K, timing
+    assert timing['load_per_100k'] < CHECKPOINT_TARGET_PER_100K, timing
+    print(f"✓ {timing['agents']} agents: save {timing['save_per_100k']:.2f}s, "
+          f"load {timing['load_per_100k']:.2f}s per 100k agents")
+
+
+def test_commit_and_compare():
+    """The commit is found from any working directory; a slowdown beyond the threshold is a regression."""
+    print("Testing commit detection and comparison...")
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            commit = git_commit()
+        finally:
+            os.chdir(cwd)
+
+        def report(speed):
+            return {'meta': {'commit': commit},
+                    'results': [{'scenario': 'tiny', 'steps_per_second': speed,
+                                 'latency_ms': {'p99': 1000 / speed}, 'peak_rss_mb': 100}]}
+
+        assert compare(report(100), report(95)) == []
+        assert compare(report(100), report(80)) == ['tiny']
+        paths = []
+        for name, speed in (('before', 100), ('after', 80)):
+            paths.append(os.path.join(tmp, f'{name}.json'))
+            with open(paths[-1], 'w', encoding='utf-8') as f:
+                json.dump(report(speed), f)
+        assert main(['--compare', *paths]) == 1
+        assert main(['--compare', *paths, '--threshold', '0.25']) == 0
+    assert commit is None or commit  # None only outside a git checkout
+    print(f"✓ Commit {commit}, 20% slowdown flagged")
+
+
+if __name__ == "__main__":
+    test_percentile()
+    test_scenario_result()
+    test_checkpoint_timing()
+    test_commit_and_compare()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+AI City Simulation - What-if Branches
+
+Runs one city forward under several scenarios (policies, weather regimes,
+technology unlocks, ...) starting from the same state. The base model is
+serialized once with checkpoint.dumps(); every worker process receives that
+compact snapshot a single time and restores a fresh CityModel from it for
+each branch, so the base state is never deep-copied per branch.
+
+Each branch gets its own random stream (derived from the base seed and the
+branch name) and a dict of model attribute overrides:
+
+    branches = {
+        'baseline': {},
+        'drought': {'weather': 'drought', 'global_resources': {'food': 20}},
+        'crafts': {'technologies': ['agriculture', 'craftsmanship']},
+        'taxes': {'policies': ['redistribute_wealth']},
+    }
+    results = run_branches(model, branches, steps=500)
+
+Three overrides go through the model instead of setting the attribute:
+`technologies` are discovered with CityModel.discover_technology (level and
+benefits included, prerequisites first), `weather` is pinned for the whole
+branch (CityModel.pin_weather) and `policies` (effect names or policy
+dicts) are enacted with CityModel.enact_policy.
+
+Usage:
+    python branches.py --checkpoint city.ckpt --branches branches.json \\
+        --steps 500 --output branches.jsonl
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from checkpoint import dumps, loads
+from events import EventBus
+from headless import run_steps, model_series
+from sweep import run_seed
+
+
+def branch_seed(base_seed, name):
+    """Seed of a branch's random stream."""
+    return run_seed(base_seed, f"branch:{name}")
+
+
+def unlock_technologies(model, technologies):
+    """Discover technologies the model does not have yet, in tech tree order."""
+    unknown = set(technologies) - set(model.tech_tree)
+    if unknown:
+        raise ValueError(f"Unknown technologies: {', '.join(sorted(unknown))}")
+    for name, data in model.tech_tree.items():  # Prerequisites come first in the tree
+        if name in technologies and name not in model.technologies:
+            if data['prereq'] is not None and data['prereq'] not in model.technologies:
+                raise ValueError(f"Technology {name} requires {data['prereq']}")
+            model.discover_technology(name)
+
+
+def enact_policies(model, policies):
+    """Enact policies given as effect names (CityModel.POLICIES) or policy dicts."""
+    for policy in policies:
+        if isinstance(policy, str):
+            if policy not in model.POLICIES:
+                raise ValueError(f"Unknown policy effect: {policy}")
+            policy = model.POLICIES[policy]
+        model.enact_policy(dict(policy))
+
+
+# Overrides applied through the model instead of setattr
+OVERRIDE_HANDLERS = {
+    'technologies': unlock_technologies,
+    'weather': lambda model, weather: model.pin_weather(weather),
+    'policies': enact_policies,
+}
+
+
+def apply_overrides(model, overrides):
+    """Apply branch overrides. Dict overrides are merged into the current dict."""
+    for name, value in overrides.items():
+        handler = OVERRIDE_HANDLERS.get(name)
+        if handler is not None:
+            handler(model, value)
+            continue
+        if not hasattr(model, name):
+            raise ValueError(f"Unknown model attribute: {name}")
+        current = getattr(model, name)
+        if isinstance(current, dict) and isinstance(value, dict):
+            merged = dict(current)
+            merged.update(value)
+            value = merged
+        elif isinstance(current, set) and isinstance(value, (list, tuple)):
+            value = set(value)
+        setattr(model, name, value)
+
+
+def fork(snapshot, name, overrides=None, seed=None, event_bus=None):
+    """Create one branch model from checkpoint bytes (see checkpoint.dumps)."""
+    model = loads(snapshot, event_bus=event_bus if event_bus is not None else EventBus(enabled=False))
+    model.reseed(seed if seed is not None else branch_seed(model.seed, name))
+    apply_overrides(model, overrides or {})
+    return model
+
+
+def fork_models(model, branches, event_bus=None):
+    """Fork {name: overrides} branches from a model inside this process."""
+    snapshot = dumps(model)
+    return {name: fork(snapshot, name, overrides, event_bus=event_bus)
+            for name, overrides in branches.items()}
+
+
+# Worker processes keep the shared snapshot in a module global
+_snapshot = None
+
+
+def _init_worker(snapshot):
+    global _snapshot
+    _snapshot = snapshot
+
+
+def _run_branch(name, overrides, steps, seed=None):
+    """Worker: fork one branch from the shared snapshot and run it."""
+    model = fork(_snapshot, name, overrides, seed=seed)
+    fork_step = model.step_count
+    stats = run_steps(model, steps)
+    record = {'branch': name, 'overrides': overrides, 'seed': model.seed, 'fork_step': fork_step}
+    record.update(stats)
+    record['series'] = model_series(model)
+    return record
+
+
+def run_branches(model, branches, steps, workers=None, seeds=None, on_result=None):
+    """Run {name: overrides} branches of a model (or checkpoint bytes) in parallel.
+
+    Returns {name: result record}; `on_result(record)` is called as branches finish.
+    """
+    snapshot = model if isinstance(model, (bytes, bytearray)) else dumps(model)
+    seeds = seeds or {}
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(snapshot,)) as pool:
+        futures = [pool.submit(_run_branch, name, overrides, steps, seeds.get(name))
+                   for name, overrides in branches.items()]
+        for future in as_completed(futures):
+            record = future.result()
+            results[record['branch']] = record
+            if on_result is not None:
+                on_result(record)
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run what-if branches of a saved AI City Simulation.")
+    parser.add_argument('--checkpoint', required=True, help="checkpoint file to fork from")
+    parser.add_argument('--branches', required=True,
+                        help="JSON file with {branch name: {model attribute: value}}")
+    parser.add_argument('--steps', type=int, default=500, help="steps to run every branch")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--output', default='branches.jsonl', help="JSON Lines results file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with open(args.branches, 'r', encoding='utf-8') as f:
+        branches = json.load(f)
+    with open(args.checkpoint, 'rb') as f:
+        snapshot = f.read()
+
+    start = time.perf_counter()
+    with open(args.output, 'w', encoding='utf-8') as out:
+        def write(record):
+            out.write(json.dumps(record, separators=(',', ':'), default=sorted) + '\n')
+            out.flush()
+            os.fsync(out.fileno())
+            print(f"{record['branch']}: {record['steps']} steps from step {record['fork_step']} "
+                  f"({record['steps_per_second']:.1f} steps/sec)", file=sys.stderr)
+
+        results = run_branches(snapshot, branches, args.steps, workers=args.workers, on_result=write)
+    print(f"Ran {len(results)} branches in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return results
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\nBranches interrupted.")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test what-if branches forked from one checkpoint.
+A branch's result must depend only on its seed and overrides, not on how
+many worker processes ran the branches.
+"""
+
+from model import CityModel
+from agent import CitizenAgent, Workshop
+from events import EventBus
+from checkpoint import dumps
+from branches import run_branches, fork, apply_overrides
+
+
+BRANCHES = {
+    'baseline': {},
+    'drought': {'weather': 'drought', 'global_resources': {'food': 20}},
+    'crafts': {'technologies': ['agriculture', 'craftsmanship']},
+    'taxes': {'policies': ['redistribute_wealth']},
+}
+
+
+def make_model():
+    model = CityModel(width=12, height=12, num_agents=10, num_food=15, num_houses=5, num_jobs=6,
+                      event_bus=EventBus(enabled=False), seed=4)
+    for _ in range(5):
+        model.step()
+    return model
+
+
+def test_overrides():
+    """Dict overrides merge, lists become sets, unknown attributes are refused."""
+    print("Testing branch overrides...")
+    snapshot = dumps(make_model())
+    model = fork(snapshot, 'drought', BRANCHES['drought'])
+    assert model.weather == 'drought'
+    assert model.global_resources['food'] == 20 and 'tools' in model.global_resources
+    for override in ({'no_such_attribute': 1}, {'technologies': ['warp_drive']},
+                     {'technologies': ['craftsmanship']}, {'weather': 'snow'}, {'policies': ['no_taxes']}):
+        try:
+            apply_overrides(fork(snapshot, 'invalid'), override)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"invalid override accepted: {override}")
+    print("✓ Overrides merged and validated")
+
+
+def test_overrides_take_effect():
+    """Technology, weather and policy overrides change the branch like the model's own systems would."""
+    print("Testing branch override effects...")
+    snapshot = dumps(make_model())
+    base = fork(snapshot, 'baseline')
+    base_bonus = [a.craft_bonus for a in base.agents if isinstance(a, Workshop)]
+
+    crafts = fork(snapshot, 'crafts', BRANCHES['crafts'])
+    assert crafts.technologies >= {'agriculture', 'craftsmanship'}
+    assert crafts.technological_level == base.technological_level + 2
+    assert crafts.global_resources['food'] == base.global_resources['food'] + 50  # Agriculture's food boost
+    assert [a.craft_bonus for a in crafts.agents if isinstance(a, Workshop)] == [b * 1.5 for b in base_bonus]
+
+    drought = fork(snapshot, 'drought', BRANCHES['drought'])
+    for _ in range(40):
+        drought.step()
+        assert drought.weather == 'drought'
+
+    social = fork(snapshot, 'social', {'policies': ['boost_social']})
+    assert social.policies[-1]['effect'] == 'boost_social'
+    socials = {a.unique_id: a.social for a in base.agents if isinstance(a, CitizenAgent) and not a.is_dead}
+    assert all(a.social == max(0, socials[a.unique_id] - 10)
+               for a in social.agents if isinstance(a, CitizenAgent) and not a.is_dead)
+    print(f"✓ Technology level {crafts.technological_level}, workshops 1.5x, drought held for 40 steps, policy enacted")
+
+
+def test_reproducible_across_workers():
+    """The same branches give the same series with one or two worker processes."""
+    print("Testing branch reproducibility across worker counts...")
+    snapshot = dumps(make_model())
+    serial = run_branches(snapshot, BRANCHES, steps=8, workers=1)
+    parallel = run_branches(snapshot, BRANCHES, steps=8, workers=2)
+    assert set(serial) == set(parallel) == set(BRANCHES)
+    for name in BRANCHES:
+        assert serial[name]['seed'] == parallel[name]['seed']
+        assert serial[name]['fork_step'] == 5
+        assert serial[name]['series'] == parallel[name]['series'], f"{name} differs between worker counts"
+    assert len({serial[name]['seed'] for name in BRANCHES}) == len(BRANCHES)
+    print("✓ Identical results with 1 and 2 workers, one seed per branch")
+
+
+if __name__ == "__main__":
+    test_overrides()
+    test_overrides_take_effect()
+    test_reproducible_across_workers()
@@ -0,0 +1,307 @@
+"""
+Checkpoint and restore a complete CityModel.
+
+A checkpoint holds everything needed to continue a run exactly where it
+stopped: all model state (families, technologies, policies, conflicts,
+...), every agent with its full state (emotions, relationships, memories,
+...), the grid layout, the random generator states and the collected data
+series.
+
+Instead of pickling the Mesa object graph, agents are stored column-wise
+per class: every attribute becomes one column, numeric columns are packed
+into flat arrays and dict attributes with a fixed set of keys (skills,
+emotions, ...) are split into one column per key. Checkpoints are about
+a third of the size of a pickle of the agents' attribute dicts; saving and
+loading take about as long as that pickle, since both are dominated by
+creating the Python objects of every agent (see CHECKPOINT_TARGET_PER_100K
+in benchmark.py for measured times).
+
+Usage:
+    save_checkpoint(model, 'city.ckpt', compress='zlib')
+    model = load_checkpoint('city.ckpt')
+"""
+
+import gc
+import importlib
+import itertools
+import lzma
+import pickle
+import zlib
+from array import array
+from contextlib import contextmanager
+from operator import itemgetter
+
+from mesa import Agent, Model
+from mesa.agent import AgentSet
+
+from events import EventBus
+
+
+MAGIC = b'AISIMCKP'
+FORMAT_VERSION = 1
+
+COMPRESSORS = {
+    None: (0, None, None),
+    'zlib': (1, lambda data, level: zlib.compress(data, 1 if level is None else level), zlib.decompress),
+    'lzma': (2, lambda data, level: lzma.compress(data, preset=0 if level is None else level), lzma.decompress),
+}
+
+# Model attributes that are owned by Mesa or rebuilt on restore
+RUNTIME_MODEL_ATTRIBUTES = {
+    'random', '_seed', 'rng', '_rng', '_user_step', 'step', '_agents', '_agents_by_type',
+    '_all_agents', 'grid', 'datacollector', 'events', 'rng_streams', 'activation',
+    'shared_state',
+}
+
+# Agent attributes that are stored separately
+RUNTIME_AGENT_ATTRIBUTES = {'model', 'unique_id', 'pos'}
+
+
+# Column packing
+
+INT_TYPECODES = tuple((code, -(1 << (8 * size - 1)), (1 << (8 * size - 1)) - 1)
+                      for code, size in (('b', 1), ('h', 2), ('i', 4), ('q', 8)))
+
+
+def _int_typecode(low, high):
+    """Smallest array typecode that holds all integers in [low, high]."""
+    for code, code_low, code_high in INT_TYPECODES:
+        if code_low <= low and high <= code_high:
+            return code
+    return None
+
+
+def _pack_column(values):
+    """Pack a sequence of attribute values into a compact representation."""
+    types = set(map(type, values))
+    if len(types) == 1:
+        value_type = types.pop()
+        if value_type is float:
+            return ('f', array('d', values))
+        if value_type is int:
+            typecode = _int_typecode(min(values), max(values))
+            if typecode is not None:
+                return ('i', array(typecode, values))
+        elif value_type is bool:
+            return ('b', bytes(values))
+        elif value_type is dict:
+            layouts = set(map(tuple, values))
+            if len(layouts) == 1:
+                keys = layouts.pop()
+                return ('d', keys, len(values), [_pack_column(column) for column in _columns(values, keys)])
+    return ('l', values)
+
+
+def _unpack_column(column):
+    """Inverse of _pack_column: return a sequence of values."""
+    kind = column[0]
+    if kind in ('f', 'i'):
+        return column[1].tolist()
+    if kind == 'b':
+        return list(map(bool, column[1]))
+    if kind == 'd':
+        keys, count, packed = column[1], column[2], column[3]
+        if not keys:
+            return [{} for _ in range(count)]
+        values = [_unpack_column(c) for c in packed]
+        return list(map(dict, map(zip, itertools.repeat(keys, count), zip(*values))))
+    return column[1]
+
+
+def _columns(dicts, names):
+    """Transpose a list of dicts into one tuple of values per name."""
+    if not names:
+        return []
+    if len(names) == 1:
+        return [tuple(map(itemgetter(names[0]), dicts))]
+    return list(zip(*map(itemgetter(*names), dicts)))
+
+
+@contextmanager
+def _gc_paused():
+    """Pause the cyclic garbage collector while creating many objects."""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+# Capture
+
+def _class_path(cls):
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def _resolve_class(path):
+    module_name, _, name = path.rpartition('.')
+    return getattr(importlib.import_module(module_name), name)
+
+
+def capture_state(model):
+    """Extract the full state of a model as plain data."""
+    with _gc_paused():
+        return _capture_state(model)
+
+
+def _capture_state(model):
+    model_state = {name: value for name, value in model.__dict__.items()
+                   if name not in RUNTIME_MODEL_ATTRIBUTES}
+
+    # Agents in registration order, grouped by class and attribute layout
+    order = []
+    groups = {}
+    for agent in model.agents:
+        order.append(agent.unique_id)
+        attributes = agent.__dict__
+        key = (type(agent), tuple(attributes))
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = ([], [])
+        group[0].append(agent.unique_id)
+        group[1].append(attributes)
+
+    agent_groups = []
+    for (cls, names), (ids, dicts) in groups.items():
+        names = tuple(name for name in names if name not in RUNTIME_AGENT_ATTRIBUTES)
+        columns = [_pack_column(column) for column in _columns(dicts, names)]
+        agent_groups.append({
+            'class': _class_path(cls),
+            'ids': array('q', ids),
+            'names': names,
+            'columns': columns,
+        })
+
+    # Grid layout: the contents of every occupied cell, in cell order (read
+    # directly, so a checkpoint does not count as a grid scan)
+    cells = []
+    for x, column in enumerate(model.grid._grid):
+        for y, contents in enumerate(column):
+            if contents:
+                cells.append(((x, y), [agent.unique_id for agent in contents]))
+
+    return {
+        'version': FORMAT_VERSION,
+        'class': _class_path(type(model)),
+        'seed': model._seed,
+        'model': model_state,
+        'agent_order': array('q', order),
+        'agent_groups': agent_groups,
+        'grid': {'width': model.grid.width, 'height': model.grid.height, 'cells': cells},
+        'random_state': model.random.getstate(),
+        'numpy_rng_state': model.rng.bit_generator.state,
+        'rng_streams': {name: rng.getstate() for name, rng in model.rng_streams.items()},
+        'model_vars': model.datacollector.model_vars,
+    }
+
+
+# Restore
+
+def restore_state(state, event_bus=None):
+    """Rebuild a model from state produced by capture_state."""
+    with _gc_paused():
+        return _restore_state(state, event_bus)
+
+
+def _restore_state(state, event_bus):
+    if state.get('version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version: {state.get('version')}")
+
+    cls = _resolve_class(state['class'])
+    model = cls.__new__(cls)
+    Model.__init__(model, seed=state['seed'])
+    model.__dict__.update(state['model'])
+    model.events = event_bus if event_bus is not None else EventBus.console()
+
+    # Random generators
+    model.random.setstate(state['random_state'])
+    model.rng.bit_generator.state = state['numpy_rng_state']
+    model.rng_streams = {}
+    for name, rng_state in state['rng_streams'].items():
+        model.get_rng(name).setstate(rng_state)
+
+    # Agents
+    agents = {}
+    for group in state['agent_groups']:
+        agent_cls = _resolve_class(group['class'])
+        names = group['names'] + ('model', 'unique_id', 'pos')
+        ids = group['ids'].tolist()
+        columns = [_unpack_column(column) for column in group['columns']]
+        columns += [itertools.repeat(model), ids, itertools.repeat(None)]
+        new = agent_cls.__new__
+        for unique_id, row in zip(ids, zip(*columns)):
+            agent = new(agent_cls)
+            agent.__dict__.update(zip(names, row))
+            agents[unique_id] = agent
+
+    # Register all agents at once, with the same result as register_agent in order
+    ordered = list(map(agents.__getitem__, state['agent_order'].tolist()))
+    by_type = {}
+    for agent in ordered:
+        by_type.setdefault(type(agent), []).append(agent)
+    model._agents = dict.fromkeys(ordered)
+    model._agents_by_type = {agent_cls: AgentSet(members, random=model.random)
+                             for agent_cls, members in by_type.items()}
+    model._all_agents = AgentSet(ordered, random=model.random)
+    Agent._ids[model] = itertools.count(max(agents, default=0) + 1)
+
+    # Grid: fill the cells directly (the grid is new, so no empties to update)
+    grid_state = state['grid']
+    model.grid = model.create_grid(grid_state['width'], grid_state['height'])
+    grid_cells = model.grid._grid
+    for pos, ids in grid_state['cells']:
+        contents = list(map(agents.__getitem__, ids))
+        for agent in contents:
+            agent.pos = pos
+        grid_cells[pos[0]][pos[1]].extend(contents)
+
+    # Collected data
+    model.datacollector = model.create_datacollector()
+    model.datacollector.model_vars = state['model_vars']
+    model.activation = model.create_activation()
+    model.shared_state = model.create_shared_state()
+    return model
+
+
+# Serialization
+
+def dumps(model, compress=None, level=None):
+    """Serialize a model checkpoint to bytes (compress: None, 'zlib' or 'lzma')."""
+    code, compressor, _ = COMPRESSORS[compress]
+    payload = pickle.dumps(capture_state(model), protocol=pickle.HIGHEST_PROTOCOL)
+    if compressor is not None:
+        payload = compressor(payload, level)
+    return MAGIC + bytes([FORMAT_VERSION, code]) + payload
+
+
+def loads(data, event_bus=None):
+    """Restore a model from bytes produced by dumps()."""
+    data = memoryview(data)
+    if bytes(data[:len(MAGIC)]) != MAGIC:
+        raise ValueError("Not a CityModel checkpoint")
+    code = data[len(MAGIC) + 1]
+    payload = data[len(MAGIC) + 2:]
+    for _, (compressor_code, _, decompressor) in COMPRESSORS.items():
+        if compressor_code == code:
+            if decompressor is not None:
+                payload = decompressor(payload)
+            with _gc_paused():
+                state = pickle.loads(payload)
+            return restore_state(state, event_bus=event_bus)
+    raise ValueError(f"Unknown checkpoint compression: {code}")
+
+
+def save_checkpoint(model, path, compress=None, level=None):
+    """Write a checkpoint of the model to a file and return its size in bytes."""
+    data = dumps(model, compress=compress, level=level)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+
+def load_checkpoint(path, event_bus=None):
+    """Restore a model from a checkpoint file."""
+    with open(path, 'rb') as f:
+        return loads(f.read(), event_bus=event_bus)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test that a CityModel's trajectory depends only on its seed.
+Runs several models side by side in one process and compares their histories.
+"""
+
+from model import CityModel
+from agent import CitizenAgent
+from events import EventBus
+
+
+def snapshot(model):
+    """Small fingerprint of the model state at the current step."""
+    citizens = sorted((a for a in model.agents if isinstance(a, CitizenAgent)), key=lambda a: a.unique_id)
+    return (
+        model.weather,
+        round(model.technology_points, 6),
+        tuple((a.unique_id, a.pos, a.hunger, a.energy, a.coins, a.is_dead) for a in citizens),
+    )
+
+
+def make_model(seed, rng_substreams=False):
+    return CityModel(width=15, height=15, num_agents=20, num_food=30, num_houses=8, num_jobs=10,
+                     event_bus=EventBus(enabled=False), seed=seed, rng_substreams=rng_substreams)
+
+
+def test_same_seed_same_trajectory():
+    """Interleaved models with the same seed must not interfere with each other."""
+    print("Testing seeded reproducibility...")
+    for rng_substreams in (False, True):
+        model_a = make_model(7, rng_substreams)
+        noise = make_model(99, rng_substreams)  # Unrelated model stepping in between
+        model_b = make_model(7, rng_substreams)
+
+        for step in range(40):
+            model_a.step()
+            noise.step()
+            model_b.step()
+            assert snapshot(model_a) == snapshot(model_b), f"Diverged at step {step}"
+
+        print(f"  substreams={rng_substreams}: identical for 40 steps")
+
+
+def test_different_seeds_differ():
+    """Different seeds should give different cities."""
+    assert snapshot(make_model(1)) != snapshot(make_model(2))
+    print("  different seeds produce different cities")
+
+
+def test_unseeded_models_get_their_own_seed():
+    """Models without a seed draw a concrete one: substreams differ and the seed reproduces the run."""
+    model_a, model_b = make_model(None, True), make_model(None, True)
+    assert isinstance(model_a.seed, int) and model_a.seed != model_b.seed
+    assert model_a.get_rng('weather').random() != model_b.get_rng('weather').random()
+
+    model_a = make_model(None, True)
+    replay = make_model(model_a.seed, True)
+    for _ in range(10):
+        model_a.step()
+        replay.step()
+    assert snapshot(model_a) == snapshot(replay)
+    print("  unseeded models get distinct seeds that reproduce their runs")
+
+
+if __name__ == "__main__":
+    test_same_seed_same_trajectory()
+    test_different_seeds_differ()
+    test_unseeded_models_get_their_own_seed()
+    print("\n✅ Seeded runs are reproducible!")
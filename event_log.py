@@ -0,0 +1,366 @@
+"""
+Append-only binary event log for the AI City Simulation.
+
+`EventLog` is an event bus sink that records every event to a compact,
+length-prefixed binary file. Encoding and disk I/O happen on a background
+writer thread, so the simulation only pays for appending events to a list.
+
+While writing, the log keeps an index of where each step starts and which
+records mention each agent. The index is saved next to the log
+(`<path>.idx`: JSON symbols and int64 arrays, see save_index) on close;
+`EventLogReader` uses it to answer queries such as "all events for agent
+4711" or "all discoveries between steps 10k and 20k" without scanning the
+whole file (and rebuilds it if a run crashed or the index is unreadable).
+
+File layout:
+    header:  b'AISIMEVT' + uint16 version
+    record:  uint32 body length, then the body
+      symbol body: uint8 type=0, uint16 symbol id, utf-8 text
+      event body:  uint8 type=1, int64 step, uint8 level, uint16 kind symbol,
+                   uint16 template symbol, uint16 agent count,
+                   int64 agent ids..., JSON-encoded event data
+"""
+
+import json
+import mmap
+import os
+import queue
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+
+from events import Sink, Event, DEBUG
+
+
+MAGIC = b'AISIMEVT'
+VERSION = 1
+HEADER = struct.Struct('<8sH')
+LENGTH = struct.Struct('<I')
+SYMBOL = struct.Struct('<BH')
+EVENT = struct.Struct('<BqBHHH')
+
+BIG_ENDIAN = sys.byteorder == 'big'
+
+RECORD_SYMBOL = 0
+RECORD_EVENT = 1
+
+_STOP = object()
+
+
+class EventLog(Sink):
+    """Event bus sink that appends events to a binary log on a background thread."""
+
+    def __init__(self, path, min_level=DEBUG, kinds=None, batch_size=4096):
+        super().__init__(min_level, kinds)
+        self.path = path
+        self.batch_size = batch_size
+        self.events_written = 0
+        self._pending = []
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+        self._error = None
+
+        # Writer-thread state
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION))
+        self._offset = HEADER.size
+        self._symbols = {}
+        self._step_steps = array('q')
+        self._step_offsets = array('q')
+        self._agent_offsets = {}
+
+        self._writer = threading.Thread(target=self._write_loop, name='event-log-writer', daemon=True)
+        self._writer.start()
+
+    def handle(self, event):
+        self._pending.append(event)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Hand pending events to the writer thread."""
+        if self._pending:
+            self._queue.put(self._pending)
+            self._pending = []
+
+    def close(self):
+        """Write all remaining events, then save the index next to the log."""
+        if self._closed:
+            return
+        self.flush()
+        self._queue.put(_STOP)
+        self._writer.join()
+        self._closed = True
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # Writer thread
+
+    def _write_loop(self):
+        try:
+            while True:
+                batch = self._queue.get()
+                if batch is _STOP:
+                    break
+                self._file.write(self._encode_batch(batch))
+            self._file.close()
+            save_index(self.path, {
+                'symbols': {text: sym for text, sym in self._symbols.items()},
+                'step_steps': self._step_steps,
+                'step_offsets': self._step_offsets,
+                'agents': self._agent_offsets,
+                'count': self.events_written,
+                'end_offset': self._offset,
+            })
+        except Exception as e:  # Reported from close()
+            self._error = e
+
+    def _symbol(self, text, chunks):
+        sym = self._symbols.get(text)
+        if sym is None:
+            sym = len(self._symbols)
+            self._symbols[text] = sym
+            body = SYMBOL.pack(RECORD_SYMBOL, sym) + text.encode('utf-8')
+            chunks.append(LENGTH.pack(len(body)))
+            chunks.append(body)
+            self._offset += LENGTH.size + len(body)
+        return sym
+
+    def _encode_batch(self, batch):
+        chunks = []
+        dumps = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False, default=str).encode
+        step_steps = self._step_steps
+        for event in batch:
+            kind_sym = self._symbol(event.kind, chunks)
+            template_sym = self._symbol(event.message, chunks)
+            agents = event.agents
+            payload = dumps(event.data).encode('utf-8') if event.data else b''
+            body = (EVENT.pack(RECORD_EVENT, event.step, int(event.level), kind_sym, template_sym, len(agents))
+                    + struct.pack(f'<{len(agents)}q', *agents) + payload)
+
+            offset = self._offset
+            if not step_steps or step_steps[-1] != event.step:
+                step_steps.append(event.step)
+                self._step_offsets.append(offset)
+            for agent_id in agents:
+                offsets = self._agent_offsets.get(agent_id)
+                if offsets is None:
+                    offsets = self._agent_offsets[agent_id] = array('q')
+                offsets.append(offset)
+
+            chunks.append(LENGTH.pack(len(body)))
+            chunks.append(body)
+            self._offset += LENGTH.size + len(body)
+            self.events_written += 1
+        return b''.join(chunks)
+
+
+def index_path(path):
+    """Path of the index file that belongs to an event log."""
+    return path + '.idx'
+
+
+# Index file: header, symbols as JSON, then int64 arrays -- step numbers, step
+# offsets, agent ids, record count per agent, and all agents' record offsets
+# (little-endian, like the log)
+INDEX_MAGIC = b'AISIMIDX'
+INDEX_HEADER = struct.Struct('<8sHqqqqq')  # magic, version, count, end offset, symbols size, steps, agents
+
+
+def save_index(path, index):
+    """Write an index in the layout above next to the log."""
+    symbols = json.dumps(index['symbols'], ensure_ascii=False).encode('utf-8')
+    agents = index['agents']
+    agent_ids = array('q', agents.keys())
+    sizes = array('q', (len(offsets) for offsets in agents.values()))
+    with open(index_path(path), 'wb') as f:
+        f.write(INDEX_HEADER.pack(INDEX_MAGIC, VERSION, index['count'], index['end_offset'],
+                                  len(symbols), len(index['step_steps']), len(agent_ids)))
+        f.write(symbols)
+        for values in (index['step_steps'], index['step_offsets'], agent_ids, sizes, *agents.values()):
+            values = array('q', values)
+            if BIG_ENDIAN:
+                values.byteswap()
+            values.tofile(f)
+
+
+def load_index(path):
+    """Read an index written by save_index; raises ValueError if it is missing pieces or foreign."""
+    with open(index_path(path), 'rb') as f:
+        data = f.read()
+    try:
+        magic, version, count, end_offset, symbols_size, num_steps, num_agents = INDEX_HEADER.unpack_from(data, 0)
+    except struct.error:
+        raise ValueError("Truncated event log index")
+    if magic != INDEX_MAGIC or version != VERSION:
+        raise ValueError("Not an event log index")
+    position = INDEX_HEADER.size
+    symbols = json.loads(data[position:position + symbols_size].decode('utf-8'))
+    position += symbols_size
+
+    def take(n):
+        nonlocal position
+        values = array('q')
+        values.frombytes(data[position:position + 8 * n])
+        if len(values) != n:
+            raise ValueError("Truncated event log index")
+        if BIG_ENDIAN:
+            values.byteswap()
+        position += 8 * n
+        return values
+
+    step_steps = take(num_steps)
+    step_offsets = take(num_steps)
+    agent_ids = take(num_agents)
+    sizes = take(num_agents)
+    agents = {agent_id: take(size) for agent_id, size in zip(agent_ids, sizes)}
+    return {'symbols': symbols, 'step_steps': step_steps, 'step_offsets': step_offsets,
+            'agents': agents, 'count': count, 'end_offset': end_offset}
+
+
+class EventLogReader:
+    """Replay and query an event log written by EventLog."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        if size < HEADER.size or HEADER.unpack_from(self._data, 0) != (MAGIC, VERSION):
+            raise ValueError(f"{path} is not an event log")
+
+        self._index = self._load_index()
+        self._names = {sym: text for text, sym in self._index['symbols'].items()}
+
+    def _load_index(self):
+        try:
+            index = load_index(self.path)
+            if index['end_offset'] == len(self._data):
+                return index
+        except (OSError, ValueError):  # Missing, foreign or damaged: rebuild from the log
+            pass
+        return self.rebuild_index()
+
+    def rebuild_index(self, save=True):
+        """Scan the whole log to rebuild its index (e.g. after a crashed run)."""
+        data = self._data
+        symbols = {}
+        step_steps = array('q')
+        step_offsets = array('q')
+        agents = {}
+        count = 0
+        offset = HEADER.size
+        end = len(data)
+        while offset + LENGTH.size <= end:
+            (length,) = LENGTH.unpack_from(data, offset)
+            body = offset + LENGTH.size
+            if body + length > end:
+                break  # Truncated trailing record
+            if data[body] == RECORD_SYMBOL:
+                _, sym = SYMBOL.unpack_from(data, body)
+                symbols[bytes(data[body + SYMBOL.size:body + length]).decode('utf-8')] = sym
+            else:
+                _, step, _, _, _, num_agents = EVENT.unpack_from(data, body)
+                if not step_steps or step_steps[-1] != step:
+                    step_steps.append(step)
+                    step_offsets.append(offset)
+                for agent_id in struct.unpack_from(f'<{num_agents}q', data, body + EVENT.size):
+                    agents.setdefault(agent_id, array('q')).append(offset)
+                count += 1
+            offset = body + length
+
+        index = {'symbols': symbols, 'step_steps': step_steps, 'step_offsets': step_offsets,
+                 'agents': agents, 'count': count, 'end_offset': offset}
+        if save and offset == end:
+            save_index(self.path, index)
+        return index
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return self._index['count']
+
+    # Decoding
+
+    def _records(self, offset, kinds=None, max_step=None):
+        """Yield (offset, event) pairs starting at `offset`."""
+        data = self._data
+        names = self._names
+        end = self._index['end_offset']
+        loads = json.loads
+        while offset < end:
+            (length,) = LENGTH.unpack_from(data, offset)
+            body = offset + LENGTH.size
+            record_offset = offset
+            offset = body + length
+            if data[body] != RECORD_EVENT:
+                continue
+            _, step, level, kind_sym, template_sym, count = EVENT.unpack_from(data, body)
+            if max_step is not None and step > max_step:
+                return
+            kind = names[kind_sym]
+            if kinds is not None and kind not in kinds:
+                continue
+            start = body + EVENT.size
+            agent_ids = struct.unpack_from(f'<{count}q', data, start)
+            payload = data[start + 8 * count:offset]
+            event_data = loads(bytes(payload)) if payload else {}
+            yield record_offset, Event(step, kind, level, names[template_sym], agent_ids, event_data)
+
+    def _event_at(self, offset):
+        for _, event in self._records(offset):
+            return event
+
+    def replay(self, kinds=None):
+        """Iterate over all events in the order they were written."""
+        kinds = frozenset(kinds) if kinds is not None else None
+        for _, event in self._records(HEADER.size, kinds=kinds):
+            yield event
+
+    __iter__ = replay
+
+    def events_for_agent(self, agent_id, kinds=None):
+        """All events that involve the given agent, using the agent index."""
+        kinds = frozenset(kinds) if kinds is not None else None
+        events = []
+        for offset in self._index['agents'].get(agent_id, ()):
+            event = self._event_at(offset)
+            if kinds is None or event.kind in kinds:
+                events.append(event)
+        return events
+
+    def events_between(self, start_step, end_step, kinds=None):
+        """All events with start_step <= step <= end_step, using the step index."""
+        kinds = frozenset(kinds) if kinds is not None else None
+        steps = self._index['step_steps']
+        position = bisect_left(steps, start_step)
+        if position >= len(steps):
+            return []
+        offset = self._index['step_offsets'][position]
+        return [event for _, event in self._records(offset, kinds=kinds, max_step=end_step)]
+
+    def agent_ids(self):
+        """Ids of all agents that appear in the log."""
+        return list(self._index['agents'].keys())
+
+    def steps(self):
+        """First and last step recorded in the log, or None for an empty log."""
+        steps = self._index['step_steps']
+        return (steps[0], steps[-1]) if steps else None
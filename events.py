@@ -0,0 +1,213 @@
+"""
+Event bus for the AI City Simulation.
+
+Model and agent code report notable happenings (births, deaths, trades,
+discoveries, policies, conflicts, ...) as typed events instead of printing
+them directly. Sinks subscribe to the bus and decide what to do with them:
+print to the console, buffer them in batches, or hand them to a callback.
+
+A bus with no interested sinks (or a disabled bus) drops events after a
+single level comparison, so batch runs pay essentially nothing for them.
+"""
+
+import sys
+
+
+# Severity levels (higher is more important)
+DEBUG = 10     # High-volume chatter: individual trades, temple visits
+INFO = 20      # Regular life events: births, deaths, families, professions
+NOTICE = 30    # City-wide milestones: discoveries, policies, conflicts
+DISABLED = float('inf')
+
+LEVEL_NAMES = {DEBUG: 'debug', INFO: 'info', NOTICE: 'notice'}
+
+
+def parse_level(value):
+    """Convert a level name ('debug', 'info', 'notice', 'off') or number to a level."""
+    if isinstance(value, (int, float)):
+        return value
+    name = str(value).lower()
+    if name in ('off', 'none', 'quiet'):
+        return DISABLED
+    for level, level_name in LEVEL_NAMES.items():
+        if level_name == name:
+            return level
+    raise ValueError(f"Unknown event level: {value}")
+
+
+class Event:
+    """A single simulation event."""
+
+    __slots__ = ('step', 'kind', 'level', 'message', 'agents', 'data')
+
+    def __init__(self, step, kind, level, message, agents, data):
+        self.step = step
+        self.kind = kind
+        self.level = level
+        self.message = message    # Format template, rendered lazily
+        self.agents = agents      # Tuple of involved agent ids
+        self.data = data          # Template fields / structured payload
+
+    @property
+    def text(self):
+        """Human readable message for this event."""
+        return self.message.format(**self.data)
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return f"Event(step={self.step}, kind={self.kind!r}, agents={self.agents})"
+
+
+class Sink:
+    """Base class for event consumers attached to an EventBus."""
+
+    def __init__(self, min_level=DEBUG, kinds=None):
+        self.min_level = min_level
+        self.kinds = frozenset(kinds) if kinds is not None else None
+
+    def accepts(self, event):
+        """Check whether this sink wants the given event."""
+        return event.level >= self.min_level and (self.kinds is None or event.kind in self.kinds)
+
+    def handle(self, event):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+
+class PrintSink(Sink):
+    """Print event messages, one per line (the simulation's classic output)."""
+
+    def __init__(self, min_level=INFO, kinds=None, stream=None):
+        super().__init__(min_level, kinds)
+        self.stream = stream
+
+    def handle(self, event):
+        print(event.text, file=self.stream if self.stream is not None else sys.stdout)
+
+
+class CallbackSink(Sink):
+    """Call a function for every accepted event."""
+
+    def __init__(self, callback, min_level=DEBUG, kinds=None):
+        super().__init__(min_level, kinds)
+        self.callback = callback
+
+    def handle(self, event):
+        self.callback(event)
+
+
+class BufferedSink(Sink):
+    """Collect events and hand them to a handler in batches."""
+
+    def __init__(self, handler, batch_size=1024, min_level=DEBUG, kinds=None):
+        super().__init__(min_level, kinds)
+        self.handler = handler
+        self.batch_size = batch_size
+        self.buffer = []
+
+    def handle(self, event):
+        self.buffer.append(event)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            batch = self.buffer
+            self.buffer = []
+            self.handler(batch)
+
+
+class MemorySink(Sink):
+    """Keep accepted events in memory (optionally only the most recent ones)."""
+
+    def __init__(self, min_level=DEBUG, kinds=None, max_events=None):
+        super().__init__(min_level, kinds)
+        self.max_events = max_events
+        self.events = []
+
+    def handle(self, event):
+        self.events.append(event)
+        if self.max_events is not None and len(self.events) > self.max_events:
+            del self.events[:len(self.events) - self.max_events]
+
+    def clear(self):
+        self.events = []
+
+
+class EventBus:
+    """Dispatch simulation events to subscribed sinks."""
+
+    def __init__(self, enabled=True):
+        self.step = 0  # Updated by the model at the start of every step
+        self.sinks = []
+        self._enabled = enabled
+        self._min_level = DISABLED
+
+    @classmethod
+    def console(cls, min_level=INFO):
+        """Create a bus that prints events like the original simulation did."""
+        bus = cls()
+        bus.add_sink(PrintSink(min_level=min_level))
+        return bus
+
+    @property
+    def enabled(self):
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value):
+        self._enabled = bool(value)
+        self._update_min_level()
+
+    def _update_min_level(self):
+        if self._enabled and self.sinks:
+            self._min_level = min(sink.min_level for sink in self.sinks)
+        else:
+            self._min_level = DISABLED
+
+    def add_sink(self, sink):
+        """Attach a sink to the bus and return it."""
+        self.sinks.append(sink)
+        self._update_min_level()
+        return sink
+
+    def remove_sink(self, sink):
+        """Detach a sink from the bus (flushing it first)."""
+        if sink in self.sinks:
+            sink.flush()
+            self.sinks.remove(sink)
+            self._update_min_level()
+
+    def subscribe(self, callback, kinds=None, min_level=DEBUG):
+        """Call `callback(event)` for matching events; returns the created sink."""
+        return self.add_sink(CallbackSink(callback, min_level=min_level, kinds=kinds))
+
+    def is_enabled_for(self, level):
+        """Check whether an event of this level would reach any sink."""
+        return level >= self._min_level
+
+    def emit(self, kind, message, level=INFO, agents=(), **data):
+        """Publish an event. `message` is a str.format template filled from `data`."""
+        if level < self._min_level:
+            return
+        event = Event(self.step, kind, level, message, agents, data)
+        for sink in self.sinks:
+            if sink.accepts(event):
+                sink.handle(event)
+
+    def flush(self):
+        """Flush all buffered sinks."""
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self):
+        """Flush and close all sinks."""
+        for sink in self.sinks:
+            sink.close()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test the level-filtered event bus.
+Sinks must only see events at or above their level and of their kinds.
+"""
+
+from events import EventBus, MemorySink, BufferedSink, DEBUG, INFO, NOTICE, DISABLED, parse_level
+
+
+def test_level_filtering():
+    """Each sink gets the events at or above its own level; the bus skips what no sink wants."""
+    print("Testing event level filtering...")
+    bus = EventBus()
+    assert not bus.is_enabled_for(NOTICE)  # No sinks: everything is dropped
+    info = bus.add_sink(MemorySink(min_level=INFO))
+    notices = bus.add_sink(MemorySink(min_level=NOTICE, kinds=('technology',)))
+    assert not bus.is_enabled_for(DEBUG) and bus.is_enabled_for(INFO)
+
+    bus.emit('trade', "Trade {a}", DEBUG, a=1)
+    bus.emit('birth', "Birth {a}", INFO, agents=(7,), a=2)
+    bus.emit('technology', "Discovered {name}", NOTICE, name='writing')
+    bus.emit('policy', "Policy {name}", NOTICE, name='Taxation')
+
+    assert [e.kind for e in info.events] == ['birth', 'technology', 'policy']
+    assert [e.text for e in notices.events] == ["Discovered writing"]
+    assert info.events[0].agents == (7,)
+
+    bus.enabled = False
+    bus.emit('birth', "Birth {a}", NOTICE, a=3)
+    assert len(info.events) == 3
+    print("✓ DEBUG dropped, kinds filtered, disabled bus silent")
+
+
+def test_buffered_sink_and_levels():
+    """Buffered sinks deliver in batches and on flush; level names parse."""
+    print("Testing buffered sinks...")
+    batches = []
+    bus = EventBus()
+    bus.add_sink(BufferedSink(batches.append, batch_size=2, min_level=INFO))
+    for i in range(3):
+        bus.emit('death', "Death {i}", INFO, i=i)
+    assert [len(batch) for batch in batches] == [2]
+    bus.flush()
+    assert [len(batch) for batch in batches] == [2, 1]
+
+    assert parse_level('debug') == DEBUG and parse_level('NOTICE') == NOTICE
+    assert parse_level('off') == DISABLED and parse_level(25) == 25
+    try:
+        parse_level('loud')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown level accepted")
+    print("✓ Batches of 2 plus the flushed rest; level names parsed")
+
+
+if __name__ == "__main__":
+    test_level_filtering()
+    test_buffered_sink_and_levels()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Golden trajectory digests for the AI City Simulation.
+
+Every performance rewrite risks changing behavior. This module computes a
+deterministic digest of a CityModel's state after every step, split into
+fields so a mismatch says *what* diverged:
+
+  positions      citizen positions
+  needs          hunger, energy, social, health, coins, alive/dead
+  skills         skill dict and the base/advanced skill attributes
+  relationships  detailed relationships and friendships
+  tech           discovered technologies, technology points and level
+  resources      global resources and prices
+
+Record golden digests for fixed seeds with the reference engine, then check
+a candidate (optimized) engine against them; the check reports the first
+step and the fields where the runs diverge.
+
+Usage:
+    python golden.py record --seed 1 --seed 2 --steps 500 --output golden.json
+    python golden.py check golden.json
+    python golden.py check golden.json --factory fast_engine:build_model
+"""
+
+import argparse
+import hashlib
+import importlib
+import json
+import sys
+
+from agent import CitizenAgent
+from headless import MODEL_PARAMETERS, build_model
+
+
+FIELDS = ('positions', 'needs', 'skills', 'relationships', 'tech', 'resources')
+
+SKILL_ATTRIBUTES = ('farming', 'crafting', 'trading', 'combat', 'learning', 'artistic_skill',
+                    'philosophical_inclination', 'diplomatic_skill', 'teaching_ability', 'wisdom')
+
+
+def _sorted_items(mapping):
+    return tuple(sorted(mapping.items(), key=lambda item: repr(item[0])))
+
+
+def field_values(model):
+    """Canonical (ordered, hashable) values of every digest field."""
+    citizens = sorted((a for a in model.agents if isinstance(a, CitizenAgent)), key=lambda a: a.unique_id)
+    return {
+        'positions': tuple((a.unique_id, a.pos) for a in citizens),
+        'needs': tuple((a.unique_id, a.hunger, a.energy, a.social, a.health, a.coins, a.is_dead)
+                       for a in citizens),
+        'skills': tuple((a.unique_id, _sorted_items(a.skills),
+                         tuple(getattr(a, name, None) for name in SKILL_ATTRIBUTES))
+                        for a in citizens),
+        'relationships': tuple((a.unique_id,
+                                tuple((other, _sorted_items(rel)) for other, rel in _sorted_items(a.agent_relationships)),
+                                _sorted_items(a.friendships))
+                               for a in citizens),
+        'tech': (tuple(sorted(model.technologies)), model.technology_points, model.technological_level),
+        'resources': (_sorted_items(model.global_resources), _sorted_items(model.resource_prices)),
+    }
+
+
+def digest(model):
+    """Per-field hex digests of the model state: {field: hex}."""
+    return {name: hashlib.blake2b(repr(value).encode('utf-8'), digest_size=12).hexdigest()
+            for name, value in field_values(model).items()}
+
+
+def trajectory(model, steps):
+    """Digests of the initial state and after each of `steps` steps."""
+    digests = [digest(model)]
+    for _ in range(steps):
+        model.step()
+        digests.append(digest(model))
+    return digests
+
+
+def load_factory(spec):
+    """Resolve 'module:function' to a model factory taking (params, seed)."""
+    if not spec:
+        return build_model
+    module_name, _, name = spec.partition(':')
+    return getattr(importlib.import_module(module_name), name or 'build_model')
+
+
+def record(seeds, steps, params=None, factory=build_model):
+    """Golden digests for each seed: {'params', 'steps', 'fields', 'runs': {seed: [[hex...] per step]}}."""
+    params = dict(params or {})
+    runs = {}
+    for seed in seeds:
+        digests = trajectory(factory(params, seed), steps)
+        runs[str(seed)] = [[d[name] for name in FIELDS] for d in digests]
+    return {'params': params, 'steps': steps, 'fields': list(FIELDS), 'runs': runs}
+
+
+def check(golden, factory=build_model, steps=None):
+    """Compare candidate runs with golden digests.
+
+    Returns a list of mismatches {'seed', 'step', 'fields'}, at most one per seed:
+    the first step at which the candidate diverges.
+    """
+    fields = golden['fields']
+    steps = golden['steps'] if steps is None else min(steps, golden['steps'])
+    mismatches = []
+    for seed, expected in golden['runs'].items():
+        model = factory(golden['params'], int(seed))
+        for step in range(steps + 1):
+            if step:
+                model.step()
+            actual = digest(model)
+            diverged = [name for name, value in zip(fields, expected[step]) if actual[name] != value]
+            if diverged:
+                mismatches.append({'seed': int(seed), 'step': step, 'fields': diverged})
+                break
+    return mismatches
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Record or check golden trajectory digests.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    rec = commands.add_parser('record', help="record golden digests with the reference engine")
+    rec.add_argument('--seed', type=int, action='append', help="seed to record (repeatable, default 1)")
+    rec.add_argument('--steps', type=int, default=200)
+    rec.add_argument('--param', action='append', default=[], help="model parameter as name=value (repeatable)")
+    rec.add_argument('--factory', help="model factory as module:function (default headless:build_model)")
+    rec.add_argument('--output', default='golden.json')
+
+    chk = commands.add_parser('check', help="check a candidate engine against golden digests")
+    chk.add_argument('golden', help="golden digest file")
+    chk.add_argument('--factory', help="candidate model factory as module:function taking (params, seed)")
+    chk.add_argument('--steps', type=int, help="only check the first N steps")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    factory = load_factory(args.factory)
+
+    if args.command == 'record':
+        params = {}
+        for item in args.param:
+            name, _, value = item.partition('=')
+            if name not in MODEL_PARAMETERS:
+                raise SystemExit(f"Unknown model parameter: {name}")
+            params[name] = int(value)
+        golden = record(args.seed or [1], args.steps, params, factory)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(golden, f)
+        print(f"Recorded {len(golden['runs'])} runs x {args.steps} steps to {args.output}")
+        return 0
+
+    with open(args.golden, 'r', encoding='utf-8') as f:
+        golden = json.load(f)
+    mismatches = check(golden, factory, args.steps)
+    for mismatch in mismatches:
+        print(f"seed {mismatch['seed']}: first divergence at step {mismatch['step']} "
+              f"in {', '.join(mismatch['fields'])}")
+    if not mismatches:
+        print(f"All {len(golden['runs'])} runs match the golden digests")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
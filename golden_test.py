@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test golden trajectory digests.
+The reference engine must match its own recording and the committed
+baseline, and a perturbed run must be reported at the step and field where
+it diverges.
+"""
+
+import json
+import os
+
+from headless import build_model
+from golden import FIELDS, digest, record, check
+
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden_baseline.json')
+
+
+PARAMS = {'width': 12, 'height': 12, 'num_agents': 15, 'num_food': 20, 'num_houses': 6, 'num_jobs': 8}
+
+
+def perturbed(params, seed):
+    """A 'candidate engine' that gives one citizen extra hunger after step 5."""
+    model = build_model(params, seed)
+    original_step = model.step
+
+    def step():
+        original_step()
+        if model.step_count == 5:
+            citizen = min((a for a in model.agents if hasattr(a, 'hunger')), key=lambda a: a.unique_id)
+            citizen.hunger += 1e-9
+
+    model.step = step
+    return model
+
+
+def test_reference_matches_itself():
+    """Two runs of the reference engine produce the same digests."""
+    print("Testing golden digests are reproducible...")
+    golden = record([3, 4], 15, PARAMS)
+    assert len(golden['runs']['3']) == 16
+    assert check(golden) == []
+    assert digest(build_model(PARAMS, 3)) != digest(build_model(PARAMS, 4))
+    assert set(digest(build_model(PARAMS, 3))) == set(FIELDS)
+    print("✓ Reference runs match their golden digests")
+
+
+def test_divergence_is_located():
+    """A perturbed run is reported at the first diverging step and field."""
+    print("Testing divergence reporting...")
+    golden = record([3], 10, PARAMS)
+    mismatches = check(golden, perturbed)
+    assert len(mismatches) == 1
+    assert mismatches[0]['step'] == 5
+    assert mismatches[0]['fields'] == ['needs']
+    print(f"✓ Divergence found at step {mismatches[0]['step']} in {mismatches[0]['fields']}")
+
+
+def test_engine_matches_baseline():
+    """The current engine reproduces the committed digests (seeds 1, 2 and 5, 150 steps)."""
+    print("Testing against the recorded baseline...")
+    with open(BASELINE, 'r', encoding='utf-8') as f:
+        golden = json.load(f)
+    mismatches = check(golden)
+    assert mismatches == [], f"Trajectory changed: {mismatches} (re-record golden_baseline.json if intended)"
+    print(f"✓ Seeds {', '.join(golden['runs'])} match over {golden['steps']} steps")
+
+
+if __name__ == "__main__":
+    test_reference_matches_itself()
+    test_engine_matches_baseline()
+    test_divergence_is_located()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+AI City Simulation - Headless Batch Runner
+
+Runs a CityModel as fast as the CPU allows, without any visualization.
+This module never imports plotting libraries, so it works on servers
+without a display (or without matplotlib installed at all).
+
+Usage:
+    python headless.py --steps 1000 --agents 200 --width 50 --height 50 \\
+        --seed 42 --collect-every 10 --output series.csv
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+
+from model import CityModel
+from agent import CitizenAgent
+from events import EventBus, PrintSink, parse_level, DISABLED
+from event_log import EventLog
+from metrics_server import MetricsServer
+from memory import MemoryReporter
+from profiling import SamplingProfiler, profiler_from_env
+from lod import FocusPolicy, ImportancePolicy, SamplingPolicy
+
+
+# CityModel constructor arguments that can be set from the command line
+MODEL_PARAMETERS = ('width', 'height', 'num_agents', 'num_food', 'num_houses', 'num_jobs')
+
+
+def build_model(params=None, seed=None, event_bus=None, collect_interval=1, **options):
+    """Create a CityModel from a parameter dict (keys from MODEL_PARAMETERS) and engine options."""
+    params = dict(params or {})
+    unknown = set(params) - set(MODEL_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown model parameters: {', '.join(sorted(unknown))}")
+    if event_bus is None:
+        event_bus = EventBus(enabled=False)
+    return CityModel(event_bus=event_bus, collect_interval=collect_interval, seed=seed, **params, **options)
+
+
+def run_steps(model, steps, progress_every=0, on_step=None):
+    """Advance the model `steps` times and return timing statistics."""
+    start = time.perf_counter()
+    for i in range(1, steps + 1):
+        model.step()
+        if on_step is not None:
+            on_step(model)
+        if progress_every and i % progress_every == 0:
+            elapsed = time.perf_counter() - start
+            print(f"Step {i}/{steps} ({i / elapsed:.1f} steps/sec)", file=sys.stderr)
+    elapsed = time.perf_counter() - start
+    return {
+        'steps': steps,
+        'seconds': elapsed,
+        'steps_per_second': steps / elapsed if elapsed > 0 else float('inf'),
+    }
+
+
+def model_series(model):
+    """Collected model reporter series as {column: [values]}, including the step numbers."""
+    series = {'Step': list(model.collected_steps)}
+    series.update({name: list(values) for name, values in model.datacollector.model_vars.items()})
+    return series
+
+
+def write_series_csv(model, path):
+    """Write the collected model reporter series to a CSV file."""
+    series = model_series(model)
+    columns = list(series)
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        writer.writerows(zip(*(series[column] for column in columns)))
+
+
+def report_memory(reporter, json_path=None):
+    """Print a memory report to stderr and optionally append it to a JSON Lines file."""
+    report = reporter.report()
+    print(reporter.table(report), file=sys.stderr)
+    if json_path:
+        with open(json_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(report) + '\n')
+    return report
+
+
+def lod_policy(name, width, height):
+    """Level-of-detail policy for --lod: focus (grid center), importance or sample."""
+    if name == 'focus':
+        return FocusPolicy((width // 2, height // 2), full_radius=max(1, width // 10),
+                           reduced_radius=max(2, width // 4))
+    if name == 'importance':
+        return ImportancePolicy()
+    return SamplingPolicy()
+
+
+def parse_cadence(every, disabled):
+    """Pipeline or behavior configuration from NAME=K intervals and disabled NAMEs
+    (--system-every/--disable-system, --behavior-every/--disable-behavior)."""
+    config = {}
+    for item in every:
+        name, _, interval = item.partition('=')
+        config.setdefault(name, {})['every'] = int(interval)
+    for name in disabled:
+        config.setdefault(name, {})['enabled'] = False
+    return config
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the AI City Simulation without visualization.")
+    parser.add_argument('--steps', type=int, default=1000, help="number of steps to run")
+    parser.add_argument('--seed', type=int, default=None, help="random seed for a reproducible run")
+    parser.add_argument('--width', type=int, default=20)
+    parser.add_argument('--height', type=int, default=20)
+    parser.add_argument('--agents', dest='num_agents', type=int, default=50)
+    parser.add_argument('--food', dest='num_food', type=int, default=60)
+    parser.add_argument('--houses', dest='num_houses', type=int, default=20)
+    parser.add_argument('--jobs', dest='num_jobs', type=int, default=25)
+    parser.add_argument('--collect-every', type=int, default=1,
+                        help="collect model statistics every N steps")
+    parser.add_argument('--output', help="write collected statistics to this CSV file")
+    parser.add_argument('--event-log', help="record all events to this binary event log")
+    parser.add_argument('--events', default='off',
+                        help="print events at this level or above: debug, info, notice or off")
+    parser.add_argument('--progress', type=int, default=0, help="report progress every N steps")
+    parser.add_argument('--two-phase', action='store_true',
+                        help="step citizens in decide/apply phases (see activation.py)")
+    parser.add_argument('--decide-workers', type=int, default=0,
+                        help="worker processes for the two-phase decide phase")
+    parser.add_argument('--event-driven', action='store_true',
+                        help="fully step only citizens with pending decisions (see scheduling.py)")
+    parser.add_argument('--max-idle', type=int, default=10,
+                        help="longest a citizen goes without a full step with --event-driven")
+    parser.add_argument('--lod', choices=('focus', 'importance', 'sample'),
+                        help="step citizens at level-of-detail tiers assigned by this policy (see lod.py)")
+    parser.add_argument('--lod-every', type=int, default=5,
+                        help="run all behaviors of reduced-detail citizens every N steps")
+    parser.add_argument('--system-every', action='append', default=[], metavar='NAME=K',
+                        help="run model system NAME only every K steps (repeatable, see pipeline.py)")
+    parser.add_argument('--disable-system', action='append', default=[], metavar='NAME',
+                        help="skip model system NAME (repeatable)")
+    parser.add_argument('--behavior-every', action='append', default=[], metavar='NAME=K',
+                        help="run citizen behavior NAME only every K steps, staggered across citizens (repeatable)")
+    parser.add_argument('--disable-behavior', action='append', default=[], metavar='NAME',
+                        help="skip citizen behavior NAME (repeatable)")
+    parser.add_argument('--share-state', action='store_true',
+                        help="publish citizen arrays and grid layers to shared memory every step (see shared_state.py)")
+    parser.add_argument('--timing', action='store_true',
+                        help="time every model system and agent behavior and print a table at the end")
+    parser.add_argument('--counters', action='store_true',
+                        help="count hot-path operations (grid scans, lookups, moves, ...) and print them at the end")
+    parser.add_argument('--agent-costs', action='store_true',
+                        help="attribute wall time to individual citizens and print the most expensive ones")
+    parser.add_argument('--sample-profile', metavar='PATH',
+                        help="sample the simulation's stacks and write collapsed stacks (flamegraph input) here")
+    parser.add_argument('--sample-interval', type=float, default=0.005,
+                        help="sampling interval in seconds for --sample-profile")
+    parser.add_argument('--memory-every', type=int, default=0,
+                        help="print a memory footprint report every N steps")
+    parser.add_argument('--memory-json', help="append every memory report as a JSON line to this file")
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help="include top allocators from tracemalloc in memory reports (slow)")
+    parser.add_argument('--metrics-port', type=int,
+                        help="serve live Prometheus-style metrics on http://127.0.0.1:PORT/metrics (implies --timing)")
+    parser.add_argument('--metrics-json', help="write the per-phase timings and operation counts to this JSON file")
+    return parser.parse_args(argv)
+
+
+def enable_metrics(model, args):
+    """Turn on the measurements requested on the command line; live and JSON metrics imply timings."""
+    model.timings.enabled = args.timing or bool(args.metrics_json) or args.metrics_port is not None
+    model.counters.enabled = args.counters or bool(args.metrics_json)
+    model.metrics.agent_costs.enabled = args.agent_costs
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    params = {name: getattr(args, name) for name in MODEL_PARAMETERS}
+
+    bus = EventBus()
+    console_level = parse_level(args.events)
+    if console_level != DISABLED:
+        bus.add_sink(PrintSink(min_level=console_level))
+    event_log = bus.add_sink(EventLog(args.event_log)) if args.event_log else None
+
+    startup = time.perf_counter()
+    model = build_model(params, seed=args.seed, event_bus=bus, collect_interval=args.collect_every,
+                        two_phase=args.two_phase, decide_workers=args.decide_workers,
+                        share_state=args.share_state, event_driven=args.event_driven,
+                        max_idle=args.max_idle, lod_every=args.lod_every,
+                        lod=lod_policy(args.lod, args.width, args.height) if args.lod else None,
+                        systems=parse_cadence(args.system_every, args.disable_system),
+                        behaviors=parse_cadence(args.behavior_every, args.disable_behavior))
+    startup = time.perf_counter() - startup
+    enable_metrics(model, args)
+
+    if model.shared_state is not None:
+        print(f"Publishing state to shared memory block {model.shared_state.name}", file=sys.stderr)
+
+    server = None
+    if args.metrics_port is not None:
+        server = MetricsServer(port=args.metrics_port)
+        print(f"Serving metrics on {server.url}", file=sys.stderr)
+        server.mark()
+
+    if args.sample_profile:
+        sampler = SamplingProfiler(args.sample_profile, interval=args.sample_interval)
+    else:
+        sampler = profiler_from_env()
+    if sampler is not None:
+        sampler.start()
+
+    reporter = MemoryReporter(model, trace=args.tracemalloc) if args.memory_every else None
+
+    def on_step(m):
+        if server is not None:
+            server.observe(m)
+        if reporter is not None and m.step_count % args.memory_every == 0:
+            report_memory(reporter, args.memory_json)
+
+    try:
+        stats = run_steps(model, args.steps, progress_every=args.progress, on_step=on_step)
+    finally:
+        if sampler is not None:
+            sampler.stop()
+        model.close()
+        bus.close()
+        if server is not None:
+            server.close()
+
+    if args.output:
+        write_series_csv(model, args.output)
+
+    alive = len([a for a in model.agents if isinstance(a, CitizenAgent) and not a.is_dead])
+    print(f"Model setup: {startup:.3f}s")
+    print(f"Ran {stats['steps']} steps in {stats['seconds']:.2f}s "
+          f"({stats['steps_per_second']:.1f} steps/sec), {alive} citizens alive")
+    if event_log is not None:
+        print(f"Recorded {event_log.events_written} events to {args.event_log}")
+    if args.timing:
+        print(model.timings.table())
+    if args.counters:
+        print(model.counters.table())
+    if args.agent_costs:
+        print(model.metrics.agent_costs.table(model))
+    if args.lod:
+        lod_stats = model.activation.stats()
+        print("Level of detail: " + ", ".join(f"{tier} {share:.0%}" for tier, share
+                                              in lod_stats['tier_fractions'].items())
+              + f" of citizen steps, {lod_stats['behavior_fraction']:.0%} of behavior calls")
+    if args.metrics_json:
+        model.metrics.save_json(args.metrics_json, model)
+    if sampler is not None:
+        print(f"Wrote {sampler.samples} stack samples to {sampler.path} "
+              f"(sampling overhead {sampler.overhead:.1%})")
+    return stats
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\nSimulation stopped by user.")
@@ -0,0 +1,202 @@
+"""
+Level-of-detail (LOD) tiers for citizen behavior.
+
+At large populations not every citizen needs the full PHASE 3 and PHASE 4
+psychology every step. With `CityModel(lod=policy)` each citizen is stepped
+at one of three tiers:
+
+  FULL     every behavior, every step (CitizenAgent.step)
+  REDUCED  survival, work and family every step (REDUCED_BEHAVIORS); all
+           behaviors -- culture, research, diplomacy, psychology -- every
+           `lod_every` steps, staggered across citizens
+  MINIMAL  needs, health and movement only (MINIMAL_BEHAVIORS)
+
+A policy assigns the tiers every `reassign_every` steps:
+
+    FocusPolicy((50, 50), full_radius=10, reduced_radius=30)  # around a viewport
+    ImportancePolicy()                                        # leaders, parents
+    SamplingPolicy(full=0.1, reduced=0.4)                     # random sample
+    CombinedPolicy(FocusPolicy(...), ImportancePolicy())      # most detailed wins
+
+`model.activation.stats()` reports the citizen steps per tier and the
+fraction of behavior calls actually run; `fidelity(reference, candidate)`
+compares the collected statistics of a full-detail run with an LOD run.
+"""
+
+from agent import CitizenAgent
+
+
+FULL, REDUCED, MINIMAL = 'full', 'reduced', 'minimal'
+TIERS = (FULL, REDUCED, MINIMAL)  # Most detailed first
+
+# Behaviors run every step at REDUCED detail (in CitizenAgent.BEHAVIORS order)
+REDUCED_BEHAVIORS = tuple(name for name in CitizenAgent.BEHAVIORS if name in (
+    'develop_skills', 'update_profession', 'attempt_trading', 'manage_family',
+    'choose_action', 'check_for_social_interactions',
+))
+
+# Behaviors run at MINIMAL detail: moving (which includes eating, sleeping and working where the citizen lands)
+MINIMAL_BEHAVIORS = ('choose_action',)
+
+
+def _citizens(model):
+    return [a for a in model.agents if isinstance(a, CitizenAgent) and not a.is_dead]
+
+
+class FocusPolicy:
+    """Full detail near a focus point, reduced further out, minimal beyond."""
+
+    def __init__(self, center, full_radius=10, reduced_radius=30):
+        self.center = tuple(center)
+        self.full_radius = full_radius
+        self.reduced_radius = reduced_radius
+
+    def assign(self, model):
+        cx, cy = self.center
+        tiers = {}
+        for agent in _citizens(model):
+            if agent.pos is None:
+                tiers[agent.unique_id] = MINIMAL
+                continue
+            distance = max(abs(agent.pos[0] - cx), abs(agent.pos[1] - cy))  # Square viewport
+            if distance <= self.full_radius:
+                tiers[agent.unique_id] = FULL
+            elif distance <= self.reduced_radius:
+                tiers[agent.unique_id] = REDUCED
+            else:
+                tiers[agent.unique_id] = MINIMAL
+        return tiers
+
+
+class ImportancePolicy:
+    """Full detail for leaders and family heads (parents), `default` for everyone else."""
+
+    def __init__(self, default=REDUCED):
+        self.default = default
+
+    def assign(self, model):
+        return {agent.unique_id: FULL if (agent.is_leader or agent.has_leadership_role or
+                                          (agent.family_id is not None and agent.children))
+                else self.default
+                for agent in _citizens(model)}
+
+
+class SamplingPolicy:
+    """Random tiers: a `full` fraction at full detail, a `reduced` fraction reduced, the rest minimal."""
+
+    def __init__(self, full=0.1, reduced=0.4):
+        self.full = full
+        self.reduced = reduced
+
+    def assign(self, model):
+        rng = model.get_rng('lod')
+        tiers = {}
+        for agent in _citizens(model):
+            draw = rng.random()
+            if draw < self.full:
+                tiers[agent.unique_id] = FULL
+            elif draw < self.full + self.reduced:
+                tiers[agent.unique_id] = REDUCED
+            else:
+                tiers[agent.unique_id] = MINIMAL
+        return tiers
+
+
+class CombinedPolicy:
+    """Give every citizen the most detailed tier any of the policies assigns."""
+
+    def __init__(self, *policies):
+        self.policies = policies
+
+    def assign(self, model):
+        tiers = {}
+        for policy in self.policies:
+            for unique_id, tier in policy.assign(model).items():
+                current = tiers.get(unique_id)
+                if current is None or TIERS.index(tier) < TIERS.index(current):
+                    tiers[unique_id] = tier
+        return tiers
+
+
+class LevelOfDetailActivation:
+    """Step each citizen at the detail tier its policy assigns."""
+
+    def __init__(self, model, policy, every=5, reassign_every=10):
+        self.model = model
+        self.policy = policy
+        self.every = max(1, every)
+        self.reassign_every = max(1, reassign_every)
+        self.tiers = {}
+        self.next_assignment = None
+        self.tier_steps = {tier: 0 for tier in TIERS}
+        self.behavior_calls = 0       # Behaviors run
+        self.full_behavior_calls = 0  # Behaviors a full-detail run would have run
+
+    def step(self):
+        model = self.model
+        step = model.step_count
+        if self.next_assignment is None or step >= self.next_assignment:
+            self.tiers = self.policy.assign(model)
+            self.next_assignment = step + self.reassign_every
+
+        run = model.metrics.run
+        costs = model.metrics.agent_costs
+        due = model.behavior_schedule.due
+        for agent in model.agents:  # Births and removals are deferred (mutations.py)
+            if not isinstance(agent, CitizenAgent):
+                agent.step()
+                continue
+            if agent.is_dead:
+                continue
+            tier = self.tiers.get(agent.unique_id, FULL)  # Newborns get full detail until reassigned
+            self.tier_steps[tier] += 1
+            if tier == FULL:
+                names = costs.call(agent, 'step', agent.step) if costs.enabled else agent.step()
+                if names is None:  # Died this step: no behaviors ran
+                    continue
+            elif not agent.update_vitals():
+                continue
+            else:
+                if tier == REDUCED:
+                    subset = None if (step + agent.unique_id) % self.every == 0 else REDUCED_BEHAVIORS
+                else:
+                    subset = MINIMAL_BEHAVIORS
+                names = due(step, agent.unique_id, subset)
+                run(agent, names, 'agent')
+            self.behavior_calls += len(names)
+            self.full_behavior_calls += len(due(step, agent.unique_id))
+
+    def stats(self):
+        """Citizen steps per tier and the share of behavior calls that ran."""
+        total = sum(self.tier_steps.values())
+        return {
+            'tier_steps': dict(self.tier_steps),
+            'tier_fractions': {tier: count / total if total else 0.0 for tier, count in self.tier_steps.items()},
+            'behavior_calls': self.behavior_calls,
+            'behavior_fraction': (self.behavior_calls / self.full_behavior_calls
+                                  if self.full_behavior_calls else 1.0),
+        }
+
+    def close(self):
+        pass
+
+
+def fidelity(reference, candidate):
+    """Compare the collected statistics of a full-detail and an LOD model of the same setup.
+
+    Returns {statistic: {'reference', 'candidate', 'relative_error'}} using the
+    mean over all collected rows.
+    """
+    result = {}
+    ref_vars = reference.datacollector.model_vars
+    cand_vars = candidate.datacollector.model_vars
+    for name, ref_values in ref_vars.items():
+        cand_values = cand_vars.get(name)
+        if not ref_values or not cand_values:
+            continue
+        ref_mean = sum(ref_values) / len(ref_values)
+        cand_mean = sum(cand_values) / len(cand_values)
+        scale = max(abs(ref_mean), 1e-9)
+        result[name] = {'reference': ref_mean, 'candidate': cand_mean,
+                        'relative_error': abs(cand_mean - ref_mean) / scale}
+    return result
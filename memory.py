@@ -0,0 +1,199 @@
+"""
+Memory footprint reports for the AI City Simulation.
+
+MemoryReporter breaks the model's memory down by structure -- per citizen
+attribute (relationships, friendships, memories, known locations, trade
+partners, ...) and per model collection (policies, trade routes, conflicts,
+collected data, ...) -- and reports bytes, entries, bytes per citizen, the
+growth since the previous report, and optionally the top allocating source
+lines from tracemalloc:
+
+    reporter = MemoryReporter(model)
+    ...  # run some steps
+    print(reporter.table(reporter.report()))
+
+A report walks every container once and costs roughly as much as a single
+model step, so it can run every few thousand steps. tracemalloc itself
+slows the simulation down noticeably and is off unless `trace=True`.
+"""
+
+import sys
+import time
+import tracemalloc
+
+from agent import CitizenAgent
+
+
+# Citizen attributes that grow over a run
+AGENT_STRUCTURES = (
+    'agent_relationships', 'friendships', 'long_term_memory', 'short_term_memory',
+    'cultural_memory', 'known_food_locations', 'known_job_locations', 'trade_partners',
+    'alliance_preferences', 'learned_behaviors', 'mentors', 'students', 'children',
+    'research_projects', 'life_goals',
+)
+
+# Model collections that grow over a run
+MODEL_STRUCTURES = (
+    'policies', 'trade_routes_established', 'conflicts', 'alliances', 'peace_treaties',
+    'cultural_achievements', 'philosophical_schools', 'innovations', 'research_projects',
+    'road_network', 'families', 'communities', 'technologies', 'social_rankings',
+    'collected_steps',
+)
+
+CONTAINERS = (dict, list, tuple, set, frozenset)
+
+
+def deep_size(obj, seen):
+    """Size in bytes of a container and everything it holds (objects in `seen` are skipped)."""
+    getsizeof = sys.getsizeof
+    size = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        key = id(item)
+        if key in seen:
+            continue
+        seen.add(key)
+        size += getsizeof(item)
+        kind = type(item)
+        if kind is dict:
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif kind in CONTAINERS:
+            stack.extend(item)
+    return size
+
+
+class MemoryReporter:
+    """Produce memory footprint reports of a model at any step."""
+
+    def __init__(self, model, trace=False, trace_frames=1, top=10):
+        self.model = model
+        self.trace = trace
+        self.top = top
+        self.previous = None
+        self._previous_snapshot = None
+        if trace and not tracemalloc.is_tracing():
+            tracemalloc.start(trace_frames)
+
+    def report(self):
+        """Measure the model now and compare with the previous report."""
+        start = time.perf_counter()
+        model = self.model
+        seen = set()
+        citizens = [a for a in model.agents if isinstance(a, CitizenAgent)]
+
+        structures = {}
+        per_agent = []
+        for agent in citizens:
+            agent_bytes = sys.getsizeof(agent.__dict__)
+            for name in AGENT_STRUCTURES:
+                value = agent.__dict__.get(name)
+                if value is None:
+                    continue
+                size = deep_size(value, seen)
+                agent_bytes += size
+                entry = structures.setdefault(f"agent.{name}", {'bytes': 0, 'entries': 0})
+                entry['bytes'] += size
+                entry['entries'] += len(value) if hasattr(value, '__len__') else 1
+            per_agent.append((agent_bytes, agent.unique_id))
+
+        # Everything else a citizen holds (needs, skills, emotions, ...)
+        other = 0
+        for agent in citizens:
+            for name, value in agent.__dict__.items():
+                if name not in AGENT_STRUCTURES and name != 'model':
+                    other += deep_size(value, seen)
+        structures['agent.other_attributes'] = {'bytes': other, 'entries': len(citizens)}
+
+        for name in MODEL_STRUCTURES:
+            value = getattr(model, name, None)
+            if value is not None:
+                structures[f"model.{name}"] = {'bytes': deep_size(value, seen),
+                                               'entries': len(value) if hasattr(value, '__len__') else 1}
+        model_vars = model.datacollector.model_vars
+        structures['model.datacollector'] = {'bytes': deep_size(model_vars, seen),
+                                             'entries': sum(len(values) for values in model_vars.values())}
+
+        total = sum(entry['bytes'] for entry in structures.values())
+        num_citizens = len(citizens)
+        per_agent.sort(reverse=True)
+        report = {
+            'step': model.step_count,
+            'time': time.time(),
+            'citizens': num_citizens,
+            'alive': sum(1 for a in citizens if not a.is_dead),
+            'total_bytes': total,
+            'bytes_per_citizen': total / num_citizens if num_citizens else 0.0,
+            'structures': structures,
+            'largest_agents': [{'agent_id': agent_id, 'bytes': size} for size, agent_id in per_agent[:self.top]],
+        }
+        for name, entry in structures.items():
+            entry['bytes_per_citizen'] = entry['bytes'] / num_citizens if num_citizens else 0.0
+            if entry['entries']:
+                entry['bytes_per_entry'] = entry['bytes'] / entry['entries']
+
+        # Growth since the previous report
+        if self.previous is not None:
+            steps = report['step'] - self.previous['step']
+            report['growth'] = {'steps': steps, 'total_bytes': total - self.previous['total_bytes']}
+            for name, entry in structures.items():
+                before = self.previous['structures'].get(name, {'bytes': 0})['bytes']
+                entry['growth_bytes'] = entry['bytes'] - before
+                entry['growth_per_1000_steps'] = 1000 * entry['growth_bytes'] / steps if steps else 0.0
+
+        if self.trace and tracemalloc.is_tracing():
+            report['tracemalloc'] = self._trace_report()
+
+        report['report_seconds'] = time.perf_counter() - start
+        self.previous = report
+        return report
+
+    def _trace_report(self):
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        result = {
+            'traced_bytes': current,
+            'peak_traced_bytes': peak,
+            'top': [{'where': str(stat.traceback[0]), 'bytes': stat.size, 'blocks': stat.count}
+                    for stat in snapshot.statistics('lineno')[:self.top]],
+        }
+        if self._previous_snapshot is not None:
+            result['top_growth'] = [
+                {'where': str(stat.traceback[0]), 'bytes': stat.size_diff, 'blocks': stat.count_diff}
+                for stat in snapshot.compare_to(self._previous_snapshot, 'lineno')[:self.top]
+            ]
+        self._previous_snapshot = snapshot
+        return result
+
+    @staticmethod
+    def table(report):
+        """Format a report as text."""
+        lines = [f"Memory at step {report['step']}: {report['total_bytes'] / 1e6:.2f} MB in tracked structures, "
+                 f"{report['bytes_per_citizen']:.0f} bytes per citizen ({report['citizens']} citizens, "
+                 f"report took {report['report_seconds'] * 1000:.0f} ms)"]
+        growing = 'growth' in report
+        header = f"{'structure':<34} {'bytes':>12} {'entries':>9} {'B/citizen':>10} {'B/entry':>9}"
+        if growing:
+            header += f" {'growth':>11} {'per 1k steps':>13}"
+        lines.append(header)
+        for name, entry in sorted(report['structures'].items(), key=lambda item: -item[1]['bytes']):
+            line = (f"{name:<34} {entry['bytes']:>12} {entry['entries']:>9} "
+                    f"{entry['bytes_per_citizen']:>10.0f} {entry.get('bytes_per_entry', 0):>9.0f}")
+            if growing:
+                line += f" {entry['growth_bytes']:>+11} {entry['growth_per_1000_steps']:>+13.0f}"
+            lines.append(line)
+
+        trace = report.get('tracemalloc')
+        if trace:
+            lines.append(f"tracemalloc: {trace['traced_bytes'] / 1e6:.2f} MB traced "
+                         f"(peak {trace['peak_traced_bytes'] / 1e6:.2f} MB)")
+            for title, key in (("top allocators", 'top'), ("top growth since last report", 'top_growth')):
+                if key in trace:
+                    lines.append(f"  {title}:")
+                    for stat in trace[key]:
+                        lines.append(f"    {stat['bytes']:>+12} B {stat['blocks']:>+8} blocks  {stat['where']}")
+        return "\n".join(lines)
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Test the memory footprint reports.
+Shared objects must be counted once, and growth must be reported between reports.
+"""
+
+import sys
+
+from model import CityModel
+from events import EventBus
+from memory import MemoryReporter, deep_size
+
+
+def test_deep_size_counts_shared_objects_once():
+    """Objects already seen are not counted again."""
+    print("Testing deep sizes...")
+    shared = [[1.5], [2.5]]
+    first, second = {'a': shared}, {'b': shared}
+    seen = set()
+    assert deep_size(first, seen) >= sys.getsizeof(shared) + sum(map(sys.getsizeof, shared))
+    assert deep_size(shared, seen) == 0
+    assert deep_size(second, seen) == sys.getsizeof(second) + sys.getsizeof('b')
+    print("✓ Shared list counted once")
+
+
+def test_report_and_growth():
+    """Reports break memory down per structure and track growth between reports."""
+    print("Testing memory reports...")
+    model = CityModel(width=12, height=12, num_agents=10, num_food=15, num_houses=5, num_jobs=6,
+                      event_bus=EventBus(enabled=False), seed=2)
+    reporter = MemoryReporter(model, top=3)
+    first = reporter.report()
+    assert 'growth' not in first
+    assert first['total_bytes'] == sum(entry['bytes'] for entry in first['structures'].values())
+    assert first['bytes_per_citizen'] == first['total_bytes'] / first['citizens']
+    assert len(first['largest_agents']) == 3
+
+    for _ in range(10):
+        model.step()
+    second = reporter.report()
+    assert second['growth']['steps'] == 10
+    assert second['growth']['total_bytes'] == second['total_bytes'] - first['total_bytes']
+    relationships = second['structures']['agent.agent_relationships']
+    assert relationships['growth_bytes'] == relationships['bytes'] - first['structures']['agent.agent_relationships']['bytes']
+    assert "growth" in MemoryReporter.table(second)
+    print(f"✓ {second['bytes_per_citizen']:.0f} bytes per citizen, "
+          f"{second['growth']['total_bytes']:+} bytes over 10 steps")
+
+
+if __name__ == "__main__":
+    test_deep_size_counts_shared_objects_once()
+    test_report_and_growth()
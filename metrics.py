@@ -0,0 +1,234 @@
+"""
+Metrics for the AI City Simulation.
+
+Every CityModel has one `model.metrics` object that runs the model systems
+and agent behaviors and measures them in two ways:
+
+  - `metrics.timings` (profiling.PhaseTimer): wall time per phase
+  - `metrics.counters` (OperationCounters): how often the expensive
+    primitives are called -- full grid scans (coord_iter), cell lookups,
+    agent lookups by id, moves, relationship upserts and memory writes --
+    per step and per model system / agent behavior
+
+Counts show how a change affects the amount of work done, independent of
+machine speed. Both are off by default and can be switched at runtime:
+
+    model.metrics.counters.enabled = True
+    ...  # run some steps
+    print(model.metrics.report())
+"""
+
+import json
+import time
+from collections import deque
+
+from mesa.space import MultiGrid
+
+from profiling import PhaseTimer, AgentCostProfiler
+
+
+# Operations counted by OperationCounters
+OPERATIONS = (
+    'coord_iter',              # Full grid scan
+    'get_cell_list_contents',  # Cell contents lookup
+    'get_agent_by_id',         # Linear agent lookup
+    'move_agent',              # Grid move
+    'relationship_upsert',     # CitizenAgent.update_relationship
+    'memory_write',            # CitizenAgent.add_memory
+)
+
+
+class OperationCounters:
+    """Count hot-path operations per step and per model phase / agent behavior."""
+
+    def __init__(self, enabled=False, history=1000):
+        self.enabled = enabled
+        self.phase = None     # (scope, name) of the running phase, set by ModelMetrics
+        self.totals = {}      # {operation: cumulative count}
+        self.by_phase = {}    # {(scope, name): {operation: cumulative count}}
+        self.steps = 0        # Number of counted model steps
+        self.history = deque(maxlen=history)  # Per-step (step, {operation: count})
+        self._current = {}    # {((scope, name), operation): count} since the last fold
+
+    def reset(self):
+        """Forget everything counted so far."""
+        self.totals = {}
+        self.by_phase = {}
+        self.steps = 0
+        self.history.clear()
+        self._current = {}
+
+    def add(self, operation, n=1):
+        """Count `n` calls of an operation in the running phase."""
+        if self.enabled:
+            key = (self.phase, operation)
+            self._current[key] = self._current.get(key, 0) + n
+
+    def begin_step(self, step):
+        """Start counting a model step (counts made outside a step are folded in first)."""
+        if self._current:
+            self._fold()
+
+    def end_step(self, step):
+        """Finish a model step and record its counts."""
+        if not self.enabled and not self._current:
+            return
+        per_step = self._fold()
+        self.steps += 1
+        self.history.append((step, per_step))
+
+    def _fold(self):
+        """Move the pending counts into the totals; return them per operation."""
+        per_step = {}
+        for (phase, operation), count in self._current.items():
+            per_step[operation] = per_step.get(operation, 0) + count
+            self.totals[operation] = self.totals.get(operation, 0) + count
+            phase_counts = self.by_phase.setdefault(phase, {})
+            phase_counts[operation] = phase_counts.get(operation, 0) + count
+        self._current = {}
+        return per_step
+
+    def last_step(self):
+        """Counts of the most recent counted step."""
+        return dict(self.history[-1][1]) if self.history else {}
+
+    # Reporting
+
+    def table(self):
+        """Cumulative counts per phase formatted as a text table."""
+        operations = [op for op in OPERATIONS if op in self.totals]
+        operations += sorted(op for op in self.totals if op not in OPERATIONS)
+        width = max([24] + [len(op) for op in operations])
+        lines = [f"Counted steps: {self.steps}",
+                 f"{'operation':<{width}} {'total':>12} {'per step':>12}"]
+        for op in operations:
+            per_step = self.totals[op] / self.steps if self.steps else 0.0
+            lines.append(f"{op:<{width}} {self.totals[op]:>12} {per_step:>12.1f}")
+
+        lines.append("")
+        lines.append(f"{'phase':<46} " + " ".join(f"{op[:12]:>12}" for op in operations))
+        phases = sorted(self.by_phase, key=lambda p: -sum(self.by_phase[p].values()))
+        for phase in phases:
+            name = f"{phase[0]}.{phase[1]}" if phase else "(outside phases)"
+            counts = self.by_phase[phase]
+            lines.append(f"{name:<46} " + " ".join(f"{counts.get(op, 0):>12}" for op in operations))
+        return "\n".join(lines)
+
+    def to_dict(self):
+        """Cumulative, per-phase and per-step counts as plain data."""
+        return {
+            'steps': self.steps,
+            'totals': dict(self.totals),
+            'phases': {f"{phase[0]}.{phase[1]}" if phase else None: dict(counts)
+                       for phase, counts in self.by_phase.items()},
+            'history': [{'step': step, 'counts': counts} for step, counts in self.history],
+        }
+
+
+class CountingGrid(MultiGrid):
+    """MultiGrid that reports its expensive operations to OperationCounters."""
+
+    def __init__(self, width, height, torus, counters):
+        super().__init__(width, height, torus)
+        self.counters = counters
+
+    def coord_iter(self):
+        self.counters.add('coord_iter')
+        return super().coord_iter()
+
+    def get_cell_list_contents(self, cell_list):
+        self.counters.add('get_cell_list_contents')
+        return super().get_cell_list_contents(cell_list)
+
+    def move_agent(self, agent, pos):
+        self.counters.add('move_agent')
+        super().move_agent(agent, pos)
+
+
+class ModelMetrics:
+    """Runs model phases and agent behaviors, timing and counting them when enabled."""
+
+    def __init__(self, timing=False, counting=False):
+        self.timings = PhaseTimer(enabled=timing)
+        self.counters = OperationCounters(enabled=counting)
+        self.agent_costs = AgentCostProfiler()
+        self._step = None
+
+    @property
+    def enabled(self):
+        return self.timings.enabled or self.counters.enabled
+
+    @enabled.setter
+    def enabled(self, value):
+        self.timings.enabled = value
+        self.counters.enabled = value
+
+    def run(self, target, names, scope):
+        """Call `target.<name>()` for each name as a phase of `scope`."""
+        timings = self.timings
+        counters = self.counters
+        if not timings.enabled and not counters.enabled:
+            for name in names:
+                getattr(target, name)()
+            return
+
+        outer = counters.phase
+        clock = time.perf_counter
+        try:
+            for name in names:
+                method = getattr(target, name)
+                counters.phase = (scope, name)
+                if timings.enabled:
+                    start = clock()
+                    method()
+                    timings.record(scope, name, clock() - start)
+                else:
+                    method()
+        finally:
+            counters.phase = outer
+
+    def call(self, scope, name, function):
+        """Call `function()` as phase `name` of `scope` and return its result."""
+        if not self.enabled:
+            return function()
+        counters = self.counters
+        outer = counters.phase
+        counters.phase = (scope, name)
+        try:
+            start = time.perf_counter()
+            result = function()
+            if self.timings.enabled:
+                self.timings.record(scope, name, time.perf_counter() - start)
+        finally:
+            counters.phase = outer
+        return result
+
+    def begin_step(self, step):
+        self._step = step
+        self.timings.begin_step(step)
+        self.counters.begin_step(step)
+
+    def end_step(self):
+        self.timings.end_step()
+        self.counters.end_step(self._step)
+
+    def report(self):
+        """Timing and counter tables as text."""
+        parts = []
+        if self.timings.steps:
+            parts.append(self.timings.table())
+        if self.counters.steps:
+            parts.append(self.counters.table())
+        return "\n\n".join(parts) if parts else "No metrics recorded (enable metrics.timings or metrics.counters)"
+
+    def to_dict(self, model=None):
+        """All metrics as plain data (agent costs need the model to look up categories)."""
+        data = {'timings': self.timings.to_dict(), 'counters': self.counters.to_dict()}
+        if model is not None and self.agent_costs.seconds:
+            data['agent_costs'] = self.agent_costs.to_dict(model)
+        return data
+
+    def save_json(self, path, model=None):
+        """Write all metrics to a JSON file."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(model), f, indent=2)
@@ -0,0 +1,200 @@
+"""
+Live metrics endpoint for long-running simulations.
+
+MetricsServer serves Prometheus text-format metrics over HTTP from a
+background thread (standard library only, bound to localhost by default):
+
+    server = MetricsServer(port=9464)
+    server.mark()
+    for _ in range(steps):
+        model.step()
+        server.observe(model)
+    server.close()
+
+    curl http://127.0.0.1:9464/metrics
+
+The simulation thread never waits for HTTP clients: `observe()` updates a
+few numbers after each step and re-renders the metrics page at most every
+`publish_interval` seconds; the server thread only hands out the latest
+rendered page. Step latency is the time between two `observe()` calls.
+"""
+
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from agent import CitizenAgent
+
+
+# Upper bounds (seconds) of the step latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def resident_memory_bytes():
+    """Current resident set size of this process (peak RSS where unavailable)."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels.items()) + "}"
+
+
+class MetricsServer:
+    """Serve simulation metrics in Prometheus text format from a background thread."""
+
+    def __init__(self, port=9464, host='127.0.0.1', publish_interval=1.0):
+        self.publish_interval = publish_interval
+        self.steps = 0
+        self.busy_seconds = 0.0
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.steps_per_second = 0.0
+        self._last_observe = None
+        self._last_publish = None
+        self._window_start = (time.perf_counter(), 0)
+        self._page = b"# No steps observed yet\n"
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = server._page
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep the simulation output clean
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self.address = self._httpd.server_address
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='metrics-server', daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self):
+        return f"http://{self.address[0]}:{self.address[1]}/metrics"
+
+    def mark(self):
+        """Start timing the next step now (call right before the simulation loop)."""
+        self._last_observe = time.perf_counter()
+        self._window_start = (self._last_observe, self.steps)
+
+    def observe(self, model):
+        """Record one finished model step; call after every step."""
+        now = time.perf_counter()
+        if self._last_observe is not None:
+            latency = now - self._last_observe
+            self.busy_seconds += latency
+            self.bucket_counts[bisect_left(LATENCY_BUCKETS, latency)] += 1
+        self._last_observe = now
+        self.steps += 1
+
+        if self._last_publish is None or now - self._last_publish >= self.publish_interval:
+            start_time, start_steps = self._window_start
+            if now > start_time:
+                self.steps_per_second = (self.steps - start_steps) / (now - start_time)
+            self._window_start = (now, self.steps)
+            self._last_publish = now
+            self.publish(model)
+
+    def publish(self, model):
+        """Render the metrics page from the current model state."""
+        self._page = self.render(model).encode('utf-8')
+
+    def render(self, model):
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{labels} {value}")
+
+        metric('aisim_step', 'gauge', "Current model step.", [('', model.step_count)])
+        metric('aisim_steps_observed_total', 'counter', "Steps observed by this server.", [('', self.steps)])
+        metric('aisim_steps_per_second', 'gauge', "Steps per second since the last publish.",
+               [('', f"{self.steps_per_second:.6g}")])
+
+        # Step latency histogram (cumulative buckets)
+        lines.append("# HELP aisim_step_duration_seconds Wall time per model step.")
+        lines.append("# TYPE aisim_step_duration_seconds histogram")
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.bucket_counts):
+            cumulative += count
+            lines.append(f'aisim_step_duration_seconds_bucket{{le="{bound}"}} {cumulative}')
+        cumulative += self.bucket_counts[-1]
+        lines.append(f'aisim_step_duration_seconds_bucket{{le="+Inf"}} {cumulative}')
+        lines.append(f"aisim_step_duration_seconds_sum {self.busy_seconds:.6f}")
+        lines.append(f"aisim_step_duration_seconds_count {cumulative}")
+
+        # Population
+        alive = dead = relationships = 0
+        agent_types = {}
+        for agent in model.agents:
+            name = type(agent).__name__
+            agent_types[name] = agent_types.get(name, 0) + 1
+            if isinstance(agent, CitizenAgent):
+                if agent.is_dead:
+                    dead += 1
+                else:
+                    alive += 1
+                relationships += len(agent.agent_relationships)
+        metric('aisim_citizens', 'gauge', "Citizens by state.",
+               [(_labels(state='alive'), alive), (_labels(state='dead'), dead)])
+        metric('aisim_agents', 'gauge', "Agents by type.",
+               [(_labels(type=name), count) for name, count in sorted(agent_types.items())])
+        metric('aisim_relationships', 'gauge', "Tracked citizen relationships.", [('', relationships)])
+        metric('aisim_families', 'gauge', "Families.", [('', len(model.families))])
+        metric('aisim_technologies', 'gauge', "Discovered technologies.", [('', len(model.technologies))])
+
+        memory = resident_memory_bytes()
+        if memory is not None:
+            metric('aisim_process_resident_memory_bytes', 'gauge', "Resident memory of the process.",
+                   [('', memory)])
+
+        # Phase timings and operation counters (when enabled on the model)
+        timings = model.metrics.timings
+        if timings.seconds:
+            metric('aisim_phase_seconds_total', 'counter', "Wall time per model system / agent behavior.",
+                   [(_labels(scope=scope, phase=name), f"{seconds:.6f}")
+                    for (scope, name), seconds in sorted(timings.seconds.items())])
+            metric('aisim_phase_calls_total', 'counter', "Calls per model system / agent behavior.",
+                   [(_labels(scope=scope, phase=name), count)
+                    for (scope, name), count in sorted(timings.calls.items())])
+        counters = model.metrics.counters
+        if counters.totals:
+            metric('aisim_operations_total', 'counter', "Hot-path operations.",
+                   [(_labels(operation=name), count) for name, count in sorted(counters.totals.items())])
+
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        """Stop serving."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test the live metrics endpoint.
+The page must be valid Prometheus text with the model's current numbers and
+must be served while the simulation runs.
+"""
+
+import urllib.error
+import urllib.request
+
+from model import CityModel
+from agent import CitizenAgent
+from events import EventBus
+from metrics_server import MetricsServer
+from headless import parse_args, enable_metrics
+
+
+def fetch(url):
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return response.headers['Content-Type'], response.read().decode('utf-8')
+
+
+def samples(page):
+    """{metric with labels: value} of a text-format page."""
+    return dict(line.rsplit(' ', 1) for line in page.splitlines() if line and not line.startswith('#'))
+
+
+def test_metrics_page():
+    """Step, population and the latency histogram are published after observe()."""
+    print("Testing metrics endpoint...")
+    model = CityModel(width=12, height=12, num_agents=10, num_food=15, num_houses=5, num_jobs=6,
+                      event_bus=EventBus(enabled=False), seed=3, timing=True)
+    with MetricsServer(port=0, publish_interval=0) as server:
+        _, page = fetch(server.url)
+        assert page.startswith("# No steps observed yet")
+
+        server.mark()
+        for _ in range(5):
+            model.step()
+            server.observe(model)
+        content_type, page = fetch(server.url)
+        assert content_type.startswith('text/plain; version=0.0.4')
+        values = samples(page)
+        alive = sum(1 for a in model.agents if isinstance(a, CitizenAgent) and not a.is_dead)
+        assert values['aisim_step'] == '5'
+        assert values['aisim_steps_observed_total'] == '5'
+        assert values['aisim_citizens{state="alive"}'] == str(alive)
+        assert values['aisim_step_duration_seconds_bucket{le="+Inf"}'] == '5'
+        assert values['aisim_step_duration_seconds_count'] == '5'
+        assert 'aisim_phase_seconds_total{scope="agent",phase="choose_action"}' in values
+
+        try:
+            fetch(server.url.replace('/metrics', '/other'))
+        except urllib.error.HTTPError as e:
+            assert e.code == 404
+        else:
+            raise AssertionError("unknown path served")
+    print(f"✓ {len(values)} samples served at step 5")
+
+
+def test_metrics_port_enables_timing():
+    """--metrics-port alone turns on phase timings, so the page reports them."""
+    print("Testing --metrics-port timings...")
+    model = CityModel(width=12, height=12, num_agents=10, num_food=15, num_houses=5, num_jobs=6,
+                      event_bus=EventBus(enabled=False), seed=3)
+    enable_metrics(model, parse_args(['--metrics-port', '0']))
+    assert model.timings.enabled and not model.counters.enabled
+    with MetricsServer(port=0, publish_interval=0) as server:
+        server.mark()
+        for _ in range(3):
+            model.step()
+            server.observe(model)
+        _, page = fetch(server.url)
+    assert model.timings.calls
+    assert any(name.startswith('aisim_phase_seconds_total') for name in samples(page))
+    print(f"✓ {len(model.timings.calls)} timed phases published")
+
+
+if __name__ == "__main__":
+    test_metrics_page()
+    test_metrics_port_enables_timing()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test phase timing and operation counting.
+Counts must land on the phase that made them, also when a phase raises.
+"""
+
+from metrics import ModelMetrics
+
+
+class Target:
+    def __init__(self, counters):
+        self.counters = counters
+
+    def eat(self):
+        self.counters.add('move_agent')
+
+    def fail(self):
+        self.counters.add('memory_write')
+        raise RuntimeError("behavior failed")
+
+
+def test_counts_per_phase():
+    """Operations are attributed to the running phase, and to no phase outside one."""
+    print("Testing counts per phase...")
+    metrics = ModelMetrics(timing=True, counting=True)
+    target = Target(metrics.counters)
+    metrics.begin_step(1)
+    metrics.run(target, ('eat', 'eat'), 'agent')
+    metrics.call('model', 'feed', target.eat)
+    metrics.counters.add('coord_iter')
+    metrics.end_step()
+
+    counters = metrics.counters
+    assert counters.last_step() == {'move_agent': 3, 'coord_iter': 1}
+    assert counters.by_phase[('agent', 'eat')] == {'move_agent': 2}
+    assert counters.by_phase[('model', 'feed')] == {'move_agent': 1}
+    assert counters.by_phase[None] == {'coord_iter': 1}
+    print("✓ Counts split by phase")
+
+
+def test_phase_restored_after_error():
+    """A raising behavior or system does not leave its phase behind."""
+    print("Testing phase restore after errors...")
+    metrics = ModelMetrics(counting=True)
+    target = Target(metrics.counters)
+    for run in (lambda: metrics.run(target, ('eat', 'fail'), 'agent'),
+                lambda: metrics.call('model', 'fail', target.fail)):
+        try:
+            run()
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("error swallowed")
+        assert metrics.counters.phase is None
+    print("✓ Phase reset to the outer phase")
+
+
+if __name__ == "__main__":
+    test_counts_per_phase()
+    test_phase_restored_after_error()
@@ -1,15 +1,70 @@
+import os
 import random
 from mesa import Model
-from mesa.space import MultiGrid
 from mesa.datacollection import DataCollector
 from agent import CitizenAgent, Food, House, Job, Market, Workshop, Temple, School
+from events import EventBus, DEBUG, INFO, NOTICE
+from metrics import ModelMetrics, CountingGrid
+from activation import TwoPhaseActivation
+from shared_state import SharedState
+from scheduling import EventDrivenActivation
+from lod import LevelOfDetailActivation
+from pipeline import SystemPipeline, BehaviorSchedule
+from mutations import MutationQueue
+
+
+def fresh_seed():
+    """A random 64-bit seed for models created without one."""
+    return int.from_bytes(os.urandom(8), 'little')
 
 
 class CityModel(Model):
     """A model representing a simple city with agents, food, and houses."""
     
-    def __init__(self, width=20, height=20, num_agents=50, num_food=60, num_houses=20, num_jobs=25):
-        super().__init__()
+    def __init__(self, width=20, height=20, num_agents=50, num_food=60, num_houses=20, num_jobs=25,
+                 event_bus=None, collect_interval=1, seed=None, rng_substreams=False, timing=False,
+                 counting=False, two_phase=False, decide_workers=0, share_state=False,
+                 event_driven=False, max_idle=10, lod=None, lod_every=5,
+                 systems=None, behaviors=None):
+        # Unseeded models draw a concrete seed, so substreams (get_rng), two-phase
+        # decisions and branches derived from it differ between models
+        super().__init__(seed=fresh_seed() if seed is None else seed)
+        
+        # Per-model random number generation: agents draw from self.random, model
+        # subsystems optionally from independent substreams (see get_rng)
+        self.seed = self._seed
+        self.rng_substreams = rng_substreams
+        self.rng_streams = {}
+        
+        # Event bus for births, deaths, trades, discoveries, ... (prints to console by default)
+        self.events = event_bus if event_bus is not None else EventBus.console()
+        
+        # Per-phase wall time and hot-path operation counts (toggle with timings/counters.enabled)
+        self.metrics = ModelMetrics(timing=timing, counting=counting)
+        self.timings = self.metrics.timings
+        self.counters = self.metrics.counters
+        
+        # Optional two-phase (decide/apply) citizen activation, see activation.py
+        self.two_phase = two_phase
+        self.decide_workers = decide_workers
+        # ... or event-driven activation that fully steps only citizens with pending decisions
+        self.event_driven = event_driven
+        self.max_idle = max_idle
+        # ... or level-of-detail tiers assigned by a policy (lod.py)
+        self.lod = lod
+        self.lod_every = lod_every
+        if sum(map(bool, (self.two_phase, event_driven, lod is not None))) > 1:
+            raise ValueError("Choose one of two_phase, event_driven and lod")
+        
+        # Births and removals while agents step are applied at the end of the agent phase (mutations.py)
+        self.mutations = MutationQueue()
+        
+        # Model systems run every step: per-system enable flag, interval and order
+        # (`systems={'advance_culture': {'every': 10}, ...}`, see pipeline.py)
+        self.pipeline = SystemPipeline(self.SYSTEMS, systems)
+        # ... and the same per citizen behavior, on top of CitizenAgent.BEHAVIOR_CADENCE
+        # (`behaviors={'engage_in_cultural_activities': {'every': 5}, ...}`)
+        self.behavior_schedule = BehaviorSchedule(CitizenAgent.BEHAVIORS, CitizenAgent.BEHAVIOR_CADENCE, behaviors)
         
         # Model parameters (SCALED UP FOR LARGER POPULATION)
         self.width = width
@@ -20,7 +75,8 @@ class CityModel(Model):
         self.num_jobs = num_jobs  # Increased from 8 to 25
         
         # Create grid 
-        self.grid = MultiGrid(width, height, torus=False)
+        self.grid = self.create_grid(width, height)
+        self.activation = self.create_activation()
         
         # Track unique IDs
         self.next_id = 0
@@ -39,6 +95,7 @@ class CityModel(Model):
         # Environmental variables
         self.season = "spring"
         self.weather = "clear"
+        self.pinned_weather = None  # Weather held fixed instead of changing at random (see pin_weather)
         self.temperature = 20
         self.humidity = 50
         self.steps = 0  # Track model steps for seasonal changes
@@ -117,8 +174,39 @@ class CityModel(Model):
         self.cultural_renaissance_level = 0
         self.psychological_wellbeing = 50
         
-        # Data collection
-        self.datacollector = DataCollector(
+        # Data collection (every `collect_interval` steps)
+        self.collect_interval = max(1, collect_interval)
+        self.collected_steps = []  # Step number of every collected row
+        self.datacollector = self.create_datacollector()
+        
+        # Create environment objects
+        self.create_houses()
+        self.create_jobs()
+        self.create_advanced_buildings()  # NEW: Create markets, workshops, temples, schools
+        self.create_initial_food()
+        
+        # Initialize communities based on house/job clusters
+        self.initialize_communities()
+        
+        # Create agents
+        self.create_agents()
+        
+        # Optionally publish core state arrays to shared memory after every step
+        self.share_state = share_state
+        self.shared_state = self.create_shared_state()
+        
+        # Start data collection
+        self.collect_data()
+        
+        self.running = True
+        
+    def create_grid(self, width, height):
+        """Create the city grid (counts its expensive operations in self.counters)."""
+        return CountingGrid(width, height, torus=False, counters=self.counters)
+    
+    def create_datacollector(self):
+        """Create the data collector with all model reporters."""
+        return DataCollector(
             model_reporters={
                 "Total Agents": lambda m: len([a for a in m.agents if isinstance(a, CitizenAgent)]),
                 "Alive Agents": lambda m: len([a for a in m.agents if isinstance(a, CitizenAgent) and not a.is_dead]),
@@ -140,24 +228,62 @@ class CityModel(Model):
                 "Children": lambda m: self.update_family_stats()[1],
             }
         )
-        
-        # Create environment objects
-        self.create_houses()
-        self.create_jobs()
-        self.create_advanced_buildings()  # NEW: Create markets, workshops, temples, schools
-        self.create_initial_food()
-        
-        # Initialize communities based on house/job clusters
-        self.initialize_communities()
-        
-        # Create agents
-        self.create_agents()
-        
-        # Start data collection
-        self.datacollector.collect(self)
-        
-        self.running = True
-        
+    
+    def create_activation(self):
+        """Create the configured agent activation, or None for sequential agent stepping."""
+        if self.event_driven:
+            return EventDrivenActivation(self, max_idle=self.max_idle)
+        if self.lod is not None:
+            return LevelOfDetailActivation(self, self.lod, every=self.lod_every)
+        if not self.two_phase:
+            return None
+        return TwoPhaseActivation(self, workers=self.decide_workers)
+    
+    def create_shared_state(self):
+        """Create and fill the shared-memory state block, or None when not sharing state."""
+        if not self.share_state:
+            return None
+        shared_state = SharedState(self)
+        shared_state.publish()
+        return shared_state
+    
+    def close(self):
+        """Release decision worker processes and the shared-memory state block."""
+        if self.activation is not None:
+            self.activation.close()
+        if self.shared_state is not None:
+            self.shared_state.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def get_rng(self, subsystem):
+        """Get the random generator for a model subsystem (weather, food, culture, ...).
+        
+        Without substreams every subsystem shares the model's main generator. With
+        `rng_substreams=True` each subsystem gets its own generator derived from the
+        model seed, so changing one subsystem's draws does not shift the others.
+        """
+        if not self.rng_substreams:
+            return self.random
+        rng = self.rng_streams.get(subsystem)
+        if rng is None:
+            rng = random.Random(f"{self.seed}:{subsystem}")
+            self.rng_streams[subsystem] = rng
+        return rng
+    
+    def reseed(self, seed):
+        """Restart all random generators (main, NumPy and substreams) from a new seed."""
+        if seed is None:
+            seed = fresh_seed()
+        self.reset_randomizer(seed)
+        self.reset_rng(seed)
+        self.seed = seed
+        self.rng_streams = {}
+    
     def get_next_id(self):
         """Get the next unique ID for agents."""
         current_id = self.next_id
@@ -166,12 +292,13 @@ class CityModel(Model):
     
     def create_houses(self):
         """Create houses randomly distributed in the city."""
+        rng = self.get_rng('setup')
         for _ in range(self.num_houses):
             # Find an empty location
             attempts = 0
             while attempts < 100:  # Avoid infinite loop
-                x = random.randrange(self.width)
-                y = random.randrange(self.height)
+                x = rng.randrange(self.width)
+                y = rng.randrange(self.height)
                 
                 if self.grid.is_cell_empty((x, y)):
                     house = House(self)
@@ -181,12 +308,13 @@ class CityModel(Model):
     
     def create_jobs(self):
         """Create job locations randomly distributed in the city."""
+        rng = self.get_rng('setup')
         for _ in range(self.num_jobs):
             # Find an empty location
             attempts = 0
             while attempts < 100:  # Avoid infinite loop
-                x = random.randrange(self.width)
-                y = random.randrange(self.height)
+                x = rng.randrange(self.width)
+                y = rng.randrange(self.height)
                 
                 if self.grid.is_cell_empty((x, y)):
                     job = Job(self)
@@ -196,12 +324,13 @@ class CityModel(Model):
     
     def create_advanced_buildings(self):
         """Create advanced buildings: markets, workshops, temples, schools."""
+        rng = self.get_rng('setup')
         # Create markets
         for _ in range(self.num_markets):
             attempts = 0
             while attempts < 100:
-                x = random.randrange(self.width)
-                y = random.randrange(self.height)
+                x = rng.randrange(self.width)
+                y = rng.randrange(self.height)
                 if self.grid.is_cell_empty((x, y)):
                     market = Market(self)
                     self.grid.place_agent(market, (x, y))
@@ -212,8 +341,8 @@ class CityModel(Model):
         for _ in range(self.num_workshops):
             attempts = 0
             while attempts < 100:
-                x = random.randrange(self.width)
-                y = random.randrange(self.height)
+                x = rng.randrange(self.width)
+                y = rng.randrange(self.height)
                 if self.grid.is_cell_empty((x, y)):
                     workshop = Workshop(self)
                     self.grid.place_agent(workshop, (x, y))
@@ -224,8 +353,8 @@ class CityModel(Model):
         for _ in range(self.num_temples):
             attempts = 0
             while attempts < 100:
-                x = random.randrange(self.width)
-                y = random.randrange(self.height)
+                x = rng.randrange(self.width)
+                y = rng.randrange(self.height)
                 if self.grid.is_cell_empty((x, y)):
                     temple = Temple(self)
                     self.grid.place_agent(temple, (x, y))
@@ -236,8 +365,8 @@ class CityModel(Model):
         for _ in range(self.num_schools):
             attempts = 0
             while attempts < 100:
-                x = random.randrange(self.width)
-                y = random.randrange(self.height)
+                x = rng.randrange(self.width)
+                y = rng.randrange(self.height)
                 if self.grid.is_cell_empty((x, y)):
                     school = School(self)
                     self.grid.place_agent(school, (x, y))
@@ -251,10 +380,11 @@ class CityModel(Model):
     
     def spawn_food(self):
         """Spawn a single food item at a random empty location."""
+        rng = self.get_rng('food')
         attempts = 0
         while attempts < 100:  # Avoid infinite loop
-            x = random.randrange(self.width)
-            y = random.randrange(self.height)
+            x = rng.randrange(self.width)
+            y = rng.randrange(self.height)
             
             # Check if location is suitable for food (not on a house)
             cell_contents = self.grid.get_cell_list_contents([(x, y)])
@@ -268,49 +398,84 @@ class CityModel(Model):
     
     def create_agents(self):
         """Create citizen agents and place them randomly in the city."""
+        rng = self.get_rng('setup')
         for _ in range(self.num_agents):
             agent = CitizenAgent(self)
             
             # Find a location for the agent
             attempts = 0
             while attempts < 100:  # Avoid infinite loop
-                x = random.randrange(self.width)
-                y = random.randrange(self.height)
+                x = rng.randrange(self.width)
+                y = rng.randrange(self.height)
                 
                 # Agents can be placed anywhere
                 self.grid.place_agent(agent, (x, y))
                 break
     
+    # Default model systems of the step pipeline, in this order
+    SYSTEMS = (
+        # Weather and seasonal effects
+        'update_weather_and_seasons',
+        # PHASE 2: Technology and leadership progression
+        'advance_technology',
+        'update_resource_economy',
+        'process_leadership_actions',
+        # PHASE 3: Advanced civilization systems
+        'advance_culture',
+        'manage_conflicts',
+        'develop_infrastructure',
+        'conduct_research',
+        # PHASE 4: Advanced psychological and social systems
+        'monitor_community_wellbeing',
+        'facilitate_advanced_interactions',
+        'track_wisdom_and_learning',
+        'evaluate_cultural_renaissance',
+        'manage_complex_social_dynamics',
+        # Agents act, then new food grows
+        'step_agents',
+        'grow_food',
+    )
+    
     def step(self):
         """Execute one step of the model."""
-        # Update weather and seasonal effects
-        self.update_weather_and_seasons()
+        self.events.step = self.step_count
+        metrics = self.metrics
+        metrics.begin_step(self.step_count)
         
-        # PHASE 2: Technology and leadership progression
-        self.advance_technology()
-        self.update_resource_economy()
-        self.process_leadership_actions()
+        self.pipeline.run(self)
         
-        # PHASE 3: Advanced civilization systems
-        self.advance_culture()
-        self.manage_conflicts()
-        self.develop_infrastructure()
-        self.conduct_research()
+        # Increment step counter
+        self.steps += 1
+        self.step_count += 1
         
-        # PHASE 4: Advanced psychological and social systems
-        self.monitor_community_wellbeing()
-        self.facilitate_advanced_interactions()
-        self.track_wisdom_and_learning()
-        self.evaluate_cultural_renaissance()
-        self.manage_complex_social_dynamics()
-        
-        # Execute all agents
-        agents_copy = list(self.agents)  # Copy to avoid modification during iteration
-        for agent in agents_copy:
-            if agent in self.agents:  # Check if agent still exists
-                agent.step()
-        
-        # Weather-affected food spawning with technology bonus
+        if self.shared_state is not None:
+            metrics.call('model', 'publish_state', self.shared_state.publish)
+        
+        # Collect data
+        if self.step_count % self.collect_interval == 0:
+            metrics.call('model', 'collect_data', self.collect_data)
+        metrics.end_step()
+    
+    def step_agents(self):
+        """Execute all agents."""
+        # Births and removals wait until all agents have stepped, so the registry can be iterated directly
+        self.mutations.begin()
+        try:
+            if self.activation is not None:
+                self.activation.step()
+            else:
+                costs = self.metrics.agent_costs
+                for agent in self.agents:
+                    if costs.enabled and isinstance(agent, CitizenAgent):
+                        costs.call(agent, 'step', agent.step)
+                    else:
+                        agent.step()
+        finally:
+            self.mutations.apply(self)  # Also if an agent raised, so the queue never stays open
+    
+    def grow_food(self):
+        """Weather-affected food spawning with technology bonus."""
+        rng = self.get_rng('food')
         base_food_chance = 0.3
         if 'agriculture' in self.technologies:
             base_food_chance *= 1.5  # Agriculture tech boosts food production
@@ -324,24 +489,38 @@ class CityModel(Model):
         else:
             food_chance = base_food_chance
         
-        if random.random() < food_chance:
+        if rng.random() < food_chance:
             self.spawn_food()
             
         # Occasionally spawn extra food when population is high
         alive_agents = len([a for a in self.agents if isinstance(a, CitizenAgent) and not a.is_dead])
-        if alive_agents > 5 and random.random() < 0.2:
+        if alive_agents > 5 and rng.random() < 0.2:
             self.spawn_food()  # Extra food for large populations
-        
-        # Increment step counter
-        self.steps += 1
-        self.step_count += 1
-        
-        # Collect data
+    
+    def collect_data(self):
+        """Record the model reporters for the current step."""
         self.datacollector.collect(self)
+        self.collected_steps.append(self.step_count)
+    
+    def register_agent(self, agent):
+        """Register a new agent (at the end of the agent phase if created while agents step)."""
+        if self.mutations.active:
+            self.mutations.register(agent)
+        else:
+            super().register_agent(agent)
+    
+    def place_agent(self, agent, pos):
+        """Place a new agent on the grid (at the end of the agent phase if created while agents step)."""
+        if self.mutations.active:
+            self.mutations.place(agent, pos)
+        else:
+            self.grid.place_agent(agent, pos)
     
     def remove_agent(self, agent):
-        """Remove an agent from the model."""
-        if agent in self.agents:
+        """Remove an agent from the model (from the registry at the end of the agent phase while agents step)."""
+        if self.mutations.active:
+            self.mutations.remove(self, agent)
+        elif agent in self.agents:
             self.agents.remove(agent)
             self.grid.remove_agent(agent)
     
@@ -412,6 +591,7 @@ class CityModel(Model):
     
     def get_agent_by_id(self, agent_id):
         """Get an agent by its unique ID."""
+        self.counters.add('get_agent_by_id')
         for agent in self.agents:
             if isinstance(agent, CitizenAgent) and agent.unique_id == agent_id:
                 return agent
@@ -419,42 +599,42 @@ class CityModel(Model):
     
     def create_child_agent(self, parent1, parent2):
         """Create a child agent with mixed traits from two parents."""
+        rng = self.get_rng('family')
         # Mix personality traits from both parents
         all_parent_traits = parent1.personality_traits + parent2.personality_traits
         # Remove duplicates and randomly select 1-2 traits
-        unique_traits = list(set(all_parent_traits))
-        num_traits = random.choice([1, 2])
-        child_traits = random.sample(unique_traits, min(num_traits, len(unique_traits)))
+        unique_traits = sorted(set(all_parent_traits))
+        num_traits = rng.choice([1, 2])
+        child_traits = rng.sample(unique_traits, min(num_traits, len(unique_traits)))
         
         # Create child agent
         child = CitizenAgent(self)
-        child.personality_traits = child_traits
-        child.exploration_rate = 0.4 if 'explorer' in child_traits else 0.2
+        child.personality_traits = child_traits  # Rebuilds the child's behavior profile
         
         # Place child near parents
         attempts = 0
         while attempts < 20:
             # Try to place near parent1
             px, py = parent1.pos if parent1.pos else (self.width//2, self.height//2)
-            x = max(0, min(self.width-1, px + random.randint(-2, 2)))
-            y = max(0, min(self.height-1, py + random.randint(-2, 2)))
+            x = max(0, min(self.width-1, px + rng.randint(-2, 2)))
+            y = max(0, min(self.height-1, py + rng.randint(-2, 2)))
             
             # Check if position is reasonable (not overcrowded)
             cell_contents = self.grid.get_cell_list_contents([(x, y)])
             if len(cell_contents) < 3:  # Max 3 agents per cell
-                self.grid.place_agent(child, (x, y))
                 break
             attempts += 1
         else:
             # Fallback: place randomly
-            x = random.randrange(self.width)
-            y = random.randrange(self.height)
-            self.grid.place_agent(child, (x, y))
+            x = rng.randrange(self.width)
+            y = rng.randrange(self.height)
+        self.place_agent(child, (x, y))
         
         return child
     
     def initialize_communities(self):
         """Initialize communities based on house/job clusters."""
+        rng = self.get_rng('setup')
         house_positions = []
         job_positions = []
         
@@ -486,7 +666,7 @@ class CityModel(Model):
                 'id': community_id,
                 'center': center,
                 'agents': [],
-                'dominant_trait': random.choice(['greedy', 'friendly', 'lazy', 'explorer'])
+                'dominant_trait': rng.choice(['greedy', 'friendly', 'lazy', 'explorer'])
             }
     
     def get_community_at_position(self, pos):
@@ -543,13 +723,20 @@ class CityModel(Model):
                 (tech_data['prereq'] is None or tech_data['prereq'] in self.technologies)):
                 
                 # Discover technology!
-                self.technologies.add(tech_name)
                 self.technology_points -= tech_data['cost']
-                self.technological_level += 1
-                self.apply_technology_benefits(tech_name, tech_data['benefits'])
-                print(f"🔬 Technology discovered: {tech_name.title()}! (Level {self.technological_level})")
+                self.discover_technology(tech_name)
                 break
     
+    def discover_technology(self, tech_name):
+        """Add a technology of the tech tree, raise the technological level and apply its benefits."""
+        if tech_name not in self.tech_tree:
+            raise ValueError(f"Unknown technology: {tech_name}")
+        self.technologies.add(tech_name)
+        self.technological_level += 1
+        self.apply_technology_benefits(tech_name, self.tech_tree[tech_name]['benefits'])
+        self.events.emit('technology', "🔬 Technology discovered: {name}! (Level {tech_level})", NOTICE,
+                         name=tech_name.title(), tech=tech_name, tech_level=self.technological_level)
+    
     def apply_technology_benefits(self, tech_name, benefits):
         """Apply benefits of discovered technology."""
         if benefits == 'food_boost':
@@ -580,30 +767,36 @@ class CityModel(Model):
         elif benefits == 'cultural_growth':
             # Philosophy: Boost cultural development
             self.cultural_level += 1
-            print(f"🎭 Cultural level increased to {self.cultural_level}")
+            self.events.emit('technology', "🎭 Cultural level increased to {cultural_level}", INFO,
+                             tech=tech_name, cultural_level=self.cultural_level)
         elif benefits == 'defense_system':
             # Military: Improve conflict resolution
             self.military_strength += 10
-            print(f"🛡️ Military strength increased to {self.military_strength}")
+            self.events.emit('technology', "🛡️ Military strength increased to {strength}", INFO,
+                             tech=tech_name, strength=self.military_strength)
         elif benefits == 'infrastructure':
             # Engineering: Enable road building
             self.infrastructure_level += 2
-            print(f"🏗️ Infrastructure level increased to {self.infrastructure_level}")
+            self.events.emit('technology', "🏗️ Infrastructure level increased to {infrastructure_level}", INFO,
+                             tech=tech_name, infrastructure_level=self.infrastructure_level)
         elif benefits == 'health_boost':
             # Medicine: Improve agent health
             for agent in self.agents:
                 if isinstance(agent, CitizenAgent) and not agent.is_dead:
                     agent.max_health = min(120, agent.max_health + 10)
-            print(f"💊 Medicine improves maximum health for all citizens")
+            self.events.emit('technology', "💊 Medicine improves maximum health for all citizens", INFO,
+                             tech=tech_name)
         elif benefits == 'navigation':
             # Astronomy: Enable better trade routes
             for route in self.trade_routes_established:
                 route['profit'] = int(route['profit'] * 1.3)
-            print(f"🌟 Astronomy improves trade route efficiency")
+            self.events.emit('technology', "🌟 Astronomy improves trade route efficiency", INFO,
+                             tech=tech_name)
         elif benefits == 'advanced_research':
             # Mathematics: Enable complex research
             self.technology_points += 20  # Boost future tech development
-            print(f"🧮 Mathematics accelerates future discoveries")
+            self.events.emit('technology', "🧮 Mathematics accelerates future discoveries", INFO,
+                             tech=tech_name)
     
     def establish_leadership(self):
         """Establish leadership system when governance is discovered."""
@@ -629,7 +822,8 @@ class CityModel(Model):
                 self.leaders[community_id] = agent.unique_id
                 self.social_rankings[agent.unique_id] = score
                 agent.is_leader = True
-                print(f"👑 {agent.unique_id} becomes community leader with score {score:.1f}")
+                self.events.emit('leadership', "👑 {agent_id} becomes community leader with score {score:.1f}", NOTICE,
+                                 agents=(agent.unique_id,), agent_id=agent.unique_id, score=score)
     
     def update_resource_economy(self):
         """Update resource prices based on supply and demand."""
@@ -658,30 +852,48 @@ class CityModel(Model):
     
     def process_leadership_actions(self):
         """Process actions taken by community leaders."""
+        rng = self.get_rng('leadership')
         for community_id, leader_id in self.leaders.items():
             leader = self.get_agent_by_id(leader_id)
             if leader and not leader.is_dead:
                 # Leaders can influence community policies
-                if random.random() < 0.1:  # 10% chance per step
+                if rng.random() < 0.1:  # 10% chance per step
                     policy = self.generate_leadership_policy(leader)
                     if policy:
-                        self.policies.append(policy)
-                        self.apply_policy(policy)
-                        print(f"📜 Leader {leader_id} enacts policy: {policy['name']}")
+                        self.enact_policy(policy)
+                        self.events.emit('policy', "📜 Leader {leader_id} enacts policy: {name}", NOTICE,
+                                         agents=(leader_id,), leader_id=leader_id, name=policy['name'],
+                                         effect=policy['effect'])
+    
+    # Leadership policies by effect (see apply_policy)
+    POLICIES = {
+        'redistribute_wealth': {'name': 'Taxation', 'effect': 'redistribute_wealth', 'duration': 50},
+        'boost_social': {'name': 'Community Cooperation', 'effect': 'boost_social', 'duration': 30},
+        'boost_exploration': {'name': 'Expansion Initiative', 'effect': 'boost_exploration', 'duration': 40},
+    }
     
     def generate_leadership_policy(self, leader):
         """Generate a policy based on leader's traits and situation."""
         # Policy based on leader's personality
-        if 'greedy' in leader.personality_traits:
-            return {'name': 'Taxation', 'effect': 'redistribute_wealth', 'duration': 50}
-        elif 'friendly' in leader.personality_traits:
-            return {'name': 'Community Cooperation', 'effect': 'boost_social', 'duration': 30}
-        elif 'explorer' in leader.personality_traits:
-            return {'name': 'Expansion Initiative', 'effect': 'boost_exploration', 'duration': 40}
+        trait = leader.profile.leadership_trait
+        if trait == 'greedy':
+            return dict(self.POLICIES['redistribute_wealth'])
+        elif trait == 'friendly':
+            return dict(self.POLICIES['boost_social'])
+        elif trait == 'explorer':
+            return dict(self.POLICIES['boost_exploration'])
         return None
     
+    def enact_policy(self, policy):
+        """Record a policy as active and apply its effects."""
+        if policy.get('effect') not in self.POLICIES:
+            raise ValueError(f"Unknown policy effect: {policy.get('effect')}")
+        self.policies.append(policy)
+        self.apply_policy(policy)
+    
     def apply_policy(self, policy):
         """Apply the effects of a leadership policy."""
+        rng = self.get_rng('leadership')
         alive_agents = [a for a in self.agents if isinstance(a, CitizenAgent) and not a.is_dead]
         
         if policy['effect'] == 'redistribute_wealth':
@@ -690,7 +902,7 @@ class CityModel(Model):
             poor = [a for a in alive_agents if a.coins < 20]
             for rich_agent in wealthy:
                 if poor:
-                    poor_agent = random.choice(poor)
+                    poor_agent = rng.choice(poor)
                     transfer = min(10, rich_agent.coins * 0.1)
                     rich_agent.coins -= transfer
                     poor_agent.coins += transfer
@@ -703,11 +915,12 @@ class CityModel(Model):
         elif policy['effect'] == 'boost_exploration':
             # Increase exploration rates
             for agent in alive_agents:
-                if 'explorer' in agent.personality_traits:
+                if agent.profile.explorer:
                     agent.exploration_rate = min(0.8, agent.exploration_rate * 1.2)
     
     def update_weather_and_seasons(self):
         """Update weather patterns and seasonal cycles."""
+        rng = self.get_rng('weather')
         # Update season every 50 steps
         self.season_cycle += 1
         if self.season_cycle >= 50:
@@ -715,10 +928,12 @@ class CityModel(Model):
             seasons = ['spring', 'summer', 'autumn', 'winter']
             current_idx = seasons.index(self.season)
             self.season = seasons[(current_idx + 1) % 4]
-            print(f"Season changed to {self.season}")
+            self.events.emit('season', "Season changed to {season}", INFO, season=self.season)
         
         # Update weather every 10-20 steps
-        if random.random() < 0.1:  # 10% chance each step
+        if self.pinned_weather is not None:
+            self.weather = self.pinned_weather
+        elif rng.random() < 0.1:  # 10% chance each step
             weather_options = ['normal', 'rain', 'drought', 'storm']
             
             # Season influences weather probability
@@ -731,27 +946,39 @@ class CityModel(Model):
             else:  # winter
                 weights = [0.6, 0.1, 0.1, 0.2]   # More storms in winter
             
-            self.weather = random.choices(weather_options, weights=weights)[0]
+            self.weather = rng.choices(weather_options, weights=weights)[0]
             
         # Apply weather effects to agents
         self.apply_weather_effects()
     
+    # Weather kinds (clear is only the initial weather)
+    WEATHER = ('clear', 'normal', 'rain', 'drought', 'storm')
+    
+    def pin_weather(self, weather):
+        """Keep the weather fixed from now on (None lets it change at random again)."""
+        if weather is not None and weather not in self.WEATHER:
+            raise ValueError(f"Unknown weather: {weather}")
+        self.pinned_weather = weather
+        if weather is not None:
+            self.weather = weather
+    
     def apply_weather_effects(self):
         """Apply current weather effects to all agents."""
+        rng = self.get_rng('weather')
         alive_agents = [a for a in self.agents if isinstance(a, CitizenAgent) and not a.is_dead]
         
         for agent in alive_agents:
             if self.weather == 'storm':
                 # Storms drain energy and can cause health loss
                 agent.energy = max(0, agent.energy - 2)
-                if random.random() < 0.05:  # 5% chance of health loss
+                if rng.random() < 0.05:  # 5% chance of health loss
                     agent.health = max(0, agent.health - 5)
             elif self.weather == 'drought':
                 # Drought increases hunger rate slightly
                 agent.hunger = min(agent.max_hunger, agent.hunger + 1)
             elif self.weather == 'rain':
                 # Rain improves health slightly and reduces social needs
-                if random.random() < 0.3:
+                if rng.random() < 0.3:
                     agent.health = min(agent.max_health, agent.health + 1)
                     agent.social = max(0, agent.social - 2)  # Rain feels refreshing
        
@@ -759,6 +986,7 @@ class CityModel(Model):
     
     def advance_culture(self):
         """Manage cultural development and achievements."""
+        rng = self.get_rng('culture')
         # Count cultural contributors
         artists = [a for a in self.agents if isinstance(a, CitizenAgent) 
                   and not a.is_dead and getattr(a, 'profession', None) == 'merchant']
@@ -766,27 +994,28 @@ class CityModel(Model):
                        and not a.is_dead and getattr(a, 'profession', None) == 'scholar']
         
         # Generate art works
-        if len(artists) > 2 and random.random() < 0.05:
+        if len(artists) > 2 and rng.random() < 0.05:
             self.art_works += 1
-            if random.random() < 0.3:
-                print(f"🎨 New artwork created! Total: {self.art_works}")
+            self.events.emit('culture', "🎨 New artwork created! Total: {total}", DEBUG, total=self.art_works)
         
         # Philosophical developments
         if len(philosophers) > 3 and 'philosophy' in self.technologies:
-            if random.random() < 0.03:
-                school_name = random.choice(['Stoic', 'Empirical', 'Rational', 'Mystical', 'Practical'])
+            if rng.random() < 0.03:
+                school_name = rng.choice(['Stoic', 'Empirical', 'Rational', 'Mystical', 'Practical'])
                 self.philosophical_schools.append(school_name)
-                print(f"🧠 New philosophical school: {school_name} Philosophy")
+                self.events.emit('culture', "🧠 New philosophical school: {school} Philosophy", INFO,
+                                 school=school_name)
         
         # Build monuments when culturally advanced
-        if self.cultural_level > 3 and random.random() < 0.01:
+        if self.cultural_level > 3 and rng.random() < 0.01:
             self.monuments += 1
-            print(f"🏛️ New monument erected! Total: {self.monuments}")
+            self.events.emit('culture', "🏛️ New monument erected! Total: {total}", INFO, total=self.monuments)
         
         # Hold festivals
         if self.steps % 100 == 0 and len([a for a in self.agents if isinstance(a, CitizenAgent) and not a.is_dead]) > 20:
             self.festivals_held += 1
-            print(f"🎉 Festival celebrated! Community joy increases.")
+            self.events.emit('culture', "🎉 Festival celebrated! Community joy increases.", INFO,
+                             festivals=self.festivals_held)
             # Boost social and health for all agents
             for agent in self.agents:
                 if isinstance(agent, CitizenAgent) and not agent.is_dead:
@@ -795,19 +1024,21 @@ class CityModel(Model):
     
     def manage_conflicts(self):
         """Handle warfare, conflicts, and peace treaties."""
+        rng = self.get_rng('conflict')
         alive_agents = [a for a in self.agents if isinstance(a, CitizenAgent) and not a.is_dead]
         
         # Resource scarcity can lead to conflicts
         if self.global_resources['food'] < 30 and len(alive_agents) > 15:
-            if random.random() < 0.02:
+            if rng.random() < 0.02:
                 # Resource conflict emerges
                 conflict = {
                     'type': 'resource_dispute',
-                    'severity': random.choice(['minor', 'moderate', 'severe']),
-                    'duration': random.randint(5, 20)
+                    'severity': rng.choice(['minor', 'moderate', 'severe']),
+                    'duration': rng.randint(5, 20)
                 }
                 self.conflicts.append(conflict)
-                print(f"⚔️ Resource conflict erupted! Severity: {conflict['severity']}")
+                self.events.emit('conflict', "⚔️ Resource conflict erupted! Severity: {severity}", NOTICE,
+                                 severity=conflict['severity'], duration=conflict['duration'])
         
         # Process ongoing conflicts
         for conflict in self.conflicts[:]:
@@ -819,69 +1050,75 @@ class CityModel(Model):
                 agent.social = min(agent.max_social, agent.social + 3)
             
             # Try to resolve conflicts
-            if 'military' in self.technologies and random.random() < 0.3:
+            if 'military' in self.technologies and rng.random() < 0.3:
                 self.conflicts.remove(conflict)
                 self.conflicts_resolved += 1
-                print(f"🕊️ Conflict resolved through military organization!")
+                self.events.emit('conflict', "🕊️ Conflict resolved through military organization!", INFO,
+                                 resolution='military')
             elif conflict['duration'] <= 0:
                 self.conflicts.remove(conflict)
                 self.conflicts_resolved += 1
-                print(f"🕊️ Conflict ended naturally.")
+                self.events.emit('conflict', "🕊️ Conflict ended naturally.", INFO, resolution='natural')
         
         # Form alliances between communities
-        if len(self.communities) > 1 and random.random() < 0.01:
+        if len(self.communities) > 1 and rng.random() < 0.01:
             community_ids = list(self.communities.keys())
             if len(community_ids) >= 2:
-                ally1, ally2 = random.sample(community_ids, 2)
-                alliance = {'communities': [ally1, ally2], 'strength': random.randint(1, 10)}
+                ally1, ally2 = rng.sample(community_ids, 2)
+                alliance = {'communities': [ally1, ally2], 'strength': rng.randint(1, 10)}
                 self.alliances.append(alliance)
-                print(f"🤝 Alliance formed between communities {ally1} and {ally2}")
+                self.events.emit('diplomacy', "🤝 Alliance formed between communities {ally1} and {ally2}", INFO,
+                                 ally1=ally1, ally2=ally2)
     
     def develop_infrastructure(self):
         """Manage infrastructure development and trade routes."""
+        rng = self.get_rng('infrastructure')
         # Engineering technology enables infrastructure
         if 'engineering' in self.technologies:
             self.infrastructure_level = min(10, self.infrastructure_level + 0.01)
             
             # Build road networks
-            if random.random() < 0.02:
+            if rng.random() < 0.02:
                 # Connect random locations
-                x1, y1 = random.randint(0, self.width-1), random.randint(0, self.height-1)
-                x2, y2 = random.randint(0, self.width-1), random.randint(0, self.height-1)
+                x1, y1 = rng.randint(0, self.width-1), rng.randint(0, self.height-1)
+                x2, y2 = rng.randint(0, self.width-1), rng.randint(0, self.height-1)
                 self.road_network.add(((x1, y1), (x2, y2)))
-                print(f"🛤️ New road built connecting ({x1},{y1}) to ({x2},{y2})")
+                self.events.emit('infrastructure', "🛤️ New road built connecting ({x1},{y1}) to ({x2},{y2})", INFO,
+                                 x1=x1, y1=y1, x2=x2, y2=y2)
         
         # Trade routes technology enables long-distance trade
         if 'trade_routes' in self.technologies:
-            if random.random() < 0.03:
+            if rng.random() < 0.03:
                 route = {
-                    'origin': random.choice(list(self.communities.keys())) if self.communities else 'central',
+                    'origin': rng.choice(list(self.communities.keys())) if self.communities else 'central',
                     'destination': 'external',
-                    'goods': random.choice(['luxury', 'tools', 'food']),
-                    'profit': random.randint(50, 200)
+                    'goods': rng.choice(['luxury', 'tools', 'food']),
+                    'profit': rng.randint(50, 200)
                 }
                 self.trade_routes_established.append(route)
                 self.global_resources[route['goods']] += route['profit'] // 10
-                print(f"📦 New trade route established for {route['goods']}")
+                self.events.emit('trade', "📦 New trade route established for {goods}", INFO,
+                                 goods=route['goods'], profit=route['profit'])
     
     def conduct_research(self):
         """Manage scientific research and innovation."""
+        rng = self.get_rng('research')
         researchers = [a for a in self.agents if isinstance(a, CitizenAgent) 
                       and not a.is_dead and getattr(a, 'profession', None) == 'scholar']
         
         # Advanced technologies enable research projects
         if 'mathematics' in self.technologies and len(researchers) > 2:
-            if random.random() < 0.02:
+            if rng.random() < 0.02:
                 research_topics = ['Navigation', 'Agriculture', 'Medicine', 'Architecture', 'Astronomy']
-                topic = random.choice(research_topics)
+                topic = rng.choice(research_topics)
                 project = {
                     'topic': topic,
                     'progress': 0,
-                    'required': random.randint(50, 150),
+                    'required': rng.randint(50, 150),
                     'researchers': len(researchers)
                 }
                 self.research_projects.append(project)
-                print(f"🔬 New research project started: {topic}")
+                self.events.emit('research', "🔬 New research project started: {topic}", INFO, topic=topic)
         
         # Progress research projects
         for project in self.research_projects[:]:
@@ -891,12 +1128,13 @@ class CityModel(Model):
                 # Research completed!
                 innovation = {
                     'name': project['topic'],
-                    'benefit': random.choice(['efficiency', 'health', 'happiness', 'production'])
+                    'benefit': rng.choice(['efficiency', 'health', 'happiness', 'production'])
                 }
                 self.innovations.append(innovation)
                 self.scientific_discoveries += 1
                 self.research_projects.remove(project)
-                print(f"💡 Scientific breakthrough: {innovation['name']} improves {innovation['benefit']}!")
+                self.events.emit('research', "💡 Scientific breakthrough: {name} improves {benefit}!", NOTICE,
+                                 name=innovation['name'], benefit=innovation['benefit'])
                 
                 # Apply innovation benefits
                 if innovation['benefit'] == 'health':
@@ -944,11 +1182,15 @@ class CityModel(Model):
     
     def facilitate_advanced_interactions(self):
         """Enable and track complex social interactions"""
+        rng = self.get_rng('social')
         self.complex_interactions = 0
         self.emotional_support_events = 0
+        costs = self.metrics.agent_costs
         
         for agent in self.agents:
             if isinstance(agent, CitizenAgent) and not agent.is_dead:
+                if costs.enabled:
+                    start = costs.start()
                 # Count complex social behaviors
                 if hasattr(agent, 'agent_relationships'):
                     self.complex_interactions += len(agent.agent_relationships)
@@ -963,17 +1205,23 @@ class CityModel(Model):
                     if nearby_stressed:
                         self.emotional_support_events += 1
                         # Facilitate support
-                        stressed_agent = random.choice(nearby_stressed)
+                        stressed_agent = rng.choice(nearby_stressed)
                         stressed_agent.emotions['stress'] = max(0, stressed_agent.emotions['stress'] - 5)
                         agent.update_emotions('achievement', 1)
+                if costs.enabled:
+                    costs.charge(agent, 'facilitate_advanced_interactions', start)
     
     def track_wisdom_and_learning(self):
         """Track wisdom accumulation and teaching relationships"""
+        rng = self.get_rng('social')
         self.wisdom_accumulated = 0
         self.teaching_relationships = 0
+        costs = self.metrics.agent_costs
         
         for agent in self.agents:
             if isinstance(agent, CitizenAgent) and not agent.is_dead:
+                if costs.enabled:
+                    start = costs.start()
                 if hasattr(agent, 'wisdom'):
                     self.wisdom_accumulated += agent.wisdom
                     
@@ -989,14 +1237,19 @@ class CityModel(Model):
                                         and hasattr(a, 'life_stage') and a.life_stage == 'young_adult'
                                         and a != agent]
                     
-                    if potential_students and random.random() < 0.05:
-                        student = random.choice(potential_students)
+                    if potential_students and rng.random() < 0.05:
+                        student = rng.choice(potential_students)
                         skill_to_teach = max(agent.skills.items(), key=lambda x: x[1])[0]
                         if agent.teach_skill_to_agent(student, skill_to_teach):
-                            print(f"🎓 Agent {agent.unique_id} taught {skill_to_teach} to Agent {student.unique_id}")
+                            self.events.emit('teaching', "🎓 Agent {teacher} taught {skill} to Agent {student}", INFO,
+                                             agents=(agent.unique_id, student.unique_id),
+                                             teacher=agent.unique_id, student=student.unique_id, skill=skill_to_teach)
+                if costs.enabled:
+                    costs.charge(agent, 'track_wisdom_and_learning', start)
     
     def evaluate_cultural_renaissance(self):
         """Assess cultural and artistic development"""
+        rng = self.get_rng('culture')
         cultural_agents = [a for a in self.agents if isinstance(a, CitizenAgent) 
                           and not a.is_dead and hasattr(a, 'artistic_skill') 
                           and a.artistic_skill > 40]
@@ -1005,12 +1258,13 @@ class CityModel(Model):
             self.cultural_renaissance_level += 0.2
             
             # Chance for cultural masterpiece
-            if random.random() < 0.02:
+            if rng.random() < 0.02:
                 artist = max(cultural_agents, key=lambda x: x.artistic_skill)
                 self.cultural_masterpieces += 1
                 artist.cultural_contributions += 1
                 artist.update_emotions('achievement', 3)
-                print(f"🎨 Agent {artist.unique_id} created a cultural masterpiece! (Total: {self.cultural_masterpieces})")
+                self.events.emit('culture', "🎨 Agent {agent_id} created a cultural masterpiece! (Total: {total})", INFO,
+                                 agents=(artist.unique_id,), agent_id=artist.unique_id, total=self.cultural_masterpieces)
         
         # Track innovation rate
         recent_discoveries = self.scientific_discoveries
@@ -1028,6 +1282,7 @@ class CityModel(Model):
     
     def manage_complex_social_dynamics(self):
         """Manage advanced social structures and dynamics"""
+        rng = self.get_rng('social')
         # Track life goal achievements
         self.life_goal_achievements = 0
         
@@ -1055,11 +1310,12 @@ class CityModel(Model):
                             agent.life_goals.remove(goal)
                             agent.update_emotions('achievement', 3)
                             self.life_goal_achievements += 1
-                            print(f"🎯 Agent {agent.unique_id} achieved life goal: {goal}")
+                            self.events.emit('life_goal', "🎯 Agent {agent_id} achieved life goal: {goal}", INFO,
+                                             agents=(agent.unique_id,), agent_id=agent.unique_id, goal=goal)
                             
                             # Generate new goal
                             new_goals = ['expand_influence', 'create_legacy', 'mentor_others', 'explore_knowledge']
-                            agent.life_goals.append(random.choice(new_goals))
+                            agent.life_goals.append(rng.choice(new_goals))
         
         # Social network effects
         highly_connected = [a for a in self.agents if isinstance(a, CitizenAgent) 
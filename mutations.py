@@ -0,0 +1,67 @@
+"""
+Deferred structural changes during the agent phase of a step.
+
+While agents step, `CityModel.step_agents` opens a MutationQueue: citizens
+born and agents removed (eaten food) during the phase are queued and applied
+together when the phase ends. The agent registry therefore never changes
+while it is iterated, so the agent phase loops over `model.agents` directly
+instead of a per-step copy with a membership check per agent.
+
+  - births: a new agent is registered and placed on the grid at the end of
+    the phase (after all agents that existed at its start have stepped)
+  - removals: the agent leaves the grid at once, so eaten food cannot be
+    eaten twice, and the registry at the end of the phase
+
+Outside the agent phase (setup, model systems, tests) changes apply
+immediately as before. The queue is applied even when an agent's step
+raises, so the model is never left with the queue open.
+"""
+
+
+class MutationQueue:
+    """Births and removals requested during the agent phase, applied in bulk."""
+
+    def __init__(self):
+        self.active = False
+        self.births = []      # Agents to register, in creation order
+        self.placements = []  # (agent, pos) to place after registration
+        self.removals = {}    # {agent: None}, in removal order
+        self.applied_births = 0
+        self.applied_removals = 0
+
+    def begin(self):
+        self.active = True
+
+    def register(self, agent):
+        self.births.append(agent)
+
+    def place(self, agent, pos):
+        self.placements.append((agent, pos))
+
+    def remove(self, model, agent):
+        if agent in self.removals:
+            return
+        if agent.pos is not None:
+            model.grid.remove_agent(agent)
+        self.removals[agent] = None
+
+    def apply(self, model):
+        """Close the queue and commit the queued changes to the registry and grid."""
+        self.active = False
+        agents = model.agents
+        for agent in self.removals:
+            if agent in agents:
+                agents.remove(agent)
+        for agent in self.births:
+            model.register_agent(agent)
+        place = model.grid.place_agent
+        for agent, pos in self.placements:
+            place(agent, pos)
+        self.applied_births += len(self.births)
+        self.applied_removals += len(self.removals)
+        self.births = []
+        self.placements = []
+        self.removals = {}
+
+    def stats(self):
+        return {'births': self.applied_births, 'removals': self.applied_removals}
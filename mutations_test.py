@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test deferred births and removals during the agent phase.
+The registry must not change while agents step; queued changes land at the end of the phase.
+"""
+
+from model import CityModel
+from agent import CitizenAgent, Food
+from events import EventBus
+from checkpoint import dumps, loads
+
+
+def make_model():
+    return CityModel(width=12, height=12, num_agents=10, num_food=15, num_houses=5, num_jobs=6,
+                     event_bus=EventBus(enabled=False), seed=9)
+
+
+def test_deferred_birth_and_removal():
+    """Newborns and eaten food stay registered as they were until the queue is applied."""
+    print("Testing deferred births and removals...")
+    model = make_model()
+    parents = [a for a in model.agents if isinstance(a, CitizenAgent)][:2]
+    food = next(a for a in model.agents if isinstance(a, Food))
+    before = len(model.agents)
+
+    model.mutations.begin()
+    child = model.create_child_agent(*parents)
+    model.remove_agent(food)
+    model.remove_agent(food)  # Eaten twice in one step: queued once
+    assert child not in model.agents and child.pos is None
+    assert food in model.agents and food.pos is None  # Off the grid at once
+    assert len(model.agents) == before
+
+    model.mutations.apply(model)
+    assert child in model.agents and child.pos is not None
+    assert food not in model.agents
+    assert len(model.agents) == before
+    assert model.mutations.stats() == {'births': 1, 'removals': 1}
+    print("✓ Birth and removal applied together at the end of the phase")
+
+
+def test_steps_and_checkpoint():
+    """Normal stepping drains the queue every step and checkpoints restore identically."""
+    print("Testing deferred mutations over steps...")
+    model = make_model()
+    for _ in range(20):
+        model.step()
+        assert not model.mutations.active and not model.mutations.removals
+    assert model.mutations.stats()['removals'] > 0
+    restored = loads(dumps(model), event_bus=EventBus(enabled=False))
+    model.step()
+    restored.step()
+    assert [a.unique_id for a in model.agents] == [a.unique_id for a in restored.agents]
+    print(f"✓ {model.mutations.stats()['removals']} food items removed in bulk; restore continues identically")
+
+
+def test_queue_applied_when_a_step_raises():
+    """An exception in the agent phase still applies the queue and closes it."""
+    print("Testing deferred mutations after an error...")
+    model = make_model()
+    food = next(a for a in model.agents if isinstance(a, Food))
+    citizen = next(a for a in model.agents if isinstance(a, CitizenAgent))
+
+    def failing_step():
+        model.remove_agent(food)
+        raise RuntimeError("behavior failed")
+
+    citizen.step = failing_step
+    try:
+        model.step_agents()
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("error swallowed")
+    assert not model.mutations.active
+    assert food not in model.agents and food.pos is None
+    del citizen.step
+    model.step()
+    print("✓ Queue applied and closed, the model steps on")
+
+
+if __name__ == "__main__":
+    test_deferred_birth_and_removal()
+    test_steps_and_checkpoint()
+    test_queue_applied_when_a_step_raises()
@@ -0,0 +1,229 @@
+"""
+Configurable system pipeline for CityModel.step and per-behavior cadence
+for citizens.
+
+A model step runs a list of systems (weather, technology, economy, culture,
+..., agent stepping, food growth). SystemPipeline holds that list with, for
+every system, an enable flag, a run-every-k-steps interval and a phase
+offset, and calls timing hooks around each system:
+
+    model = CityModel(systems={
+        'advance_culture': {'every': 10},
+        'evaluate_cultural_renaissance': {'every': 25, 'offset': 3},
+        'manage_conflicts': {'enabled': False},
+    })
+    model.pipeline.configure('develop_infrastructure', every=5)
+    model.pipeline.register('census', take_census, after='grow_food')  # f(model)
+    model.pipeline.add_hook(lambda model, name, seconds: ...)
+
+Slow-changing systems can be thinned out this way for a large throughput
+gain. A system run every k steps is called k times less often; systems that
+accumulate per call (technology points, culture) then progress more slowly.
+
+BehaviorSchedule does the same for the behaviors of an agent class
+(CitizenAgent.BEHAVIORS with the class defaults in BEHAVIOR_CADENCE):
+
+    model = CityModel(behaviors={
+        'engage_in_cultural_activities': {'every': 5},
+        'make_strategic_decisions': {'every': 10, 'offset': 3},
+        'develop_diplomatic_relations': {'enabled': False},
+    })
+
+A behavior with `every=k` runs for an agent when (step - unique_id - offset)
+is a multiple of k, so the agents are spread evenly over the k steps.
+"""
+
+import math
+import time
+
+
+class System:
+    """One pipeline entry: a CityModel method (function None) or a function taking the model."""
+
+    def __init__(self, name, function=None, enabled=True, every=1, offset=0):
+        self.name = name
+        self.function = function
+        self.enabled = enabled
+        self.every = every
+        self.offset = offset
+
+    def due(self, step):
+        return self.enabled and (step - self.offset) % self.every == 0
+
+    def to_dict(self):
+        return {'name': self.name, 'enabled': self.enabled, 'every': self.every, 'offset': self.offset,
+                'custom': self.function is not None}
+
+
+class SystemPipeline:
+    """Ordered, individually configurable model systems."""
+
+    def __init__(self, names, config=None):
+        self.systems = [System(name) for name in names]
+        self.hooks = []  # f(model, name, seconds) after every system
+        for name, options in (config or {}).items():
+            self.configure(name, **options)
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['hooks'] = []  # Hooks are runtime callbacks, not model state
+        return state
+
+    def get(self, name):
+        for system in self.systems:
+            if system.name == name:
+                return system
+        raise KeyError(f"Unknown system: {name}")
+
+    @property
+    def names(self):
+        return [system.name for system in self.systems]
+
+    def configure(self, name, enabled=None, every=None, offset=None):
+        """Change a system's enable flag, interval or phase offset."""
+        system = self.get(name)
+        if every is not None:
+            if every < 1:
+                raise ValueError(f"every must be at least 1, got {every}")
+            system.every = every
+        if offset is not None:
+            system.offset = offset
+        if enabled is not None:
+            system.enabled = enabled
+        return system
+
+    def enable(self, name):
+        self.configure(name, enabled=True)
+
+    def disable(self, name):
+        self.configure(name, enabled=False)
+
+    def _index(self, before=None, after=None):
+        if before is not None:
+            return self.names.index(before)
+        if after is not None:
+            return self.names.index(after) + 1
+        return len(self.systems)
+
+    def register(self, name, function, before=None, after=None, **options):
+        """Add a custom system `function(model)`, at the end or before/after another system."""
+        if name in self.names:
+            raise ValueError(f"System already registered: {name}")
+        system = System(name, function)
+        self.systems.insert(self._index(before, after), system)
+        return self.configure(name, **options)
+
+    def move(self, name, before=None, after=None):
+        """Reorder: run a system right before or after another one."""
+        system = self.get(name)
+        self.systems.remove(system)
+        self.systems.insert(self._index(before, after), system)
+
+    def add_hook(self, hook):
+        """Call `hook(model, name, seconds)` after every system that runs."""
+        self.hooks.append(hook)
+
+    def due(self, step):
+        """Systems that run at a step, in order."""
+        return [system for system in self.systems if system.due(step)]
+
+    def run(self, model):
+        """Run the systems due at the model's current step."""
+        due = self.due(model.step_count)
+        metrics = model.metrics
+        if not self.hooks and all(system.function is None for system in due):
+            metrics.run(model, [system.name for system in due], 'model')
+            return
+
+        clock = time.perf_counter
+        for system in due:
+            if system.function is None:
+                function = getattr(model, system.name)
+            else:
+                function = lambda function=system.function: function(model)
+            start = clock()
+            metrics.call('model', system.name, function)
+            if self.hooks:
+                seconds = clock() - start
+                for hook in self.hooks:
+                    hook(model, system.name, seconds)
+
+    def table(self):
+        """The pipeline configuration as text."""
+        lines = [f"{'system':<36} {'enabled':>8} {'every':>6} {'offset':>7}"]
+        for system in self.systems:
+            name = system.name + (' (custom)' if system.function is not None else '')
+            lines.append(f"{name:<36} {str(system.enabled):>8} {system.every:>6} {system.offset:>7}")
+        return "\n".join(lines)
+
+    def to_dict(self):
+        return [system.to_dict() for system in self.systems]
+
+
+class BehaviorSchedule:
+    """Per-behavior enable flag, interval and phase offset for the behaviors of an agent class."""
+
+    def __init__(self, names, defaults=None, config=None):
+        self.behaviors = [System(name) for name in names]
+        self.names = tuple(names)
+        for options in (defaults, config):
+            for name, values in (options or {}).items():
+                self.configure(name, **values)
+        self._update()
+
+    def get(self, name):
+        for behavior in self.behaviors:
+            if behavior.name == name:
+                return behavior
+        raise KeyError(f"Unknown behavior: {name}")
+
+    def configure(self, name, enabled=None, every=None, offset=None):
+        """Change a behavior's enable flag, interval or phase offset."""
+        behavior = self.get(name)
+        if every is not None:
+            if every < 1:
+                raise ValueError(f"every must be at least 1, got {every}")
+            behavior.every = every
+        if offset is not None:
+            behavior.offset = offset
+        if enabled is not None:
+            behavior.enabled = enabled
+        self._update()
+        return behavior
+
+    def _update(self):
+        behaviors = self.behaviors
+        self.period = math.lcm(*(behavior.every for behavior in behaviors))
+        self.every_step = all(behavior.enabled and behavior.every == 1 for behavior in behaviors)
+        self._cache = {}  # {(phase, subset): behavior names}
+
+    def due(self, step, agent_id, names=None):
+        """Behaviors an agent runs at a step, in order (only those in the tuple `names` if given)."""
+        if self.every_step:
+            return self.names if names is None else names
+        key = ((step - agent_id) % self.period, names)
+        due = self._cache.get(key)
+        if due is None:
+            phase = key[0]
+            due = tuple(behavior.name for behavior in self.behaviors
+                        if behavior.enabled and (phase - behavior.offset) % behavior.every == 0
+                        and (names is None or behavior.name in names))
+            self._cache[key] = due
+        return due
+
+    def steps_until(self, name, step, agent_id):
+        """Steps after `step` until a behavior is next due for an agent (None if disabled)."""
+        behavior = self.get(name)
+        if not behavior.enabled:
+            return None
+        return (agent_id + behavior.offset - step) % behavior.every or behavior.every
+
+    def table(self):
+        """The schedule as text."""
+        lines = [f"{'behavior':<40} {'enabled':>8} {'every':>6} {'offset':>7}"]
+        for behavior in self.behaviors:
+            lines.append(f"{behavior.name:<40} {str(behavior.enabled):>8} {behavior.every:>6} {behavior.offset:>7}")
+        return "\n".join(lines)
+
+    def to_dict(self):
+        return [behavior.to_dict() for behavior in self.behaviors]
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test the configurable model system pipeline and citizen behavior cadence.
+Systems must run on their configured steps, in order, and custom systems and
+hooks must plug in without changing CityModel.
+"""
+
+from model import CityModel
+from agent import CitizenAgent
+from events import EventBus
+from checkpoint import dumps, loads
+from lod import SamplingPolicy
+
+
+def make_model(systems=None, behaviors=None):
+    return CityModel(width=12, height=12, num_agents=15, num_food=20, num_houses=6, num_jobs=8,
+                     event_bus=EventBus(enabled=False), seed=4, systems=systems, behaviors=behaviors)
+
+
+def test_intervals_and_hooks():
+    """Systems run every k steps at their offset; disabled systems never run."""
+    print("Testing system intervals...")
+    model = make_model({'advance_culture': {'every': 5, 'offset': 2},
+                        'manage_conflicts': {'enabled': False}})
+    runs = []
+    model.pipeline.add_hook(lambda m, name, seconds: runs.append((m.step_count, name)))
+    for _ in range(12):
+        model.step()
+    assert [step for step, name in runs if name == 'advance_culture'] == [2, 7]
+    assert not any(name == 'manage_conflicts' for _, name in runs)
+    assert sum(1 for _, name in runs if name == 'step_agents') == 12
+    print("✓ advance_culture ran at steps 2 and 7, manage_conflicts never")
+
+
+def test_custom_system_and_checkpoint():
+    """A registered system runs in place; the configuration survives a checkpoint."""
+    print("Testing custom systems...")
+    model = make_model({'develop_infrastructure': {'every': 3}})
+    order = []
+    model.pipeline.register('census', lambda m: order.append('census'), after='grow_food', every=2)
+    model.pipeline.add_hook(lambda m, name, seconds: order.append(name))
+    model.step()
+    assert order[-3:] == ['grow_food', 'census', 'census']
+
+    plain = make_model({'develop_infrastructure': {'every': 3}})
+    for _ in range(6):
+        plain.step()
+    restored = loads(dumps(plain), event_bus=EventBus(enabled=False))
+    assert restored.pipeline.get('develop_infrastructure').every == 3
+    print("✓ Custom system ran after grow_food; configuration restored from a checkpoint")
+
+
+def test_behavior_cadence():
+    """A behavior run every k steps runs for each citizen once per k steps, staggered by id."""
+    print("Testing behavior cadence...")
+    model = make_model(behaviors={'engage_in_cultural_activities': {'every': 4, 'offset': 1},
+                                  'develop_diplomatic_relations': {'enabled': False}})
+    model.timings.enabled = True
+    schedule = model.behavior_schedule
+    runs = {}
+    for step in range(8):
+        for unique_id in range(1, 5):
+            due = schedule.due(step, unique_id)
+            assert 'develop_diplomatic_relations' not in due
+            if 'engage_in_cultural_activities' in due:
+                runs.setdefault(unique_id, []).append(step)
+    assert runs == {1: [2, 6], 2: [3, 7], 3: [0, 4], 4: [1, 5]}
+    assert schedule.due(0, 3, ('choose_action', 'develop_diplomatic_relations')) == ('choose_action',)
+    for _ in range(8):
+        model.step()
+    assert ('agent', 'develop_diplomatic_relations') not in model.timings.calls
+    assert model.timings.calls[('agent', 'engage_in_cultural_activities')] < \
+        model.timings.calls[('agent', 'choose_action')] / 2
+
+    plain = make_model()
+    assert plain.behavior_schedule.due(22, 2) == CitizenAgent.BEHAVIORS
+    assert 'update_profession' not in plain.behavior_schedule.due(5, 2)  # Class default: every 20 steps
+    assert plain.behavior_schedule.steps_until('update_profession', 5, 2) == 17
+    restored = loads(dumps(model), event_bus=EventBus(enabled=False))
+    assert restored.behavior_schedule.get('engage_in_cultural_activities').every == 4
+    print("✓ Cultural activities staggered over 4 steps, diplomacy disabled, schedule restored")
+
+
+def test_behavior_cadence_in_every_activation():
+    """A disabled behavior stays disabled under the two-phase, event-driven and LOD activations."""
+    print("Testing behavior cadence across activations...")
+    activations = {'sequential': {}, 'two_phase': {'two_phase': True}, 'event_driven': {'event_driven': True},
+                   'lod': {'lod': SamplingPolicy(full=0.3, reduced=0.5)}}
+    for name, options in activations.items():
+        model = CityModel(width=12, height=12, num_agents=20, num_food=20, num_houses=6, num_jobs=8,
+                          event_bus=EventBus(enabled=False), seed=4,
+                          behaviors={'attempt_trading': {'enabled': False}}, **options)
+        for _ in range(20):
+            model.step()
+        assert model.trade_volume == 0, name
+
+    model = CityModel(width=12, height=12, num_agents=20, num_food=20, num_houses=6, num_jobs=8,
+                      event_bus=EventBus(enabled=False), seed=4, event_driven=True,
+                      behaviors={'choose_action': {'enabled': False}})
+    citizen = next(a for a in model.agents if isinstance(a, CitizenAgent))
+    citizen.hunger, citizen.energy, citizen.social = 0, citizen.max_energy, 0
+    pos = citizen.pos
+    for step in range(10):
+        assert model.activation.idle_step(citizen, step)
+    assert citizen.pos == pos  # Idle updates skip the random move of a disabled choose_action
+    print(f"✓ No trades in {', '.join(activations)} runs; idle citizens stay put without choose_action")
+
+
+if __name__ == "__main__":
+    test_intervals_and_hooks()
+    test_custom_system_and_checkpoint()
+    test_behavior_cadence()
+    test_behavior_cadence_in_every_activation()
@@ -0,0 +1,455 @@
+"""
+Profiling tools for the AI City Simulation.
+
+PhaseTimer records wall time and call counts for every model system run by
+CityModel.step and every behavior run by CitizenAgent.step, both cumulative
+and per step. The phases are run (and timed) by the model's ModelMetrics
+(see metrics.py). Timing is off by default; while disabled it only costs
+one flag check per model step and per agent step. Switch it on and off at
+runtime:
+
+    model.timings.enabled = True
+    ...  # run some steps
+    print(model.timings.table())
+    model.timings.save_json('timings.json')
+
+AgentCostProfiler attributes wall time to individual citizens: their own
+step plus their share of the model systems that loop over all citizens
+(facilitate_advanced_interactions, track_wisdom_and_learning). It reports
+the most expensive agents, the cost distribution and the cost per agent
+category (profession, life stage, leader, personality trait):
+
+    model.metrics.agent_costs.enabled = True
+    ...  # run some steps
+    print(model.metrics.agent_costs.table(model))
+
+SamplingProfiler periodically samples the simulation thread's stack from a
+background thread and writes collapsed stacks (flamegraph.pl, speedscope,
+inferno) rooted at the model system and agent behavior active at sample
+time:
+
+    with SamplingProfiler('profile.folded'):
+        ...  # run some steps
+
+It is also enabled by the headless runner's --sample-profile option or the
+AISIM_SAMPLE_PROFILE environment variable (see profiler_from_env).
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+
+class PhaseTimer:
+    """Wall time and call counts per model phase and agent behavior."""
+
+    def __init__(self, enabled=False, history=1000):
+        self.enabled = enabled
+        self.seconds = {}     # {(scope, name): cumulative seconds}
+        self.calls = {}       # {(scope, name): cumulative call count}
+        self.steps = 0        # Number of timed model steps
+        self.history = deque(maxlen=history)  # Per-step {(scope, name): (seconds, calls)}
+        self._step = None     # Timings of the step in progress
+        self._step_number = None
+
+    def reset(self):
+        """Forget everything recorded so far."""
+        self.seconds = {}
+        self.calls = {}
+        self.steps = 0
+        self.history.clear()
+        self._step = None
+
+    # Recording
+
+    def record(self, scope, name, elapsed):
+        """Add one call of phase `name` of `scope` that took `elapsed` seconds."""
+        if self._step is None:
+            self._add({(scope, name): [elapsed, 1]})
+            return
+        entry = self._step.get((scope, name))
+        if entry is None:
+            self._step[(scope, name)] = [elapsed, 1]
+        else:
+            entry[0] += elapsed
+            entry[1] += 1
+
+    def begin_step(self, step):
+        """Start collecting the timings of one model step."""
+        if self.enabled:
+            self._step = {}
+            self._step_number = step
+
+    def end_step(self):
+        """Finish the current step and fold it into the totals."""
+        if self._step is None:
+            return
+        current = self._step
+        self._step = None
+        self.steps += 1
+        self.history.append((self._step_number, {key: tuple(entry) for key, entry in current.items()}))
+        self._add(current)
+
+    def _add(self, timings):
+        seconds = self.seconds
+        calls = self.calls
+        for key, (elapsed, count) in timings.items():
+            seconds[key] = seconds.get(key, 0.0) + elapsed
+            calls[key] = calls.get(key, 0) + count
+
+    # Reporting
+
+    def rows(self):
+        """Cumulative timings as a list of dicts, slowest first."""
+        total = sum(seconds for (scope, _), seconds in self.seconds.items() if scope == 'model')
+        rows = []
+        for key in sorted(self.seconds, key=self.seconds.get, reverse=True):
+            scope, name = key
+            seconds = self.seconds[key]
+            calls = self.calls[key]
+            rows.append({
+                'scope': scope,
+                'phase': name,
+                'calls': calls,
+                'seconds': seconds,
+                'ms_per_call': 1000 * seconds / calls if calls else 0.0,
+                'ms_per_step': 1000 * seconds / self.steps if self.steps else 0.0,
+                'percent': 100 * seconds / total if total else 0.0,
+            })
+        return rows
+
+    def table(self, limit=None):
+        """Cumulative timings formatted as a text table."""
+        lines = [f"Timed steps: {self.steps}",
+                 f"{'scope':<6} {'phase':<40} {'calls':>10} {'total s':>10} "
+                 f"{'ms/call':>10} {'ms/step':>10} {'%':>6}"]
+        for row in self.rows()[:limit]:
+            lines.append(f"{row['scope']:<6} {row['phase']:<40} {row['calls']:>10} {row['seconds']:>10.3f} "
+                         f"{row['ms_per_call']:>10.4f} {row['ms_per_step']:>10.3f} {row['percent']:>6.1f}")
+        return "\n".join(lines)
+
+    def to_dict(self):
+        """Cumulative and per-step timings as plain data."""
+        return {
+            'steps': self.steps,
+            'phases': self.rows(),
+            'history': [
+                {'step': step, 'phases': {f"{scope}.{name}": {'seconds': seconds, 'calls': calls}
+                                          for (scope, name), (seconds, calls) in timings.items()}}
+                for step, timings in self.history
+            ],
+        }
+
+    def save_json(self, path):
+        """Write to_dict() to a JSON file."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+class AgentCostProfiler:
+    """Wall time attributed to individual agents and agent categories."""
+
+    # Agent attributes used to group costs; traits are multi-valued
+    CATEGORIES = ('profession', 'life_stage', 'leader', 'trait')
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.seconds = {}     # {agent_id: cumulative seconds}
+        self.calls = {}       # {agent_id: number of charged calls}
+        self.by_source = {}   # {source: cumulative seconds}
+
+    def reset(self):
+        """Forget everything recorded so far."""
+        self.seconds = {}
+        self.calls = {}
+        self.by_source = {}
+
+    # Recording
+
+    start = staticmethod(time.perf_counter)
+
+    def charge(self, agent, source, start):
+        """Attribute the time since `start` (from self.start()) to an agent."""
+        elapsed = time.perf_counter() - start
+        agent_id = agent.unique_id
+        self.seconds[agent_id] = self.seconds.get(agent_id, 0.0) + elapsed
+        self.calls[agent_id] = self.calls.get(agent_id, 0) + 1
+        self.by_source[source] = self.by_source.get(source, 0.0) + elapsed
+
+    def call(self, agent, source, function):
+        """Call `function()`, attribute its time to `agent` and return its result."""
+        start = time.perf_counter()
+        result = function()
+        self.charge(agent, source, start)
+        return result
+
+    # Reporting
+
+    @staticmethod
+    def categories_of(agent):
+        """Category values of an agent, as [(category, value), ...]."""
+        if agent is None:
+            return [('profession', 'removed'), ('life_stage', 'removed'), ('leader', 'removed')]
+        values = [
+            ('profession', str(getattr(agent, 'profession', None))),
+            ('life_stage', getattr(agent, 'life_stage', 'unknown')),
+            ('leader', 'leader' if getattr(agent, 'is_leader', False) else 'citizen'),
+        ]
+        values.extend(('trait', trait) for trait in getattr(agent, 'personality_traits', ()))
+        return values
+
+    def top(self, model, k=10):
+        """The k most expensive agents with their categories."""
+        agents = {agent.unique_id: agent for agent in model.agents}
+        total = sum(self.seconds.values())
+        rows = []
+        for agent_id in sorted(self.seconds, key=self.seconds.get, reverse=True)[:k]:
+            agent = agents.get(agent_id)
+            row = {
+                'agent_id': agent_id,
+                'seconds': self.seconds[agent_id],
+                'calls': self.calls[agent_id],
+                'share': self.seconds[agent_id] / total if total else 0.0,
+                'relationships': len(getattr(agent, 'agent_relationships', ())),
+            }
+            for category, value in self.categories_of(agent):
+                if category == 'trait':
+                    row.setdefault('traits', []).append(value)
+                else:
+                    row[category] = value
+            rows.append(row)
+        return rows
+
+    def distribution(self):
+        """Percentiles of the per-agent cost and the share of the most expensive agents."""
+        costs = sorted(self.seconds.values())
+        if not costs:
+            return {}
+        total = sum(costs)
+        count = len(costs)
+
+        def percentile(fraction):
+            return costs[min(count - 1, int(fraction * count))]
+
+        def top_share(fraction):
+            n = max(1, int(round(fraction * count)))
+            return sum(costs[-n:]) / total if total else 0.0
+
+        return {
+            'agents': count,
+            'total_seconds': total,
+            'mean': total / count,
+            'p50': percentile(0.50),
+            'p90': percentile(0.90),
+            'p99': percentile(0.99),
+            'max': costs[-1],
+            'top_1_percent_share': top_share(0.01),
+            'top_10_percent_share': top_share(0.10),
+        }
+
+    def by_category(self, model):
+        """Cost per category value (agents' current state): {category: {value: stats}}."""
+        agents = {agent.unique_id: agent for agent in model.agents}
+        result = {category: {} for category in self.CATEGORIES}
+        for agent_id, seconds in self.seconds.items():
+            for category, value in self.categories_of(agents.get(agent_id)):
+                stats = result[category].setdefault(value, {'agents': 0, 'seconds': 0.0})
+                stats['agents'] += 1
+                stats['seconds'] += seconds
+        for values in result.values():
+            for stats in values.values():
+                stats['mean_seconds'] = stats['seconds'] / stats['agents']
+        return result
+
+    def table(self, model, k=10):
+        """Top agents, distribution and per-category costs as text."""
+        lines = ["Cost by source: " + ", ".join(
+            f"{source} {seconds:.3f}s" for source, seconds in
+            sorted(self.by_source.items(), key=lambda item: -item[1]))]
+
+        dist = self.distribution()
+        if dist:
+            lines.append(f"Per-agent cost over {dist['agents']} agents: mean {1000 * dist['mean']:.2f} ms, "
+                         f"p50 {1000 * dist['p50']:.2f}, p90 {1000 * dist['p90']:.2f}, "
+                         f"p99 {1000 * dist['p99']:.2f}, max {1000 * dist['max']:.2f} ms; "
+                         f"top 1% = {dist['top_1_percent_share']:.0%}, top 10% = {dist['top_10_percent_share']:.0%}")
+
+        lines.append("")
+        lines.append(f"{'agent':>8} {'ms':>10} {'share':>7} {'profession':<12} {'life stage':<12} "
+                     f"{'leader':<8} {'rels':>5}  traits")
+        for row in self.top(model, k):
+            lines.append(f"{row['agent_id']:>8} {1000 * row['seconds']:>10.2f} {row['share']:>7.1%} "
+                         f"{row['profession']:<12} {row['life_stage']:<12} {row['leader']:<8} "
+                         f"{row['relationships']:>5}  {', '.join(row.get('traits', []))}")
+
+        for category, values in self.by_category(model).items():
+            lines.append("")
+            lines.append(f"{category:<14} {'agents':>7} {'total s':>10} {'mean ms':>10}")
+            for value, stats in sorted(values.items(), key=lambda item: -item[1]['seconds']):
+                lines.append(f"{value:<14} {stats['agents']:>7} {stats['seconds']:>10.3f} "
+                             f"{1000 * stats['mean_seconds']:>10.3f}")
+        return "\n".join(lines)
+
+    def to_dict(self, model, k=10):
+        return {
+            'by_source': dict(self.by_source),
+            'distribution': self.distribution(),
+            'top': self.top(model, k),
+            'by_category': self.by_category(model),
+        }
+
+
+class SamplingProfiler:
+    """Pure-Python sampling profiler producing collapsed stacks tagged by model phase.
+
+    A daemon thread samples the stack of the thread that called start() every
+    `interval` seconds. Sampling holds the GIL, so the interval grows
+    automatically whenever sampling would take more than `max_overhead` of
+    the wall time.
+    """
+
+    def __init__(self, path=None, interval=0.005, max_overhead=0.02, max_depth=48):
+        self.path = path
+        self.interval = interval
+        self.max_overhead = max_overhead
+        self.max_depth = max_depth
+        self.counts = {}              # {collapsed stack: samples}
+        self.samples = 0
+        self.sampling_seconds = 0.0   # Time spent taking samples
+        self.elapsed = 0.0            # Wall time between start() and stop()
+        self._labels = {}             # {code object: frame label}
+        self._phases = None           # {code object: phase tag}
+        self._thread = None
+        self._stop = threading.Event()
+
+    @staticmethod
+    def phase_codes():
+        """Code objects of the model systems and agent behaviors, mapped to tags."""
+        from model import CityModel
+        from agent import CitizenAgent
+        phases = {}
+        for scope, cls, names in (('model', CityModel, CityModel.SYSTEMS + ('collect_data',)),
+                                  ('agent', CitizenAgent, CitizenAgent.BEHAVIORS + ('update_needs', 'update_health'))):
+            for name in names:
+                function = getattr(cls, name, None)
+                code = getattr(function, '__code__', None)
+                if code is not None:
+                    phases[code] = f"{scope}:{name}"
+        return phases
+
+    def start(self):
+        """Start sampling the calling thread."""
+        if self._thread is not None:
+            return self
+        if self._phases is None:
+            self._phases = self.phase_codes()
+        self._target = threading.get_ident()
+        self._stop.clear()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop sampling and write the collapsed stacks if a path was given."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.elapsed += time.perf_counter() - self._started
+        if self.path:
+            self.write(self.path)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    @property
+    def overhead(self):
+        """Fraction of the profiled wall time spent sampling."""
+        return self.sampling_seconds / self.elapsed if self.elapsed else 0.0
+
+    def _run(self):
+        delay = self.interval
+        clock = time.perf_counter
+        while not self._stop.wait(delay):
+            start = clock()
+            frame = sys._current_frames().get(self._target)
+            if frame is None:
+                break  # Profiled thread has finished
+            self._sample(frame)
+            del frame
+            cost = clock() - start
+            self.sampling_seconds += cost
+            delay = max(self.interval, cost / self.max_overhead - cost)
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _sample(self, frame):
+        frames = []
+        tags = []
+        phases = self._phases
+        while frame is not None:
+            code = frame.f_code
+            tag = phases.get(code)
+            if tag is not None:
+                tags.append(tag)
+                if len(tags) == 1:
+                    frames.append(code)
+            elif not tags:
+                frames.append(code)
+            frame = frame.f_back
+
+        # Root the stack at the active phase tags (outermost first), followed by
+        # the frames below the innermost phase
+        if tags:
+            frames.pop()  # The innermost phase frame itself is represented by its tag
+        else:
+            tags = ['outside-step']
+        frames = frames[-self.max_depth:]
+        stack = ";".join(reversed(tags))
+        if frames:
+            stack += ";" + ";".join(self._label(code) for code in reversed(frames))
+        self.counts[stack] = self.counts.get(stack, 0) + 1
+        self.samples += 1
+
+    def collapsed(self):
+        """Collapsed stacks, one 'frame;frame;... count' line each."""
+        return [f"{stack} {count}" for stack, count in sorted(self.counts.items())]
+
+    def phase_samples(self):
+        """Samples per innermost phase tag."""
+        result = {}
+        for stack, count in self.counts.items():
+            tags = [part for part in stack.split(";") if part.startswith(('model:', 'agent:'))]
+            tag = tags[-1] if tags else 'outside-step'
+            result[tag] = result.get(tag, 0) + count
+        return result
+
+    def write(self, path):
+        """Write collapsed stacks to a file."""
+        with open(path, 'w', encoding='utf-8') as f:
+            for line in self.collapsed():
+                f.write(line + "\n")
+
+
+def profiler_from_env(environ=None):
+    """Create a SamplingProfiler from AISIM_SAMPLE_PROFILE (output path) and
+    AISIM_SAMPLE_INTERVAL (seconds), or return None when not requested."""
+    environ = os.environ if environ is None else environ
+    path = environ.get('AISIM_SAMPLE_PROFILE')
+    if not path:
+        return None
+    interval = float(environ.get('AISIM_SAMPLE_INTERVAL', 0.005))
+    return SamplingProfiler(path, interval=interval)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test the profilers.
+Costs must be attributed to the agents that caused them, and samples to the
+model phase that was running.
+"""
+
+import os
+import tempfile
+
+from model import CityModel
+from agent import CitizenAgent
+from events import EventBus
+from profiling import SamplingProfiler, profiler_from_env
+
+
+def make_model():
+    return CityModel(width=12, height=12, num_agents=12, num_food=15, num_houses=5, num_jobs=6,
+                     event_bus=EventBus(enabled=False), seed=6)
+
+
+def test_agent_costs():
+    """Every stepped citizen is charged, and the reports add up to the recorded time."""
+    print("Testing per-agent cost attribution...")
+    model = make_model()
+    costs = model.metrics.agent_costs
+    costs.enabled = True
+    founders = {a.unique_id for a in model.agents if isinstance(a, CitizenAgent)}
+    for _ in range(5):
+        model.step()
+
+    assert founders <= set(costs.seconds)
+    assert costs.calls[min(founders)] >= 1 and costs.by_source['step'] > 0
+    total = sum(costs.seconds.values())
+    assert abs(total - sum(costs.by_source.values())) < 1e-9
+
+    top = costs.top(model, k=3)
+    assert len(top) == 3 and top[0]['seconds'] >= top[1]['seconds'] >= top[2]['seconds']
+    dist = costs.distribution()
+    assert dist['agents'] == len(costs.seconds) and dist['p50'] <= dist['p99'] <= dist['max']
+    professions = costs.by_category(model)['profession']
+    assert sum(stats['agents'] for stats in professions.values()) == len(costs.seconds)
+    assert "Per-agent cost over" in costs.table(model)
+
+    costs.reset()
+    assert not costs.seconds and costs.distribution() == {}
+    print(f"✓ {dist['agents']} agents charged, top 10% = {dist['top_10_percent_share']:.0%} of the cost")
+
+
+def test_agent_costs_event_driven():
+    """The event-driven activation charges every citizen it steps, idle or not, once per step."""
+    print("Testing per-agent costs with event-driven activation...")
+    # Without the model systems that charge citizens as well, only agent steps are counted
+    model = CityModel(width=12, height=12, num_agents=12, num_food=15, num_houses=5, num_jobs=6,
+                      event_bus=EventBus(enabled=False), seed=6, event_driven=True,
+                      systems={'facilitate_advanced_interactions': {'enabled': False},
+                               'track_wisdom_and_learning': {'enabled': False}})
+    costs = model.metrics.agent_costs
+    costs.enabled = True
+    founders = {a.unique_id for a in model.agents if isinstance(a, CitizenAgent)}
+    for _ in range(10):
+        model.step()
+    stats = model.activation.stats()
+    assert stats['idle_steps'] > 0
+    alive = [a for a in model.agents if isinstance(a, CitizenAgent) and not a.is_dead]
+    assert all(costs.calls[a.unique_id] == 10 for a in alive if a.unique_id in founders)
+    assert sum(costs.calls.values()) == stats['full_steps'] + stats['idle_steps']
+    print(f"✓ {len(alive)} citizens charged for {stats['full_steps']} full and {stats['idle_steps']} idle steps")
+
+
+def test_sampling_profiler():
+    """Samples are rooted at phase tags and written as collapsed stacks."""
+    print("Testing the sampling profiler...")
+    model = make_model()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'stacks.txt')
+        with SamplingProfiler(path, interval=0.001) as profiler:
+            while profiler.samples < 50:
+                model.step()
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+
+    assert lines == profiler.collapsed()
+    assert sum(int(line.rsplit(' ', 1)[1]) for line in lines) == profiler.samples
+    phases = profiler.phase_samples()
+    assert sum(phases.values()) == profiler.samples
+    assert any(tag.startswith(('model:', 'agent:')) for tag in phases)
+    for stack in profiler.counts:
+        assert stack.split(';')[0].startswith(('model:', 'agent:', 'outside-step'))
+    assert 0 <= profiler.overhead < 1
+
+    assert profiler_from_env({}) is None
+    env_profiler = profiler_from_env({'AISIM_SAMPLE_PROFILE': 'out.txt', 'AISIM_SAMPLE_INTERVAL': '0.01'})
+    assert env_profiler.path == 'out.txt' and env_profiler.interval == 0.01
+    print(f"✓ {profiler.samples} samples over {len(phases)} phases, overhead {profiler.overhead:.1%}")
+
+
+if __name__ == "__main__":
+    test_agent_costs()
+    test_agent_costs_event_driven()
+    test_sampling_profiler()
@@ -0,0 +1,158 @@
+"""
+Event-driven activation: full behavior evaluation only for citizens with a
+pending decision.
+
+Most citizens most of the time have no urgent need and end up wandering
+randomly. With `CityModel(event_driven=True)` every citizen gets a wake-up
+step, kept in a priority queue: the earliest step at which one of its
+decision thresholds can be crossed --
+
+  - hunger reaching hunger_threshold (hunger grows at most 2 per step)
+  - energy falling to energy_threshold (at most 1 per step)
+  - social need reaching social_threshold (at most 1 per step)
+  - the next profession re-evaluation (update_profession's cadence)
+  - family timers: reproduction after 30 steps together, or every step
+    while a close friend could become a partner
+
+-- capped at `max_idle` steps so that the chance-based behaviors (culture,
+research, trading, ...) still run regularly. Woken citizens run the full
+CitizenAgent.step and are rescheduled; all others only get the idle update:
+needs, health, the family timer and a random move (standing in for
+manage_family and choose_action, and skipped like them when the behavior
+cadence says they are not due). The idle update is the same per-citizen
+code as in a full step, not batched across citizens (its random draws are
+interleaved with the woken citizens' draws in agent order); the saving is
+the skipped behaviors.
+
+This is an approximation with its own (reproducible) trajectory: idle
+citizens skip the behaviors that would have fired by chance on the steps
+they sleep through.
+"""
+
+import heapq
+
+from agent import CitizenAgent
+
+
+# Behaviors the idle update stands in for (in CitizenAgent.BEHAVIORS order)
+IDLE_BEHAVIORS = ('manage_family', 'choose_action')
+
+
+class EventDrivenActivation:
+    """Step citizens fully only when they are due, idle-update the rest."""
+
+    def __init__(self, model, max_idle=10):
+        self.model = model
+        self.max_idle = max(1, max_idle)
+        self.queue = []     # (wake step, unique_id)
+        self.wake = {}      # {unique_id: scheduled wake step}
+        self.full_steps = 0
+        self.idle_steps = 0
+
+    @staticmethod
+    def urgent(agent):
+        """Whether a need is past its decision threshold."""
+        return (agent.hunger >= agent.hunger_threshold or agent.energy <= agent.energy_threshold
+                or agent.social >= agent.social_threshold)
+
+    def next_wake(self, agent, step):
+        """Earliest step at which the citizen may have a decision to make."""
+        if self.urgent(agent):
+            return step + 1  # Urgent needs: decide every step
+
+        delays = [
+            self.max_idle,
+            -(-(agent.hunger_threshold - agent.hunger) // 2),
+            agent.energy - agent.energy_threshold,
+            agent.social_threshold - agent.social,
+        ]
+        profession = self.model.behavior_schedule.steps_until('update_profession', step, agent.unique_id)
+        if profession is not None:
+            delays.append(profession)
+        if agent.family_id is not None:
+            if not agent.children:
+                delays.append(30 - agent.family_survival_time)
+        elif any(score >= 50 for score in agent.friendships.values()):
+            delays.append(1)  # Could form a family with a close friend
+        return step + max(1, int(min(delays)))
+
+    def schedule(self, agent, wake):
+        self.wake[agent.unique_id] = wake
+        heapq.heappush(self.queue, (wake, agent.unique_id))
+
+    def due(self, step):
+        """Pop the citizens whose wake-up step has come."""
+        queue = self.queue
+        wake = self.wake
+        due = set()
+        while queue and queue[0][0] <= step:
+            when, unique_id = heapq.heappop(queue)
+            if wake.get(unique_id) == when:  # Skip superseded entries
+                due.add(unique_id)
+        return due
+
+    def step(self):
+        model = self.model
+        step = model.step_count
+        costs = model.metrics.agent_costs
+        due = self.due(step)
+        for agent in model.agents:  # Births and removals are deferred (mutations.py)
+            if not isinstance(agent, CitizenAgent):
+                agent.step()
+                continue
+            if agent.is_dead:
+                continue
+            unique_id = agent.unique_id
+            if unique_id in due or unique_id not in self.wake:
+                # Due, or new (e.g. born last step): full evaluation
+                if costs.enabled:
+                    costs.call(agent, 'step', agent.step)
+                else:
+                    agent.step()
+                self.full_steps += 1
+                if agent.is_dead:
+                    self.wake.pop(unique_id, None)
+                else:
+                    self.schedule(agent, self.next_wake(agent, step))
+            elif costs.enabled:
+                costs.call(agent, 'step', lambda: self.step_waiting(agent, step))
+            else:
+                self.step_waiting(agent, step)
+
+    def step_waiting(self, agent, step):
+        """Idle-update a citizen that is not due, or let it decide now if a threshold was crossed early."""
+        if self.idle_step(agent, step):
+            self.idle_steps += 1
+            return
+        # Pushed past a threshold early (weather, other citizens, ...): decide now
+        model = self.model
+        model.metrics.run(agent, model.behavior_schedule.due(step, agent.unique_id), 'agent')
+        self.full_steps += 1
+        self.schedule(agent, self.next_wake(agent, step))
+
+    def idle_step(self, agent, step):
+        """Cheap update of a citizen without pending decisions; False if it needs to decide now."""
+        if not agent.update_vitals():
+            self.wake.pop(agent.unique_id, None)
+            return True
+        if self.urgent(agent):
+            return False
+        names = self.model.behavior_schedule.due(step, agent.unique_id, IDLE_BEHAVIORS)
+        if agent.family_id is not None and 'manage_family' in names:
+            agent.family_survival_time += 1
+        if 'choose_action' in names:
+            agent.move_randomly()
+        return True
+
+    def stats(self):
+        """How many citizen steps ran fully and how many were idle updates."""
+        total = self.full_steps + self.idle_steps
+        return {
+            'full_steps': self.full_steps,
+            'idle_steps': self.idle_steps,
+            'idle_fraction': self.idle_steps / total if total else 0.0,
+            'queued': len(self.wake),
+        }
+
+    def close(self):
+        pass
@@ -0,0 +1,250 @@
+"""
+Shared-memory state arrays for viewers, exporters and worker processes.
+
+With `CityModel(share_state=True)` the model publishes its core per-citizen
+state and grid occupancy layers into one `multiprocessing.shared_memory`
+block after every step. Other processes attach by name and read NumPy views
+of the arrays without pickling any agents:
+
+    reader = SharedStateReader(model.shared_state.name)
+    state = reader.read()          # consistent copy of the latest step
+    state['hunger'], state['layers']['food']
+    reader.close()
+
+Block layout: a fixed header followed by the arrays. The header holds a
+magic string, the layout version, a sequence number, the step, the citizen
+count and the array capacity. The writer makes the sequence odd while it
+updates the arrays and even when done (a seqlock), so readers retry instead
+of seeing a half-written step. When the population outgrows the capacity the
+writer moves to a larger block and stores its name in the old header.
+"""
+
+import struct
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from agent import CitizenAgent
+
+
+MAGIC = b'AISIMSHM'
+LAYOUT_VERSION = 1
+
+# magic, layout version, moved flag, sequence, step, count, capacity, width, height, next block name
+HEADER = struct.Struct('<8sIIqqqqqq64s')
+HEADER_SIZE = 256
+
+# Per-citizen arrays: (name, dtype)
+CITIZEN_ARRAYS = (
+    ('unique_id', np.int64),
+    ('x', np.int32),
+    ('y', np.int32),
+    ('hunger', np.float64),
+    ('energy', np.float64),
+    ('health', np.float64),
+    ('social', np.float64),
+    ('coins', np.float64),
+    ('profession', np.int8),
+    ('alive', np.uint8),
+)
+
+# Code of each profession in the 'profession' array (0: none)
+PROFESSIONS = (None, 'farmer', 'craftsman', 'merchant', 'guard', 'scholar')
+PROFESSION_CODES = {name: code for code, name in enumerate(PROFESSIONS)}
+
+# Grid occupancy layers (height x width counts): living citizens and each object type
+LAYERS = ('citizens', 'food', 'house', 'job', 'market', 'workshop', 'temple', 'school')
+
+
+def _layout(capacity, width, height):
+    """Offsets of every array in a block: ({name: (offset, dtype, shape)}, total size)."""
+    offsets = {}
+    offset = HEADER_SIZE
+    for name, dtype in CITIZEN_ARRAYS:
+        offset = -(-offset // 8) * 8  # 8-byte alignment
+        offsets[name] = (offset, dtype, (capacity,))
+        offset += np.dtype(dtype).itemsize * capacity
+    for name in LAYERS:
+        offset = -(-offset // 8) * 8
+        offsets[f"layer:{name}"] = (offset, np.uint16, (height, width))
+        offset += 2 * width * height
+    return offsets, offset
+
+
+def _attach_untracked(name):
+    """Open an existing block without registering it with this process's resource tracker.
+
+    Readers never own a block; a tracked block would be unlinked when the
+    reader process exits (Python < 3.13 tracks every opened block).
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        pass
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _views(buffer, offsets):
+    return {name: np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+            for name, (offset, dtype, shape) in offsets.items()}
+
+
+class SharedState:
+    """Publish a model's core state into shared memory after every step."""
+
+    def __init__(self, model, name=None, capacity=None):
+        self.model = model
+        self.width = model.grid.width
+        self.height = model.grid.height
+        self.sequence = 0
+        self.publishes = 0
+        self._shm = None
+        citizens = sum(1 for a in model.agents if isinstance(a, CitizenAgent))
+        self._allocate(capacity or max(64, 2 * citizens), name)
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def _allocate(self, capacity, name=None):
+        offsets, size = _layout(capacity, self.width, self.height)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        old = self._shm
+        self._shm = shm
+        self.capacity = capacity
+        self.arrays = _views(shm.buf, offsets)
+        self._write_header(step=-1, count=0)
+        if old is not None:
+            # Point readers of the old block to the new one
+            header = HEADER.pack(MAGIC, LAYOUT_VERSION, 1, self.sequence, -1, 0, 0, self.width, self.height,
+                                 shm.name.encode('utf-8'))
+            old.buf[:HEADER.size] = header
+            old.close()
+            old.unlink()
+
+    def _write_header(self, step, count):
+        self._shm.buf[:HEADER.size] = HEADER.pack(MAGIC, LAYOUT_VERSION, 0, self.sequence, step, count,
+                                                  self.capacity, self.width, self.height, b'')
+
+    def publish(self):
+        """Write the current model state (called after every model step)."""
+        model = self.model
+        citizens = [a for a in model.agents if isinstance(a, CitizenAgent)]
+        count = len(citizens)
+        if count > self.capacity:
+            self._allocate(2 * count)
+
+        # Columns as Python lists first, so the odd (writing) window stays short
+        placed = [a.pos if a.pos is not None else (-1, -1) for a in citizens]
+        columns = {
+            'unique_id': [a.unique_id for a in citizens],
+            'x': [pos[0] for pos in placed],
+            'y': [pos[1] for pos in placed],
+            'hunger': [a.hunger for a in citizens],
+            'energy': [a.energy for a in citizens],
+            'health': [a.health for a in citizens],
+            'social': [a.social for a in citizens],
+            'coins': [a.coins for a in citizens],
+            'profession': [PROFESSION_CODES.get(a.profession, 0) for a in citizens],
+            'alive': [not a.is_dead for a in citizens],
+        }
+        layers = {name: np.zeros((self.height, self.width), dtype=np.uint16) for name in LAYERS}
+        for agent in model.agents:
+            pos = agent.pos
+            if pos is None:
+                continue
+            if isinstance(agent, CitizenAgent):
+                if not agent.is_dead:
+                    layers['citizens'][pos[1], pos[0]] += 1
+            else:
+                layer = layers.get(getattr(agent, 'type', None))
+                if layer is not None:
+                    layer[pos[1], pos[0]] += 1
+
+        arrays = self.arrays
+        self.sequence += 1  # Odd: writing
+        self._write_header(step=model.step_count, count=count)
+        for name, values in columns.items():
+            arrays[name][:count] = values
+        for name, layer in layers.items():
+            arrays[f"layer:{name}"][...] = layer
+        self.sequence += 1  # Even: consistent
+        self._write_header(step=model.step_count, count=count)
+        self.publishes += 1
+
+    def close(self):
+        """Release and remove the shared memory block."""
+        if self._shm is not None:
+            self.arrays = {}
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+class SharedStateReader:
+    """Attach to a published SharedState block from any process."""
+
+    def __init__(self, name):
+        self._attach(name)
+
+    def _attach(self, name):
+        self._shm = _attach_untracked(name)
+        self.name = name
+        self._layout_capacity = None
+        self.arrays = {}
+
+    def header(self):
+        """Decoded header: {'sequence', 'step', 'count', 'capacity', 'width', 'height', ...}."""
+        magic, version, moved, sequence, step, count, capacity, width, height, next_name = \
+            HEADER.unpack_from(self._shm.buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.name} is not a simulation state block")
+        if version != LAYOUT_VERSION:
+            raise ValueError(f"Unsupported state layout version: {version}")
+        return {'moved': bool(moved), 'sequence': sequence, 'step': step, 'count': count,
+                'capacity': capacity, 'width': width, 'height': height,
+                'next': next_name.rstrip(b'\0').decode('utf-8')}
+
+    def views(self):
+        """Zero-copy NumPy views of the arrays (may change while you read them)."""
+        header = self.header()
+        while header['moved']:
+            self.close()
+            self._attach(header['next'])
+            header = self.header()
+        if header['capacity'] != self._layout_capacity:
+            offsets, _ = _layout(header['capacity'], header['width'], header['height'])
+            self.arrays = _views(self._shm.buf, offsets)
+            self._layout_capacity = header['capacity']
+        return header, self.arrays
+
+    def read(self, retries=1000):
+        """Consistent copy of the latest published step.
+
+        Returns {'step', 'sequence', <citizen array>: ndarray, 'layers': {name: ndarray}}.
+        """
+        for _ in range(retries):
+            header, arrays = self.views()
+            if header['sequence'] % 2:
+                continue  # Writer is busy
+            count = header['count']
+            state = {name: arrays[name][:count].copy() for name, _ in CITIZEN_ARRAYS}
+            state['layers'] = {name: arrays[f"layer:{name}"].copy() for name in LAYERS}
+            if self.header()['sequence'] == header['sequence']:
+                state['step'] = header['step']
+                state['sequence'] = header['sequence']
+                return state
+        raise TimeoutError(f"No consistent state in {self.name} after {retries} attempts")
+
+    def close(self):
+        """Detach (the block stays available to other readers)."""
+        if self._shm is not None:
+            self.arrays = {}
+            self._layout_capacity = None
+            self._shm.close()
+            self._shm = None
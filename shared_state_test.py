@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test publishing model state to shared memory.
+Readers in this and other processes must see the latest step without pickling agents.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+from model import CityModel
+from agent import CitizenAgent
+from events import EventBus
+from shared_state import SharedState, SharedStateReader, PROFESSIONS
+
+
+def make_model():
+    return CityModel(width=15, height=12, num_agents=20, num_food=30, num_houses=8, num_jobs=10,
+                     event_bus=EventBus(enabled=False), seed=8, share_state=True)
+
+
+def read_summary(name):
+    """Runs in a worker process."""
+    reader = SharedStateReader(name)
+    state = reader.read()
+    reader.close()
+    return state['step'], int(state['alive'].sum()), int(state['layers']['food'].sum())
+
+
+def test_reader_sees_latest_step():
+    """Arrays and layers match the model after every step."""
+    print("Testing shared state arrays...")
+    model = make_model()
+    reader = SharedStateReader(model.shared_state.name)
+    try:
+        for _ in range(10):
+            model.step()
+            state = reader.read()
+            citizens = [a for a in model.agents if isinstance(a, CitizenAgent)]
+            assert state['step'] == model.step_count
+            assert list(state['unique_id']) == [a.unique_id for a in citizens]
+            assert list(state['hunger']) == [a.hunger for a in citizens]
+            assert [PROFESSIONS[code] for code in state['profession']] == [a.profession for a in citizens]
+            assert all((x, y) == a.pos for x, y, a in zip(state['x'], state['y'], citizens))
+            food = sum(1 for a in model.agents if getattr(a, 'type', None) == 'food')
+            assert state['layers']['food'].sum() == food
+            assert state['layers']['citizens'].shape == (12, 15)
+
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            step, alive, food = pool.submit(read_summary, model.shared_state.name).result()
+        assert step == model.step_count
+        assert alive == sum(1 for a in model.agents if isinstance(a, CitizenAgent) and not a.is_dead)
+        print(f"✓ Reader in another process sees step {step} ({alive} alive, {food} food)")
+    finally:
+        reader.close()
+        model.shared_state.close()
+
+
+def test_block_grows_with_population():
+    """Readers follow the writer to a larger block."""
+    print("Testing block growth...")
+    model = make_model()
+    model.shared_state.close()
+    model.shared_state = SharedState(model, capacity=5)  # Smaller than the population
+    reader = SharedStateReader(model.shared_state.name)
+    try:
+        model.step()
+        state = reader.read()
+        assert len(state['unique_id']) == 20
+        assert model.shared_state.capacity >= 20
+        print(f"✓ Block grew to capacity {model.shared_state.capacity}")
+    finally:
+        reader.close()
+        model.shared_state.close()
+
+
+def test_close_removes_block():
+    """Closing the model unlinks its shared-memory block."""
+    print("Testing block removal on close...")
+    with make_model() as model:
+        model.step()
+        name = model.shared_state.name
+        SharedStateReader(name).close()
+    try:
+        SharedStateReader(name)
+    except FileNotFoundError:
+        pass
+    else:
+        raise AssertionError(f"{name} still exists after close()")
+    model.close()  # Closing twice is harmless
+    print(f"✓ {name} removed")
+
+
+if __name__ == "__main__":
+    test_reader_sees_latest_step()
+    test_block_grows_with_population()
+    test_close_removes_block()
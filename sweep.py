@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+AI City Simulation - Parameter Sweep Runner
+
+Runs every combination of a parameter grid, several replicates each, across
+a pool of worker processes (one CityModel per worker at a time). Each run's
+collected series is streamed back to the parent as soon as it finishes and
+appended to a JSON Lines results file, so an interrupted sweep can be resumed
+and only the missing runs are simulated again.
+
+Usage:
+    python sweep.py --param num_agents=50,100,200 --param num_food=40,80 \\
+        --replicates 5 --steps 2000 --collect-every 10 --output sweep.jsonl
+
+    # Rerunning an interrupted sweep resumes it (use --no-resume to start over)
+    python sweep.py --grid grid.json --replicates 3 --output sweep.jsonl
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from headless import MODEL_PARAMETERS, build_model, run_steps, model_series
+
+
+def expand_grid(grid):
+    """Turn {param: [values]} into a list of {param: value} dicts (cartesian product)."""
+    unknown = set(grid) - set(MODEL_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown model parameters: {', '.join(sorted(unknown))}")
+    names = sorted(grid)
+    values = [grid[name] if isinstance(grid[name], (list, tuple)) else [grid[name]] for name in names]
+    return [dict(zip(names, combo)) for combo in itertools.product(*values)]
+
+
+def run_key(params, replicate):
+    """Stable identifier of one run, used for seeding and for resuming."""
+    settings = ",".join(f"{name}={params[name]}" for name in sorted(params))
+    return f"{settings}#r{replicate}"
+
+
+def run_seed(base_seed, key):
+    """Derive a reproducible per-run seed from the sweep seed and the run key."""
+    digest = hashlib.sha256(f"{base_seed}:{key}".encode('utf-8')).digest()
+    return int.from_bytes(digest[:4], 'little')
+
+
+def plan_runs(grid, replicates, steps, base_seed=0, collect_interval=1):
+    """List all runs of a sweep."""
+    runs = []
+    for params in expand_grid(grid):
+        for replicate in range(replicates):
+            key = run_key(params, replicate)
+            runs.append({
+                'run_id': key,
+                'params': params,
+                'replicate': replicate,
+                'seed': run_seed(base_seed, key),
+                'steps': steps,
+                'collect_interval': collect_interval,
+            })
+    return runs
+
+
+def completed_runs(path):
+    """Ids of runs already present in a results file.
+
+    A torn last line (from a crash while writing) is cut off, so that
+    appending new results afterwards keeps the file valid.
+    """
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b'\n'):
+            f.truncate(data.rfind(b'\n') + 1)
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)['run_id'])
+            except (ValueError, KeyError):
+                continue
+    return done
+
+
+def _run_one(run, progress_queue=None, progress_every=100):
+    """Worker: simulate one run and return its result record."""
+    model = build_model(run['params'], seed=run['seed'], collect_interval=run['collect_interval'])
+    pid = os.getpid()
+
+    def report(m):
+        if m.step_count % progress_every == 0:
+            progress_queue.put((pid, run['run_id'], m.step_count, run['steps']))
+
+    on_step = report if progress_queue is not None and progress_every else None
+    stats = run_steps(model, run['steps'], on_step=on_step)
+    if progress_queue is not None:
+        progress_queue.put((pid, run['run_id'], run['steps'], run['steps']))
+
+    record = dict(run)
+    record.update(stats)
+    record['series'] = model_series(model)
+    return record
+
+
+def _print_progress(progress_queue, stop):
+    """Parent-side thread printing per-worker progress."""
+    workers = {}
+    last_print = 0
+    while not stop.is_set() or not progress_queue.empty():
+        try:
+            pid, run_id, step, steps = progress_queue.get(timeout=0.2)
+        except queue.Empty:
+            continue
+        workers[pid] = (run_id, step, steps)
+        now = time.monotonic()
+        if now - last_print >= 2.0:
+            last_print = now
+            for worker_pid, (worker_run, worker_step, worker_steps) in sorted(workers.items()):
+                print(f"  worker {worker_pid}: {worker_run} step {worker_step}/{worker_steps}", file=sys.stderr)
+
+
+def run_sweep(grid, replicates, steps, output, base_seed=0, collect_interval=1,
+              workers=None, resume=True, progress_every=100):
+    """Run a full sweep, appending one JSON line per finished run to `output`."""
+    runs = plan_runs(grid, replicates, steps, base_seed, collect_interval)
+    done = completed_runs(output) if resume else set()
+    pending = [run for run in runs if run['run_id'] not in done]
+    print(f"Sweep: {len(runs)} runs, {len(runs) - len(pending)} already done, {len(pending)} to go",
+          file=sys.stderr)
+    if not pending:
+        return 0
+
+    manager = multiprocessing.Manager()
+    progress_queue = manager.Queue()
+    stop = threading.Event()
+    printer = threading.Thread(target=_print_progress, args=(progress_queue, stop), daemon=True)
+    printer.start()
+
+    finished = 0
+    start = time.perf_counter()
+    try:
+        with open(output, 'a' if resume else 'w', encoding='utf-8') as out, \
+                ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_run_one, run, progress_queue, progress_every) for run in pending]
+            for future in as_completed(futures):
+                record = future.result()
+                out.write(json.dumps(record, separators=(',', ':')) + '\n')
+                out.flush()
+                os.fsync(out.fileno())
+                finished += 1
+                print(f"[{finished}/{len(pending)}] {record['run_id']}: "
+                      f"{record['steps_per_second']:.1f} steps/sec", file=sys.stderr)
+    finally:
+        stop.set()
+        printer.join()
+        manager.shutdown()
+
+    elapsed = time.perf_counter() - start
+    print(f"Sweep finished {finished} runs in {elapsed:.1f}s", file=sys.stderr)
+    return finished
+
+
+def parse_value(text):
+    """Parse a command line parameter value as int, float or string."""
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return text
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run a parameter sweep of the AI City Simulation.")
+    parser.add_argument('--grid', help="JSON file with {parameter: [values]}")
+    parser.add_argument('--param', action='append', default=[],
+                        help="parameter values as name=v1,v2,... (repeatable)")
+    parser.add_argument('--replicates', type=int, default=1)
+    parser.add_argument('--steps', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0, help="base seed of the sweep")
+    parser.add_argument('--collect-every', type=int, default=1)
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--output', default='sweep.jsonl', help="JSON Lines results file")
+    parser.add_argument('--no-resume', action='store_true', help="start over instead of resuming")
+    parser.add_argument('--progress', type=int, default=100, help="worker progress interval in steps")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    grid = {}
+    if args.grid:
+        with open(args.grid, 'r', encoding='utf-8') as f:
+            grid.update(json.load(f))
+    for item in args.param:
+        name, _, values = item.partition('=')
+        grid[name.strip()] = [parse_value(v.strip()) for v in values.split(',') if v.strip()]
+
+    return run_sweep(grid, args.replicates, args.steps, args.output,
+                     base_seed=args.seed, collect_interval=args.collect_every,
+                     workers=args.workers, resume=not args.no_resume,
+                     progress_every=args.progress)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\nSweep interrupted; rerun the same command to resume.")
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Test the parameter sweep runner.
+An interrupted sweep -- including one torn mid-line -- must resume with only
+the missing runs and leave a valid results file.
+"""
+
+import json
+import os
+import tempfile
+
+from sweep import run_sweep, plan_runs, completed_runs
+
+
+GRID = {'num_agents': [6, 8], 'num_food': 10, 'width': 10, 'height': 10}
+
+
+def read_records(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_resume_after_torn_line():
+    """Finished runs are kept, the torn line is dropped and rerun."""
+    print("Testing sweep resume...")
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, 'sweep.jsonl')
+        assert run_sweep(GRID, replicates=2, steps=4, output=output, workers=1) == 4
+        records = read_records(output)
+        by_id = {record['run_id']: record for record in records}
+        assert set(by_id) == {run['run_id'] for run in plan_runs(GRID, 2, 4)}
+
+        # Crash while writing the last record: keep the first two, tear the third
+        with open(output, 'w', encoding='utf-8') as f:
+            for record in records[:2]:
+                f.write(json.dumps(record) + '\n')
+            f.write(json.dumps(records[2])[:40])
+        assert completed_runs(output) == {records[0]['run_id'], records[1]['run_id']}
+
+        assert run_sweep(GRID, replicates=2, steps=4, output=output, workers=1) == 2
+        resumed = read_records(output)  # Every line parses again
+        assert len(resumed) == 4
+        for record in resumed:
+            assert record['series'] == by_id[record['run_id']]['series']  # Same seed, same run
+        assert run_sweep(GRID, replicates=2, steps=4, output=output, workers=1) == 0
+    print("✓ Torn line dropped, 2 missing runs redone with identical results, nothing left to run")
+
+
+if __name__ == "__main__":
+    test_resume_after_torn_line()